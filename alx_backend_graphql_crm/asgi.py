@@ -12,5 +12,8 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'alx_backend_graphql_crm.settings')
+# Persistent connections are per thread, and ASGI runs database code on
+# executor threads that Django does not clean up per request.
+os.environ.setdefault('CRM_CONN_MAX_AGE', '0')
 
 application = get_asgi_application()
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/3.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -42,13 +43,93 @@ INSTALLED_APPS = [
 ]
 
 GRAPHENE = {
-    "SCHEMA": "alx_backend_graphql_crm.schema.schema"
+    "SCHEMA": "alx_backend_graphql_crm.schema.schema",
+    "MIDDLEWARE": [
+        "crm.instrumentation.InstrumentationMiddleware",
+    ],
 }
 
+# Parsed/validated GraphQL documents kept per process, and where
+# automatic persisted queries (sha256 hash -> query text) are stored.
+GRAPHQL_DOCUMENT_CACHE_SIZE = 1000
+GRAPHQL_PERSISTED_QUERY_CACHE = 'default'
+GRAPHQL_PERSISTED_QUERY_TIMEOUT = None
+
+# Opt-in cache of read-only query results, invalidated by model signals.
+# Only queries whose root fields all have a timeout below are cached, per
+# user (anonymous requests share one entry). The locmem default is per
+# process; point CACHE at a shared backend when running several workers.
+GRAPHQL_RESPONSE_CACHE = {
+    'ENABLED': False,
+    'CACHE': 'default',
+    'FIELD_TIMEOUTS': {
+        'products': 300,
+        'allProducts': 300,
+        'customers': 60,
+        'allCustomers': 60,
+    },
+}
+
+# Cost budget per GraphQL request. Each resolved object costs 1 and lists
+# multiply by first/last, a LIST_SIZES hint or DEFAULT_LIST_SIZE, or
+# ROOT_LIST_SIZE for unpaginated root lists, which read a whole table.
+# MAX_COST lets such a list fan out into one relation (e.g.
+# `orders { customer { email } }`), but not into a relation of a relation.
+# Over-budget operations are rejected before execution; the cost is
+# reported in the response extensions.
+GRAPHQL_QUERY_COST = {
+    'ENABLED': True,
+    'MAX_COST': 1010000,
+    'MAX_DEPTH': 5,
+    'DEFAULT_LIST_SIZE': 100,
+    'ROOT_LIST_SIZE': 10000,
+    'LIST_SIZES': {
+        'OrderType.products': 10,
+        'CustomerType.orders': 20,
+    },
+    'REPORT': True,
+}
+
+# Per-field resolver time and SQL query counts for each GraphQL request,
+# aggregated into histograms served at /metrics (Prometheus text format).
+# EXTENSIONS also returns the per-field trace in the response extensions.
+# /metrics answers staff users and METRICS_ALLOWED_IPS (the scraper) only.
+GRAPHQL_INSTRUMENTATION = {
+    'ENABLED': True,
+    'EXTENSIONS': DEBUG,
+    'METRICS_ALLOWED_IPS': ['127.0.0.1', '::1'],
+}
+
+# Scheduled jobs (crm/tasks.py) run their GraphQL operations in-process.
+# Set a URL to send them to a remote endpoint over a pooled session instead.
+CRM_JOBS_GRAPHQL_URL = None
+
+# Structured log for scheduled jobs: JSON lines with one summary record
+# per run (status, duration, row counts), buffered and size-rotated.
+# USE_QUEUE moves file writes to a background thread.
+CRM_JOB_LOG = {
+    'PATH': '/tmp/crm_jobs.log',
+    'MAX_BYTES': 10 * 1024 * 1024,
+    'BACKUP_COUNT': 5,
+    'BUFFER_SIZE': 100,
+    'USE_QUEUE': False,
+}
+
+# Weekly order reminders: one email per customer, sent in batches over one
+# connection. The Celery task fans out one worker task per customer id shard.
+ORDER_REMINDER_SHARDS = 4
+ORDER_REMINDER_PAGE_SIZE = 2000
+ORDER_REMINDER_EMAIL_BATCH_SIZE = 100
+
+# Rows fetched per database round trip (and flushed per response chunk)
+# by the streaming /export/ endpoints.
+EXPORT_CHUNK_SIZE = 2000
+
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
+    'crm.db_routing.ReplicaRoutingMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
@@ -79,11 +160,65 @@ WSGI_APPLICATION = 'alx_backend_graphql_crm.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/3.2/ref/settings/#databases
 
+# Connections persist across requests for CONN_MAX_AGE seconds and are
+# checked before reuse, which saves reconnecting and re-running the SQLite
+# setup (WAL and friends, see CRM_DB_CONNECTIONS below) per request. That
+# only holds under WSGI: asgi.py sets CRM_CONN_MAX_AGE to 0, because ASGI
+# runs database code on executor threads that outlive requests, so Django
+# never closes their connections.
+CONN_MAX_AGE = int(os.environ.get('CRM_CONN_MAX_AGE', 600))
+
+# IMMEDIATE transactions on 'default' take the write lock at BEGIN, waiting
+# on busy_timeout, rather than failing with "database is locked" when a
+# transaction that has read tries to write. The trade-off: every atomic
+# block takes the lock, read-only ones included, and waits behind other
+# writers. Here atomic blocks are for writes (mutations, restocking,
+# cleanup, data generation), while plain reads run in autocommit and never
+# take it; 'replica' keeps SQLite's deferred default.
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
-    }
+        'CONN_MAX_AGE': CONN_MAX_AGE,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'transaction_mode': 'IMMEDIATE',
+        },
+    },
+    # A read replica of 'default': a copy of db.sqlite3 kept current from
+    # outside Django (e.g. `sqlite3 db.sqlite3 ".backup replica.sqlite3"`
+    # or Litestream). Reads only go here once it is listed in
+    # CRM_DB_ROUTING['REPLICAS']; the routing tests use it as a second,
+    # separate test database. On PostgreSQL, point it at the standby and
+    # use Django's connection pool instead of persistent connections,
+    # which also works under ASGI:
+    #     'OPTIONS': {'pool': {'min_size': 2, 'max_size': 10}},
+    #     'CONN_MAX_AGE': 0,
+    'replica': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'replica.sqlite3',
+        'CONN_MAX_AGE': CONN_MAX_AGE,
+        'CONN_HEALTH_CHECKS': True,
+    },
+}
+
+CRM_DB_CONNECTIONS = {
+    'SQLITE_PRAGMAS': {
+        'journal_mode': 'wal',
+        'busy_timeout': 5000,
+        'synchronous': 'normal',
+        'mmap_size': 256 * 1024 * 1024,
+    },
+}
+
+# GraphQL queries read from a replica; mutations, and the same client's
+# requests for a few seconds after a write, use the primary.
+DATABASE_ROUTERS = ['crm.db_routing.ReplicaRouter']
+
+CRM_DB_ROUTING = {
+    'REPLICAS': [],  # e.g. ['replica']
+    'STICKY_SECONDS': 5,
+    'MAX_LAG': 10,
 }
 
 
@@ -15,10 +15,20 @@ Including another URLconf
 """
 from django.contrib import admin
 from django.urls import path
-from graphene_django.views import GraphQLView
 from django.views.decorators.csrf import csrf_exempt
+from crm.views import (
+    AsyncCRMGraphQLView,
+    CRMGraphQLView,
+    CustomerExportView,
+    MetricsView,
+    OrderExportView,
+)
 
 urlpatterns = [
     path("admin/", admin.site.urls),
-    path("graphql", csrf_exempt(GraphQLView.as_view(graphiql=True))),
+    path("graphql", csrf_exempt(CRMGraphQLView.as_view(graphiql=True))),
+    path("graphql/async", csrf_exempt(AsyncCRMGraphQLView.as_view())),
+    path("export/orders", OrderExportView.as_view()),
+    path("export/customers", CustomerExportView.as_view()),
+    path("metrics", MetricsView.as_view()),
 ]
\ No newline at end of file
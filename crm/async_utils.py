@@ -0,0 +1,58 @@
+from contextlib import asynccontextmanager
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.db import transaction
+
+# -----------------------------
+# Async Execution Helpers
+# -----------------------------
+ASYNC_CONTEXT_ATTR = "graphql_async"
+
+
+def mark_async(context):
+    """Flag a request context as executed by the async GraphQL view."""
+    if isinstance(context, dict):
+        context[ASYNC_CONTEXT_ATTR] = True
+    else:
+        setattr(context, ASYNC_CONTEXT_ATTR, True)
+    return context
+
+
+def is_async(info):
+    context = info.context
+    if isinstance(context, dict):
+        return context.get(ASYNC_CONTEXT_ATTR, False)
+    return getattr(context, ASYNC_CONTEXT_ATTR, False)
+
+
+def async_safe(resolver):
+    """
+    Run a synchronous resolver in Django's thread-sensitive executor when the
+    request is served asynchronously. Used for code that needs transactions,
+    which the async ORM does not support.
+    """
+    @wraps(resolver)
+    def wrapper(root, info, *args, **kwargs):
+        if is_async(info):
+            return sync_to_async(resolver)(root, info, *args, **kwargs)
+        return resolver(root, info, *args, **kwargs)
+    return wrapper
+
+
+@asynccontextmanager
+async def async_atomic(using=None):
+    """
+    `transaction.atomic` for async code. The transaction is opened on the
+    thread-sensitive executor, which also runs a request's `async_safe`
+    resolvers and async ORM queries, so they all take part in it.
+    """
+    atomic = transaction.atomic(using=using)
+    await sync_to_async(atomic.__enter__)()
+    try:
+        yield
+    except BaseException as e:
+        if not await sync_to_async(atomic.__exit__)(type(e), e, e.__traceback__):
+            raise
+    else:
+        await sync_to_async(atomic.__exit__)(None, None, None)
@@ -0,0 +1,412 @@
+import datetime
+import random
+import statistics
+import subprocess
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.db import close_old_connections, connections, transaction
+from django.db.backends.signals import connection_created
+from django.utils import timezone
+
+from .models import Customer, Order, Product
+
+# -----------------------------
+# Datasets
+# -----------------------------
+class Dataset:
+    """Ids and values sampled from the database for operation arguments."""
+
+    def __init__(self):
+        self.customer_ids = list(Customer.objects.order_by("pk").values_list("pk", flat=True)[:100])
+        self.product_ids = list(Product.objects.order_by("pk").values_list("pk", flat=True)[:20])
+        if not self.customer_ids or not self.product_ids:
+            raise ValueError("The benchmark needs at least one customer and one product.")
+        self.since = (timezone.now() - datetime.timedelta(days=30)).date()
+
+
+# -----------------------------
+# Operation Catalogue
+# -----------------------------
+class Operation:
+    """
+    One named workload and its query budget: at most `max_queries` SQL
+    statements and `max_rows` rows read per run, whatever the size of the
+    dataset. `max_rows` is None for operations whose result grows with
+    the data, such as unpaginated lists. Both are enforced by
+    crm/tests/test_query_budgets.py.
+    """
+
+    kind = None
+
+    def __init__(self, name, max_queries, max_rows=None):
+        self.name = name
+        self.max_queries = max_queries
+        self.max_rows = max_rows
+
+    def run(self, dataset, iteration, middleware=None):
+        raise NotImplementedError
+
+
+class BenchmarkContext:
+    """Stands in for the request as the resolver context."""
+
+
+class GraphQLOperation(Operation):
+    """Runs a document through the real schema, failing on any error."""
+
+    def __init__(self, name, query, variables=None, **budget):
+        super().__init__(name, **budget)
+        self.kind = "mutation" if query.lstrip().startswith("mutation") else "query"
+        self.query = query
+        self.variables = variables
+
+    def run(self, dataset, iteration, middleware=None):
+        from alx_backend_graphql_crm.schema import schema
+
+        variables = self.variables
+        if callable(variables):
+            variables = variables(dataset, iteration)
+        result = schema.execute(
+            self.query,
+            variable_values=variables,
+            context_value=BenchmarkContext(),
+            middleware=middleware,
+        )
+        if result.errors:
+            raise RuntimeError("; ".join(str(error) for error in result.errors))
+        return result.data
+
+
+class JobOperation(Operation):
+    """Runs a Celery task in-process; fan-out subtasks run inline, without a broker."""
+
+    kind = "job"
+
+    def __init__(self, name, task, **budget):
+        super().__init__(name, **budget)
+        self.task = task
+
+    def run(self, dataset, iteration, middleware=None):
+        from .celery import app
+
+        eager = app.conf.task_always_eager
+        app.conf.task_always_eager = True
+        try:
+            return self.task.apply().get()
+        finally:
+            app.conf.task_always_eager = eager
+
+
+def get_operations():
+    from . import tasks
+
+    return [
+        # List queries: unpaginated, so only the query count is fixed.
+        GraphQLOperation(
+            "customers",
+            "{ customers { id name email phone } }",
+            max_queries=1,
+        ),
+        GraphQLOperation(
+            "products",
+            "{ products { id name price stock } }",
+            max_queries=1,
+        ),
+        GraphQLOperation(
+            "orders",
+            "{ orders { id totalAmount orderDate customer { id name } products { id name price } } }",
+            max_queries=2,
+        ),
+        # Filtered connections
+        GraphQLOperation(
+            "allCustomers by name",
+            """{ allCustomers(first: 50, nameIcontains: "maria") {
+                totalCount edges { cursor node { id name email } } } }""",
+            max_queries=2, max_rows=52,
+        ),
+        GraphQLOperation(
+            "allProducts low stock",
+            "{ allProducts(first: 50, lowStock: true) { totalCount edges { node { id name stock } } } }",
+            max_queries=2, max_rows=52,
+        ),
+        GraphQLOperation(
+            "allOrders recent",
+            """query ($since: Date) { allOrders(first: 50, orderDateGte: $since) {
+                edges { node { id totalAmount orderDate customer { name }
+                products { name price } } } pageInfo { hasNextPage endCursor } } }""",
+            lambda dataset, i: {"since": dataset.since.isoformat()},
+            max_queries=2, max_rows=600,
+        ),
+        GraphQLOperation(
+            "allOrders search",
+            """{ allOrders(first: 50, search: "smith") {
+                edges { node { id totalAmount customer { name } } } } }""",
+            max_queries=1, max_rows=51,
+        ),
+        GraphQLOperation(
+            "allCustomers search",
+            """{ allCustomers(first: 20, search: "garcia") {
+                edges { node { id name } } } }""",
+            max_queries=1, max_rows=21,
+        ),
+        # Nested order queries
+        GraphQLOperation(
+            # Each customer's full order list, so rows grow with the data.
+            "customers with orders",
+            """{ allCustomers(first: 50) { edges { node { name
+                orders { id totalAmount products { name } } } } } }""",
+            max_queries=3,
+        ),
+        GraphQLOperation(
+            "crmStats by day",
+            """query ($since: Date) { crmStats(startDate: $since) {
+                totalCustomers totalOrders totalRevenue
+                groups(groupBy: DAY) { key orders revenue } } }""",
+            lambda dataset, i: {"since": dataset.since.isoformat()},
+            max_queries=3, max_rows=40,
+        ),
+        # Mutations
+        GraphQLOperation(
+            "createCustomer",
+            """mutation ($email: String!) { createCustomer(name: "Bench", email: $email,
+                phone: "+15550000000") { customer { id } } }""",
+            lambda dataset, i: {"email": f"bench{i}@example.com"},
+            max_queries=4, max_rows=1,
+        ),
+        GraphQLOperation(
+            "bulkCreateCustomers",
+            """mutation ($input: [CustomerInput]!) { bulkCreateCustomers(input: $input) {
+                customers { id } errors } }""",
+            lambda dataset, i: {"input": [
+                {"name": f"Bulk {n}", "email": f"bulk{i}-{n}@example.com"} for n in range(100)
+            ]},
+            max_queries=6, max_rows=100,
+        ),
+        GraphQLOperation(
+            "createProduct",
+            'mutation { createProduct(name: "Bench", price: 9.99, stock: 5) { product { id } } }',
+            max_queries=3, max_rows=0,
+        ),
+        GraphQLOperation(
+            "createOrder",
+            """mutation ($customer: ID!, $products: [ID]!) {
+                createOrder(customerId: $customer, productIds: $products) {
+                order { id totalAmount } } }""",
+            lambda dataset, i: {
+                "customer": dataset.customer_ids[i % len(dataset.customer_ids)],
+                "products": dataset.product_ids[:3],
+            },
+            # The product prices and the customer check are the rows read.
+            max_queries=7, max_rows=4,
+        ),
+        GraphQLOperation(
+            "bulkCreateOrders",
+            """mutation ($input: [OrderInput]!) { bulkCreateOrders(input: $input) {
+                orders { id totalAmount } errors } }""",
+            lambda dataset, i: {"input": [
+                {
+                    "customerId": dataset.customer_ids[n % len(dataset.customer_ids)],
+                    "productIds": dataset.product_ids[n % 3:n % 3 + 2],
+                }
+                for n in range(100)
+            ]},
+            max_queries=7, max_rows=200,
+        ),
+        GraphQLOperation(
+            "updateLowStockProducts",
+            "mutation { updateLowStockProducts { message updatedProducts { id stock } } }",
+            max_queries=3,
+        ),
+        # Scheduled jobs (crm/cron.py re-exports the first two)
+        JobOperation("log_crm_heartbeat", tasks.log_crm_heartbeat, max_queries=0, max_rows=0),
+        JobOperation("update_low_stock", tasks.update_low_stock, max_queries=3),
+        JobOperation(
+            "generate_crm_report", tasks.generate_crm_report, max_queries=2, max_rows=2
+        ),
+        # Per shard, one keyset page and one reminded_at UPDATE while a shard
+        # has fewer than ORDER_REMINDER_PAGE_SIZE recent orders and
+        # ORDER_REMINDER_EMAIL_BATCH_SIZE customers to remind.
+        JobOperation("send_order_reminders", tasks.send_order_reminders, max_queries=8),
+    ]
+
+
+# -----------------------------
+# Measurement
+# -----------------------------
+class QueryCounter:
+    """connection.execute_wrapper that counts statements."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+@contextmanager
+def counting_queries():
+    counter = QueryCounter()
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(counter))
+        yield counter
+
+
+@contextmanager
+def rolled_back():
+    """Undo an operation's writes so every run sees the same dataset."""
+    with transaction.atomic():
+        yield
+        transaction.set_rollback(True)
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered) + 0.5) - 1))
+    return ordered[index]
+
+
+def summarize(samples):
+    return {
+        "min": round(min(samples), 3),
+        "p50": round(percentile(samples, 50), 3),
+        "p90": round(percentile(samples, 90), 3),
+        "p95": round(percentile(samples, 95), 3),
+        "p99": round(percentile(samples, 99), 3),
+        "max": round(max(samples), 3),
+        "mean": round(statistics.fmean(samples), 3),
+    }
+
+
+def measure(operation, dataset, repeat=20, warmup=2):
+    """
+    Time `repeat` runs of an operation after `warmup` untimed ones, each in
+    a rolled-back transaction, counting SQL statements per run. Peak Python
+    memory is taken from one more run under tracemalloc, which would skew
+    the timings.
+    """
+    iteration = 0
+    for _ in range(warmup):
+        with rolled_back():
+            operation.run(dataset, iteration)
+        iteration += 1
+
+    latencies = []
+    queries = []
+    for _ in range(repeat):
+        with rolled_back(), counting_queries() as counter:
+            start = time.perf_counter()
+            operation.run(dataset, iteration)
+            latencies.append((time.perf_counter() - start) * 1000)
+        queries.append(counter.count)
+        iteration += 1
+
+    tracemalloc.start()
+    try:
+        with rolled_back():
+            operation.run(dataset, iteration)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "name": operation.name,
+        "kind": operation.kind,
+        "runs": repeat,
+        "latency_ms": summarize(latencies),
+        "sql_queries": {"min": min(queries), "max": max(queries)},
+        "peak_memory_bytes": peak,
+    }
+
+
+# -----------------------------
+# Concurrency
+# -----------------------------
+def run_concurrent(mix, dataset, threads=8, requests=50, seed=0):
+    """
+    Run `requests` operations on each of `threads` threads at once, drawn
+    from `mix` ({operation: weight}) by a seeded generator per thread.
+    Writes are committed, not rolled back.
+
+    Each operation is handled like a web request: connections past their
+    CONN_MAX_AGE (or failing their health check) are closed before and
+    after it, so the timings include connecting and the connection setup
+    in crm/db_connections.py whenever connections are not persistent.
+    """
+    operations = list(mix)
+    weights = [mix[operation] for operation in operations]
+    latencies = {operation.name: [] for operation in operations}
+    errors = {operation.name: Counter() for operation in operations}
+    opened = []
+    start_line = threading.Barrier(threads)
+
+    def count_connection(sender, connection, **kwargs):
+        opened.append(connection.alias)
+
+    def worker(number):
+        rng = random.Random(seed * 1000 + number)
+        start_line.wait()
+        try:
+            for n in range(requests):
+                operation = rng.choices(operations, weights)[0]
+                start = time.perf_counter()
+                try:
+                    close_old_connections()
+                    operation.run(dataset, number * requests + n)
+                except Exception as e:
+                    errors[operation.name][str(e)] += 1
+                else:
+                    latencies[operation.name].append((time.perf_counter() - start) * 1000)
+                finally:
+                    close_old_connections()
+        finally:
+            connections.close_all()
+
+    connection_created.connect(count_connection)
+    workers = [threading.Thread(target=worker, args=(number,)) for number in range(threads)]
+    try:
+        start = time.perf_counter()
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        elapsed = time.perf_counter() - start
+    finally:
+        connection_created.disconnect(count_connection)
+
+    results = []
+    for operation in operations:
+        samples = latencies[operation.name]
+        results.append({
+            "name": operation.name,
+            "kind": operation.kind,
+            "completed": len(samples),
+            "errors": sum(errors[operation.name].values()),
+            "error_messages": dict(errors[operation.name].most_common(5)),
+            "latency_ms": summarize(samples) if samples else None,
+        })
+    completed = sum(result["completed"] for result in results)
+    return {
+        "threads": threads,
+        "requests": threads * requests,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_per_s": round(completed / elapsed, 1),
+        "connections_opened": len(opened),
+        "operations": results,
+    }
+
+
+def get_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=settings.BASE_DIR, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
@@ -1,8 +1,9 @@
 import os
 from celery import Celery
+from celery.schedules import crontab
 
 # Set default Django settings module
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'crm.settings')
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'alx_backend_graphql_crm.settings')
 
 app = Celery('crm')
 
@@ -12,3 +13,23 @@ app.config_from_object('django.conf:settings', namespace='CELERY')
 # Autodiscover tasks in installed apps
 app.autodiscover_tasks()
 
+
+# Scheduled jobs; they run in-process on the worker through crm.jobs.
+app.conf.beat_schedule = {
+    'log-crm-heartbeat': {
+        'task': 'crm.tasks.log_crm_heartbeat',
+        'schedule': crontab(minute='*/5'),
+    },
+    'update-low-stock': {
+        'task': 'crm.tasks.update_low_stock',
+        'schedule': crontab(minute=0, hour='*/12'),
+    },
+    'generate-crm-report': {
+        'task': 'crm.tasks.generate_crm_report',
+        'schedule': crontab(day_of_week='mon', hour=6, minute=0),
+    },
+    'send-order-reminders': {
+        'task': 'crm.tasks.send_order_reminders',
+        'schedule': crontab(hour=8, minute=0),
+    },
+}
@@ -1,48 +1,24 @@
 #!/usr/bin/env python3
+"""
+Emails reminders for not-yet-reminded orders from the last 7 days, one per
+customer. Runs every shard in this process; under Celery beat the crm.tasks.
+send_order_reminders task fans the shards out over the workers instead.
+"""
+import os
+import sys
 
-from gql import gql, Client
-from gql.transport.requests import RequestsHTTPTransport
-from datetime import datetime, timedelta
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, BASE_DIR)
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "alx_backend_graphql_crm.settings")
 
-# Configure the GraphQL client
-transport = RequestsHTTPTransport(
-    url='http://localhost:8000/graphql',
-    verify=True,
-    retries=3,
-)
-client = Client(transport=transport, fetch_schema_from_transport=True)
+import django  # noqa: E402
 
-# Calculate date 7 days ago
-seven_days_ago = (datetime.now() - timedelta(days=7)).date()
+django.setup()
 
-# GraphQL query to fetch orders in the last 7 days
-query = gql("""
-query ($startDate: Date!) {
-  orders(orderDate_Gte: $startDate) {
-    id
-    customer {
-      email
-    }
-  }
-}
-""")
-
-params = {"startDate": str(seven_days_ago)}
-
-try:
-    result = client.execute(query, variable_values=params)
-    orders = result.get("orders", [])
-
-    log_file = "/tmp/order_reminders_log.txt"
-
-    with open(log_file, "a") as f:
-        for order in orders:
-            order_id = order["id"]
-            email = order["customer"]["email"]
-            f.write(f"{datetime.now().strftime('%Y-%m-%d %H:%M:%S')} - Order {order_id} for {email}\n")
-
-    print("Order reminders processed!")
-
-except Exception as e:
-    print(f"Error fetching orders: {e}")
+from crm.job_logging import job_run  # noqa: E402
+from crm.reminders import send_reminders  # noqa: E402
 
+if __name__ == "__main__":
+    with job_run("send_order_reminders") as run:
+        customers, orders = send_reminders(run=run)
+    print(f"Order reminders processed: {customers} customers, {orders} orders.")
@@ -0,0 +1,264 @@
+import datetime
+import math
+import random
+from array import array
+from bisect import bisect
+from decimal import Decimal
+from itertools import accumulate
+
+from django.db import connections, transaction
+from django.utils import timezone
+
+from .models import Customer, Order, Product
+from .response_cache import invalidate
+from .search import get_backend
+
+# -----------------------------
+# Vocabulary
+# -----------------------------
+FIRST_NAMES = (
+    "Alice", "Amara", "Ben", "Carlos", "Chen", "Dana", "Elif", "Fatima", "George", "Hana",
+    "Ivan", "Jamal", "Kofi", "Lena", "Maria", "Mohammed", "Nia", "Oscar", "Priya", "Sven",
+)
+LAST_NAMES = (
+    "Adeyemi", "Brown", "Costa", "Dubois", "Garcia", "Ito", "Kim", "Kowalski", "Mensah", "Meyer",
+    "Nguyen", "Okafor", "Patel", "Rossi", "Silva", "Smith", "Tanaka", "Wang",
+)
+EMAIL_DOMAINS = ("example.com", "example.org", "example.net")
+PRODUCT_ADJECTIVES = (
+    "Compact", "Deluxe", "Eco", "Ergonomic", "Portable", "Pro", "Smart", "Ultra", "Wireless",
+)
+PRODUCT_NOUNS = (
+    "Backpack", "Blender", "Camera", "Chair", "Headphones", "Keyboard", "Lamp", "Laptop",
+    "Monitor", "Phone", "Speaker", "Tablet", "Watch",
+)
+
+# Relative order volume by hour of day, local to the shop.
+HOUR_WEIGHTS = (
+    1, 1, 1, 1, 1, 2, 3, 5, 7, 8, 9, 10, 11, 10, 9, 9, 10, 11, 12, 12, 10, 7, 4, 2,
+)
+
+
+# -----------------------------
+# Distributions
+# -----------------------------
+class WeightedSampler:
+    """Draws indexes 0..n-1 in proportion to `weights`, by bisection."""
+
+    def __init__(self, weights, rng):
+        self.cumulative = array("d", accumulate(weights))
+        self.total = self.cumulative[-1]
+        self.rng = rng
+
+    def sample(self):
+        return bisect(self.cumulative, self.rng.random() * self.total)
+
+
+def zipf_sampler(n, exponent, rng):
+    """Rank k (from 0) is drawn with probability proportional to 1 / (k + 1) ** exponent."""
+    return WeightedSampler((1 / (rank ** exponent) for rank in range(1, n + 1)), rng)
+
+
+class SeasonalDates:
+    """
+    Order timestamps over the `days` before `end`, weighted by a yearly
+    season peaking in December, busier weekends, steady growth over the
+    period, and daytime hours.
+    """
+
+    def __init__(self, end, days, rng):
+        self.start = end - datetime.timedelta(days=days)
+        self.rng = rng
+        weights = []
+        for offset in range(days):
+            day = self.start + datetime.timedelta(days=offset)
+            season = 1 + 0.5 * math.cos(2 * math.pi * (day.timetuple().tm_yday - 350) / 365)
+            weekday = 1.25 if day.weekday() >= 5 else 1.0
+            growth = 0.6 + 0.8 * offset / days
+            weights.append(season * weekday * growth)
+        self.days = WeightedSampler(weights, rng)
+        self.hours = WeightedSampler(HOUR_WEIGHTS, rng)
+
+    def sample(self):
+        return self.start + datetime.timedelta(
+            days=self.days.sample(),
+            hours=self.hours.sample(),
+            seconds=self.rng.randrange(3600),
+        )
+
+
+# -----------------------------
+# Generator
+# -----------------------------
+class DataGenerator:
+    """
+    Deterministically generate customers, products and orders: the same
+    seed, sizes and end date give the same rows in an empty database.
+
+    Rows are written with bulk_create in batches of `batch_size`, each in
+    its own transaction, and order/product links go straight into the M2M
+    through table. Signals are bypassed, so the customer order stats and
+    the search index are rebuilt once at the end.
+
+    - Products are picked by Zipfian popularity over a shuffled ranking.
+    - Customers are picked with a skew (`customer_skew`), so some order
+      often and many rarely or never.
+    - Basket sizes are geometric with mean `mean_basket`.
+    - Order dates follow `SeasonalDates` over the `days` before `end`.
+    """
+
+    def __init__(self, seed=0, batch_size=5000, end=None, days=730, zipf_exponent=1.1,
+                 customer_skew=2.0, mean_basket=2.5, max_basket=10, using="default",
+                 progress=None):
+        self.rng = random.Random(seed)
+        self.batch_size = batch_size
+        self.end = end or timezone.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        self.days = days
+        self.zipf_exponent = zipf_exponent
+        self.customer_skew = customer_skew
+        self.mean_basket = mean_basket
+        self.max_basket = max_basket
+        self.using = using
+        self.progress = progress or (lambda stage, done, total: None)
+
+    def run(self, customers, products, orders):
+        product_ids, prices = self.create_products(products)
+        customer_ids = self.create_customers(customers)
+        self.create_orders(orders, customer_ids, product_ids, prices)
+        self.refresh_customer_stats(customer_ids)
+
+        self.progress("search index", 0, 1)
+        get_backend(self.using).rebuild()
+        self.progress("search index", 1, 1)
+        invalidate(Customer, Order, Product)
+
+    def clear(self):
+        """Delete every CRM row with set-based DELETEs, children first."""
+        with transaction.atomic(using=self.using):
+            for model in (Order.products.through, Order, Customer, Product):
+                model.objects.using(self.using).all()._raw_delete(self.using)
+
+    def batches(self, total):
+        for start in range(0, total, self.batch_size):
+            yield start, min(total, start + self.batch_size)
+
+    def new_pks(self, model, after):
+        """Primary keys inserted after `after`, in insertion order."""
+        pks = (
+            model.objects.using(self.using).filter(pk__gt=after)
+            .order_by("pk").values_list("pk", flat=True)
+        )
+        return array("q", pks.iterator(chunk_size=self.batch_size))
+
+    def max_pk(self, model):
+        last = model.objects.using(self.using).order_by("-pk").values_list("pk", flat=True).first()
+        return last or 0
+
+    def create_products(self, total):
+        rng = self.rng
+        after = self.max_pk(Product)
+        prices = []
+        for start, stop in self.batches(total):
+            rows = []
+            for n in range(start, stop):
+                price = Decimal(min(5000, max(1, rng.lognormvariate(3.5, 1.0)))).quantize(Decimal("0.01"))
+                prices.append(price)
+                rows.append(Product(
+                    name=f"{rng.choice(PRODUCT_ADJECTIVES)} {rng.choice(PRODUCT_NOUNS)} {after + n + 1}",
+                    price=price,
+                    # About one product in ten is low on stock.
+                    stock=rng.randrange(10) if rng.random() < 0.1 else rng.randint(10, 500),
+                ))
+            Product.objects.using(self.using).bulk_create(rows)
+            self.progress("products", stop, total)
+        return self.new_pks(Product, after), prices
+
+    def create_customers(self, total):
+        rng = self.rng
+        after = self.max_pk(Customer)
+        for start, stop in self.batches(total):
+            rows = []
+            for n in range(start, stop):
+                first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+                kind = rng.random()
+                if kind < 0.6:
+                    phone = f"+1{rng.randrange(10 ** 10):010d}"
+                elif kind < 0.85:
+                    phone = f"{rng.randrange(200, 1000)}-{rng.randrange(1000):03d}-{rng.randrange(10000):04d}"
+                else:
+                    phone = None
+                rows.append(Customer(
+                    name=f"{first} {last}",
+                    # The sequence number keeps emails unique across runs.
+                    email=f"{first}.{last}.{after + n + 1}@{rng.choice(EMAIL_DOMAINS)}".lower(),
+                    phone=phone,
+                ))
+            Customer.objects.using(self.using).bulk_create(rows)
+            self.progress("customers", stop, total)
+        return self.new_pks(Customer, after)
+
+    def create_orders(self, total, customer_ids, product_ids, prices):
+        if not total:
+            return
+        if not customer_ids or not product_ids:
+            raise ValueError("Orders need at least one customer and one product.")
+        rng = self.rng
+        # Popularity follows a shuffled ranking, not primary key order.
+        ranking = list(range(len(product_ids)))
+        rng.shuffle(ranking)
+        popularity = zipf_sampler(len(product_ids), self.zipf_exponent, rng)
+        dates = SeasonalDates(self.end, self.days, rng)
+        max_basket = min(self.max_basket, len(product_ids))
+        through = Order.products.through
+        returns_pks = connections[self.using].features.can_return_rows_from_bulk_insert
+
+        # 1 + floor(exponential) is geometric; this rate gives mean_basket.
+        rate = math.log(1 + 1 / (self.mean_basket - 1)) if self.mean_basket > 1 else None
+
+        for start, stop in self.batches(total):
+            orders = []
+            baskets = []
+            for _ in range(start, stop):
+                size = 1 + int(rng.expovariate(rate)) if rate else 1
+                basket = set()
+                while len(basket) < min(size, max_basket):
+                    basket.add(ranking[popularity.sample()])
+                customer = customer_ids[int(len(customer_ids) * rng.random() ** self.customer_skew)]
+                orders.append(Order(
+                    customer_id=customer,
+                    total_amount=sum(prices[index] for index in basket),
+                    order_date=dates.sample(),
+                ))
+                baskets.append(basket)
+
+            with transaction.atomic(using=self.using):
+                after = None if returns_pks else self.max_pk(Order)
+                Order.objects.using(self.using).bulk_create(orders)
+                order_ids = [order.pk for order in orders] if returns_pks else self.new_pks(Order, after)
+                through.objects.using(self.using).bulk_create(
+                    [
+                        through(order_id=order_id, product_id=product_ids[index])
+                        for order_id, basket in zip(order_ids, baskets)
+                        for index in sorted(basket)
+                    ],
+                    batch_size=self.batch_size,
+                )
+            self.progress("orders", stop, total)
+
+    def refresh_customer_stats(self, customer_ids):
+        """Recompute the denormalised stats one primary-key range at a time."""
+        total = len(customer_ids)
+        for start, stop in self.batches(total):
+            with transaction.atomic(using=self.using):
+                Customer.objects.using(self.using).filter(
+                    pk__gte=customer_ids[start], pk__lte=customer_ids[stop - 1]
+                ).refresh_order_stats()
+            self.progress("customer stats", stop, total)
+
+
+def generate(customers, products, orders, clear=False, **options):
+    generator = DataGenerator(**options)
+    if clear:
+        generator.clear()
+    generator.run(customers, products, orders)
+    return generator
@@ -0,0 +1,55 @@
+from django.conf import settings
+
+# -----------------------------
+# Configuration
+# -----------------------------
+DEFAULTS = {
+    # PRAGMAs run on every new SQLite connection, in order. WAL lets
+    # readers run alongside the one writer; busy_timeout (ms) makes a
+    # writer wait for the lock instead of failing with "database is
+    # locked"; synchronous=NORMAL is safe in WAL mode and syncs only at
+    # checkpoints; mmap_size (bytes) serves reads from the page cache.
+    "SQLITE_PRAGMAS": {
+        "journal_mode": "wal",
+        "busy_timeout": 5000,
+        "synchronous": "normal",
+        "mmap_size": 256 * 1024 * 1024,
+    },
+}
+
+
+def get_config():
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, "CRM_DB_CONNECTIONS", {}))
+    return config
+
+
+# -----------------------------
+# Connection Setup
+# -----------------------------
+def configure_connection(connection):
+    """
+    Tune a new database connection; called from the `connection_created`
+    signal. Only SQLite needs anything: the other backends are tuned on
+    the server, and pooled through DATABASES OPTIONS (see settings.py).
+    """
+    if connection.vendor != "sqlite":
+        return
+    pragmas = get_config()["SQLITE_PRAGMAS"]
+    if not pragmas:
+        return
+    with connection.cursor() as cursor:
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name} = {value}")
+
+
+def sqlite_pragmas(connection):
+    """The current values of the default and configured PRAGMAs, for reports."""
+    names = {**DEFAULTS["SQLITE_PRAGMAS"], **get_config()["SQLITE_PRAGMAS"]}
+    with connection.cursor() as cursor:
+        values = {}
+        for name in names:
+            cursor.execute(f"PRAGMA {name}")
+            row = cursor.fetchone()
+            values[name] = row[0] if row else None
+    return values
@@ -0,0 +1,248 @@
+import random
+import threading
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+from graphql import OperationType
+
+# -----------------------------
+# Configuration
+# -----------------------------
+DEFAULTS = {
+    # Aliases in DATABASES that replicate the primary (`default`).
+    "REPLICAS": [],
+    # After a write, the same client reads from the primary for this long,
+    # or for the current replica lag if that is longer.
+    "STICKY_SECONDS": 5,
+    # Replicas further behind than this (or unreachable) are skipped.
+    "MAX_LAG": 10,
+    # How often replica lag is re-measured, on a background thread.
+    "LAG_CHECK_INTERVAL": 5,
+    "COOKIE": "crm_primary_until",
+}
+
+# Seconds a replica is behind its primary, per vendor. Zero when the
+# replica has replayed everything it received.
+LAG_QUERIES = {
+    "postgresql": """
+        SELECT CASE
+            WHEN NOT pg_is_in_recovery() THEN 0
+            WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+            ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+        END
+    """,
+}
+
+
+def get_config():
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, "CRM_DB_ROUTING", {}))
+    return config
+
+
+# -----------------------------
+# Replica Lag
+# -----------------------------
+_lags = {}
+_refreshing = set()
+_lag_lock = threading.Lock()
+
+
+def measure_lag(alias):
+    """
+    Seconds `alias` is behind the primary. Infinite when the replica cannot
+    be reached; zero for backends with no lag query (e.g. a SQLite copy).
+    """
+    connection = connections[alias]
+    sql = LAG_QUERIES.get(connection.vendor)
+    if sql is None:
+        return 0.0
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(sql)
+            return float(cursor.fetchone()[0] or 0)
+    except DatabaseError:
+        return float("inf")
+
+
+def refresh_lag(alias):
+    lag = float("inf")
+    try:
+        lag = measure_lag(alias)
+    finally:
+        # The connection belongs to this thread; no request uses it.
+        connections[alias].close()
+        with _lag_lock:
+            _lags[alias] = (time.monotonic(), lag)
+            _refreshing.discard(alias)
+
+
+def replica_lag(alias, config):
+    """
+    The last measured lag of `alias`, without querying: a lag older than
+    LAG_CHECK_INTERVAL is re-measured on a background thread, and until a
+    first measurement lands the replica counts as unreachable (infinite).
+    Backends with no lag query are never behind.
+    """
+    if connections[alias].vendor not in LAG_QUERIES:
+        return 0.0
+    now = time.monotonic()
+    with _lag_lock:
+        measured_at, lag = _lags.get(alias, (None, float("inf")))
+        stale = measured_at is None or now - measured_at >= config["LAG_CHECK_INTERVAL"]
+        if stale and alias not in _refreshing:
+            _refreshing.add(alias)
+            threading.Thread(
+                target=refresh_lag, args=(alias,), name=f"crm-lag-{alias}", daemon=True
+            ).start()
+    return lag
+
+
+def healthy_replicas(config):
+    return [
+        alias for alias in config["REPLICAS"]
+        if replica_lag(alias, config) <= config["MAX_LAG"]
+    ]
+
+
+def sticky_seconds(config):
+    """How long a client reads from the primary after writing."""
+    lags = [replica_lag(alias, config) for alias in config["REPLICAS"]]
+    lags = [lag for lag in lags if lag != float("inf")]
+    return max([config["STICKY_SECONDS"]] + lags)
+
+
+# -----------------------------
+# Request State
+# -----------------------------
+class RoutingState:
+    """
+    Where the current request reads from. `sticky` means the client wrote
+    recently, so it must not read from a replica that may not have caught
+    up; `wrote` records a write during this request.
+    """
+
+    def __init__(self, sticky=False, primary=False):
+        self.sticky = sticky
+        self.primary = primary or sticky
+        self.wrote = False
+
+
+_state = ContextVar("crm_db_routing", default=None)
+
+
+def route_operation(operation_ast):
+    """
+    Called by the GraphQL views once the operation is known: queries may
+    read from a replica, unless the client is sticky or the request has
+    already written (an earlier mutation in a batch); mutations use the
+    primary throughout, for their reads as well.
+    """
+    state = _state.get()
+    if state is None:
+        return
+    if operation_ast is not None and operation_ast.operation == OperationType.QUERY:
+        state.primary = state.sticky or state.wrote
+    else:
+        state.primary = True
+
+
+# -----------------------------
+# Router
+# -----------------------------
+class ReplicaRouter:
+    """
+    Sends reads to a healthy replica when the current request allows it,
+    and everything else to `default`. Outside a request (jobs, commands,
+    shells) and inside a transaction, reads use the primary too.
+    """
+
+    def db_for_read(self, model, **hints):
+        config = get_config()
+        if not config["REPLICAS"]:
+            return None
+        state = _state.get()
+        if state is None or state.primary or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        replicas = healthy_replicas(config)
+        return random.choice(replicas) if replicas else DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        if not get_config()["REPLICAS"]:
+            return None
+        state = _state.get()
+        if state is not None:
+            # Reads for the rest of the request see this write.
+            state.primary = True
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *get_config()["REPLICAS"]}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+
+# -----------------------------
+# Middleware
+# -----------------------------
+class ReplicaRoutingMiddleware:
+    """
+    Sets up the routing state per request. Safe methods may read from
+    replicas; other methods use the primary unless the GraphQL view finds
+    a query operation. A request that writes sets a cookie that keeps the
+    client on the primary for `sticky_seconds()`, so it reads its own
+    writes; clients that drop cookies only get that within a request.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = self.start(request)
+        try:
+            response = self.get_response(request)
+            return self.finish(response)
+        finally:
+            _state.reset(token)
+
+    async def __acall__(self, request):
+        token = self.start(request)
+        try:
+            response = await self.get_response(request)
+            return self.finish(response)
+        finally:
+            _state.reset(token)
+
+    def start(self, request):
+        try:
+            until = float(request.COOKIES.get(get_config()["COOKIE"], 0))
+        except ValueError:
+            until = 0
+        state = RoutingState(
+            sticky=until > time.time(),
+            primary=request.method not in ("GET", "HEAD", "OPTIONS"),
+        )
+        return _state.set(state)
+
+    def finish(self, response):
+        state = _state.get()
+        config = get_config()
+        if state.wrote and config["REPLICAS"]:
+            seconds = sticky_seconds(config)
+            response.set_cookie(
+                config["COOKIE"], str(time.time() + seconds),
+                max_age=seconds, httponly=True, samesite="Lax",
+            )
+        return response
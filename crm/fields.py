@@ -0,0 +1,219 @@
+import base64
+import json
+from functools import partial
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from graphene.relay import PageInfo
+from graphene_django.filter import DjangoFilterConnectionField
+
+from .async_utils import is_async
+from .loaders import prime
+from .optimizer import optimize
+from .search import SEARCH_RANK
+
+# -----------------------------
+# Filter Connection Field
+# -----------------------------
+class CRMConnectionField(DjangoFilterConnectionField):
+    """
+    Filter connection that shapes its queryset to the selected fields and
+    primes the request loaders with each page. Search results come back in
+    rank order.
+    """
+
+    @classmethod
+    def resolve_queryset(cls, connection, iterable, info, args, filtering_args, filterset_class,
+                         required=()):
+        queryset = super().resolve_queryset(
+            connection, iterable, info, args, filtering_args, filterset_class
+        )
+        if SEARCH_RANK in queryset.query.annotations:
+            queryset = queryset.order_by(f"-{SEARCH_RANK}", "pk")
+        return optimize(queryset, info, required=required)
+
+    @classmethod
+    def connection_resolver(cls, resolver, connection, default_manager, queryset_resolver,
+                            max_limit, enforce_first_or_last, root, info, **args):
+        result = super().connection_resolver(
+            resolver, connection, default_manager, queryset_resolver,
+            max_limit, enforce_first_or_last, root, info, **args
+        )
+        prime(info, (edge.node for edge in result.edges))
+        return result
+
+
+# -----------------------------
+# Keyset Cursors
+# -----------------------------
+CURSOR_PREFIX = "keyset:"
+
+
+def encode_cursor(values):
+    payload = CURSOR_PREFIX + json.dumps(values, default=str)
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def decode_cursor(cursor, size):
+    try:
+        payload = base64.urlsafe_b64decode(cursor.encode()).decode()
+        if not payload.startswith(CURSOR_PREFIX):
+            raise ValueError(cursor)
+        values = json.loads(payload[len(CURSOR_PREFIX):])
+    except ValueError:
+        raise ValidationError(f"Invalid cursor: {cursor}")
+    if not isinstance(values, list) or len(values) != size:
+        raise ValidationError(f"Invalid cursor: {cursor}")
+    return values
+
+
+def keyset_filter(ordering, values, forward=True):
+    """
+    Build the row-comparison predicate `(k1, k2, ...) > (v1, v2, ...)` for the
+    given ordering ("-" prefix for descending keys) as an OR of prefixes.
+    """
+    predicate = Q()
+    for i, key in enumerate(ordering):
+        field = key.lstrip("-")
+        ascending = not key.startswith("-")
+        lookup = "gt" if ascending == forward else "lt"
+        clause = Q(**{f"{field}__{lookup}": values[i]})
+        for prev_key, prev_value in zip(ordering[:i], values[:i]):
+            clause &= Q(**{prev_key.lstrip("-"): prev_value})
+        predicate |= clause
+    return predicate
+
+
+def reverse_ordering(ordering):
+    return [key[1:] if key.startswith("-") else f"-{key}" for key in ordering]
+
+
+# -----------------------------
+# Keyset Connection Field
+# -----------------------------
+class KeysetConnectionField(CRMConnectionField):
+    """
+    Filter connection paginated on an indexed key instead of OFFSET.
+
+    Cursors encode the ordering key of the edge, so a page is a range scan
+    from that key regardless of depth. `totalCount` is only computed when the
+    client selects it. With `search`, pages are ordered by rank first and the
+    rank is part of the cursor.
+    """
+
+    def __init__(self, type_, ordering=("id",), *args, **kwargs):
+        self.ordering = list(ordering)
+        super().__init__(type_, *args, **kwargs)
+        # Offsets cannot be served from a key range.
+        self._base_args.pop("offset", None)
+
+    @property
+    def key_fields(self):
+        return [key.lstrip("-") for key in self.ordering]
+
+    def get_queryset_resolver(self):
+        return partial(super().get_queryset_resolver(), required=self.key_fields)
+
+    def wrap_resolve(self, parent_resolver):
+        return partial(
+            self.connection_resolver,
+            self.resolver or parent_resolver,
+            self.connection_type,
+            self.get_manager(),
+            self.get_queryset_resolver(),
+            self.max_limit,
+            self.enforce_first_or_last,
+            self.ordering,
+        )
+
+    @classmethod
+    def connection_resolver(cls, resolver, connection, default_manager, queryset_resolver,
+                            max_limit, enforce_first_or_last, ordering, root, info, **args):
+        first = args.get("first")
+        last = args.get("last")
+        after = args.get("after")
+        before = args.get("before")
+
+        if enforce_first_or_last:
+            assert first or last, (
+                "You must provide a `first` or `last` value to properly paginate the `{}` connection."
+            ).format(info.field_name)
+
+        if max_limit:
+            if first:
+                assert first <= max_limit, (
+                    "Requesting {} records on the `{}` connection exceeds the `first` limit of {} records."
+                ).format(first, info.field_name, max_limit)
+            if last:
+                assert last <= max_limit, (
+                    "Requesting {} records on the `{}` connection exceeds the `last` limit of {} records."
+                ).format(last, info.field_name, max_limit)
+            if first is None and last is None:
+                first = max_limit
+
+        iterable = resolver(root, info, **args)
+        if iterable is None:
+            iterable = default_manager
+        queryset = queryset_resolver(connection, iterable, info, args)
+        if SEARCH_RANK in queryset.query.annotations:
+            ordering = [f"-{SEARCH_RANK}", *ordering]
+
+        key_fields = [key.lstrip("-") for key in ordering]
+        page = queryset
+        if after:
+            page = page.filter(keyset_filter(ordering, decode_cursor(after, len(ordering))))
+        if before:
+            page = page.filter(
+                keyset_filter(ordering, decode_cursor(before, len(ordering)), forward=False)
+            )
+
+        if last is not None and first is None:
+            rows = page.order_by(*reverse_ordering(ordering))[: last + 1]
+        else:
+            rows = page.order_by(*ordering)[: first + 1]
+
+        def build(nodes):
+            return cls.build_connection(
+                connection, queryset, nodes, key_fields, first, last, after, before, info
+            )
+
+        if is_async(info):
+            async def resolve_async():
+                return build([node async for node in rows])
+            return resolve_async()
+        return build(list(rows))
+
+    @classmethod
+    def build_connection(cls, connection, queryset, nodes, key_fields, first, last, after, before,
+                         info):
+        has_previous_page = bool(after)
+        has_next_page = bool(before)
+        if last is not None and first is None:
+            has_previous_page = len(nodes) > last
+            nodes = nodes[:last][::-1]
+        else:
+            has_next_page = len(nodes) > first
+            nodes = nodes[:first]
+            if last is not None and len(nodes) > last:
+                nodes = nodes[-last:]
+                has_previous_page = True
+
+        edges = [
+            connection.Edge(
+                node=node,
+                cursor=encode_cursor([getattr(node, field) for field in key_fields]),
+            )
+            for node in nodes
+        ]
+        result = connection(
+            edges=edges,
+            page_info=PageInfo(
+                start_cursor=edges[0].cursor if edges else None,
+                end_cursor=edges[-1].cursor if edges else None,
+                has_previous_page=has_previous_page,
+                has_next_page=has_next_page,
+            ),
+        )
+        result.iterable = queryset
+        prime(info, nodes)
+        return result
@@ -1,20 +1,33 @@
 import django_filters
 from .models import Customer, Product, Order
 from django.db.models import Q
+from .search import search
+
+
+# -----------------------------
+# Search Filter
+# -----------------------------
+class SearchFilterMixin:
+    """
+    Adds a `search` argument served by the search backend. Customers and
+    products are annotated with `search_rank` for ranked ordering.
+    """
+
+    def filter_search(self, queryset, name, value):
+        return search(queryset, value)
 
 # -----------------------------
 # Customer Filter
 # -----------------------------
-class CustomerFilter(django_filters.FilterSet):
+class CustomerFilter(SearchFilterMixin, django_filters.FilterSet):
+    search = django_filters.CharFilter(method="filter_search")
     name = django_filters.CharFilter(field_name="name", lookup_expr="icontains")
     email = django_filters.CharFilter(field_name="email", lookup_expr="icontains")
-    created_at_gte = django_filters.DateFilter(field_name="created_at", lookup_expr="gte")
-    created_at_lte = django_filters.DateFilter(field_name="created_at", lookup_expr="lte")
     phone_pattern = django_filters.CharFilter(method="filter_phone_pattern")
 
     class Meta:
         model = Customer
-        fields = ["name", "email", "created_at_gte", "created_at_lte", "phone_pattern"]
+        fields = ["search", "name", "email", "phone_pattern"]
 
     def filter_phone_pattern(self, queryset, name, value):
         return queryset.filter(phone__startswith=value)
@@ -23,7 +36,8 @@ class CustomerFilter(django_filters.FilterSet):
 # -----------------------------
 # Product Filter
 # -----------------------------
-class ProductFilter(django_filters.FilterSet):
+class ProductFilter(SearchFilterMixin, django_filters.FilterSet):
+    search = django_filters.CharFilter(method="filter_search")
     name = django_filters.CharFilter(field_name="name", lookup_expr="icontains")
     price_gte = django_filters.NumberFilter(field_name="price", lookup_expr="gte")
     price_lte = django_filters.NumberFilter(field_name="price", lookup_expr="lte")
@@ -33,7 +47,7 @@ class ProductFilter(django_filters.FilterSet):
 
     class Meta:
         model = Product
-        fields = ["name", "price_gte", "price_lte", "stock_gte", "stock_lte", "low_stock"]
+        fields = ["search", "name", "price_gte", "price_lte", "stock_gte", "stock_lte", "low_stock"]
 
     def filter_low_stock(self, queryset, name, value):
         if value:
@@ -44,7 +58,8 @@ class ProductFilter(django_filters.FilterSet):
 # -----------------------------
 # Order Filter
 # -----------------------------
-class OrderFilter(django_filters.FilterSet):
+class OrderFilter(SearchFilterMixin, django_filters.FilterSet):
+    search = django_filters.CharFilter(method="filter_search")
     total_amount_gte = django_filters.NumberFilter(field_name="total_amount", lookup_expr="gte")
     total_amount_lte = django_filters.NumberFilter(field_name="total_amount", lookup_expr="lte")
     order_date_gte = django_filters.DateFilter(field_name="order_date", lookup_expr="gte")
@@ -55,10 +70,15 @@ class OrderFilter(django_filters.FilterSet):
 
     class Meta:
         model = Order
-        fields = ["total_amount_gte", "total_amount_lte", "order_date_gte", "order_date_lte", "customer_name", "product_name", "product_id"]
+        fields = ["search", "total_amount_gte", "total_amount_lte", "order_date_gte", "order_date_lte", "customer_name", "product_name", "product_id"]
 
+    # Subqueries on the order/product table avoid a join plus .distinct().
     def filter_by_product_name(self, queryset, name, value):
-        return queryset.filter(products__name__icontains=value).distinct()
+        through = Order.products.through
+        return queryset.filter(
+            pk__in=through.objects.filter(product__name__icontains=value).values("order_id")
+        )
 
     def filter_by_product_id(self, queryset, name, value):
-        return queryset.filter(products__id=value).distinct()
+        through = Order.products.through
+        return queryset.filter(pk__in=through.objects.filter(product_id=value).values("order_id"))
@@ -0,0 +1,331 @@
+import threading
+import time
+from bisect import bisect_left
+from contextlib import ExitStack, asynccontextmanager, contextmanager
+from inspect import isawaitable
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connections
+
+# -----------------------------
+# Configuration
+# -----------------------------
+DEFAULTS = {
+    "ENABLED": True,
+    # Add the per-field trace to the response extensions.
+    "EXTENSIONS": False,
+    # Histogram upper bounds, in seconds and in queries.
+    "DURATION_BUCKETS": (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+    "QUERY_BUCKETS": (0, 1, 2, 5, 10, 25, 50, 100, 250),
+    # Client addresses allowed to scrape /metrics without a staff login.
+    "METRICS_ALLOWED_IPS": ("127.0.0.1", "::1"),
+}
+
+TRACE_ATTR = "graphql_trace"
+
+
+def get_config():
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, "GRAPHQL_INSTRUMENTATION", {}))
+    return config
+
+
+# -----------------------------
+# Prometheus Histograms
+# -----------------------------
+def format_labels(labels):
+    def escape(value):
+        return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+    return ",".join(f'{name}="{escape(value)}"' for name, value in labels)
+
+
+def format_value(value):
+    return "+Inf" if value == float("inf") else repr(float(value))
+
+
+class Histogram:
+    """
+    Cumulative histogram with one series per label set, rendered in the
+    Prometheus text exposition format.
+    """
+
+    def __init__(self, name, documentation, buckets, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        self.labelnames = tuple(labelnames)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(labels[name] for name in self.labelnames)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * len(self.buckets), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self):
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} histogram",
+        ]
+        with self._lock:
+            series = sorted((key, [list(s[0]), s[1], s[2]]) for key, s in self._series.items())
+        for key, (counts, total, count) in series:
+            labels = list(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, n in zip(self.buckets, counts):
+                cumulative += n
+                bucket_labels = format_labels(labels + [("le", format_value(bound))])
+                lines.append(f"{self.name}_bucket{{{bucket_labels}}} {cumulative}")
+            suffix = f"{{{format_labels(labels)}}}" if labels else ""
+            lines.append(f"{self.name}_sum{suffix} {format_value(total)}")
+            lines.append(f"{self.name}_count{suffix} {count}")
+        return "\n".join(lines)
+
+
+class MetricsRegistry:
+    """Process-wide set of histograms, exported by `MetricsView`."""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def histogram(self, name, documentation, buckets, labelnames=()):
+        with self._lock:
+            if name not in self._metrics:
+                self._metrics[name] = Histogram(name, documentation, buckets, labelnames)
+            return self._metrics[name]
+
+    def clear(self):
+        with self._lock:
+            self._metrics.clear()
+
+    def render(self):
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return "".join(metric.render() + "\n" for metric in metrics)
+
+
+registry = MetricsRegistry()
+
+
+def record_metrics(trace, config):
+    durations = config["DURATION_BUCKETS"]
+    queries = config["QUERY_BUCKETS"]
+    labels = {"operation": trace.operation}
+
+    registry.histogram(
+        "crm_graphql_request_duration_seconds",
+        "Time spent executing a GraphQL operation.",
+        durations, ["operation"],
+    ).observe(trace.duration, **labels)
+    registry.histogram(
+        "crm_graphql_request_sql_queries",
+        "SQL queries issued by a GraphQL operation.",
+        queries, ["operation"],
+    ).observe(trace.sql_count, **labels)
+
+    resolver_seconds = registry.histogram(
+        "crm_graphql_resolver_duration_seconds",
+        "Time spent in a field's resolver per operation, summed over its calls.",
+        durations, ["field"],
+    )
+    field_queries = registry.histogram(
+        "crm_graphql_field_sql_queries",
+        "SQL queries issued under a field per operation.",
+        queries, ["field"],
+    )
+    field_sql_seconds = registry.histogram(
+        "crm_graphql_field_sql_duration_seconds",
+        "Time spent in SQL issued under a field per operation.",
+        durations, ["field"],
+    )
+    for field, stats in trace.fields.items():
+        resolver_seconds.observe(stats.duration, field=field)
+        field_queries.observe(stats.sql_count, field=field)
+        field_sql_seconds.observe(stats.sql_duration, field=field)
+
+
+# -----------------------------
+# Request Traces
+# -----------------------------
+class FieldStats:
+    __slots__ = ("calls", "duration", "sql_count", "sql_duration")
+
+    def __init__(self):
+        self.calls = 0
+        self.duration = 0.0
+        self.sql_count = 0
+        self.sql_duration = 0.0
+
+
+class RequestTrace:
+    """
+    Resolver and SQL timings for one operation, keyed by "Type.field".
+
+    SQL is charged to the field whose resolver started most recently. That
+    covers querysets a resolver returns lazily, which are evaluated as the
+    field's value is completed, before any child resolver starts. Under
+    the async view concurrent resolvers interleave, so the split between
+    sibling fields is approximate there; request totals are exact.
+    """
+
+    def __init__(self, operation):
+        self.operation = operation
+        self.fields = {}
+        self.current = None
+        self.duration = 0.0
+        self.sql_count = 0
+        self.sql_duration = 0.0
+
+    def stats(self, field):
+        stats = self.fields.get(field)
+        if stats is None:
+            stats = self.fields[field] = FieldStats()
+        return stats
+
+    def add_call(self, field, duration):
+        stats = self.stats(field)
+        stats.calls += 1
+        stats.duration += duration
+
+    async def timed(self, field, awaitable):
+        start = time.perf_counter()
+        try:
+            return await awaitable
+        finally:
+            self.stats(field).duration += time.perf_counter() - start
+
+    def __call__(self, execute, sql, params, many, context):
+        # Installed with connection.execute_wrapper() for the operation.
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - start
+            self.sql_count += 1
+            self.sql_duration += duration
+            if self.current is not None:
+                stats = self.stats(self.current)
+                stats.sql_count += 1
+                stats.sql_duration += duration
+
+    def report(self):
+        fields = sorted(
+            self.fields.items(),
+            key=lambda item: (item[1].sql_count, item[1].duration),
+            reverse=True,
+        )
+        return {
+            "durationMs": round(self.duration * 1000, 3),
+            "sql": {"count": self.sql_count, "durationMs": round(self.sql_duration * 1000, 3)},
+            "fields": [
+                {
+                    "field": field,
+                    "calls": stats.calls,
+                    "durationMs": round(stats.duration * 1000, 3),
+                    "sqlCount": stats.sql_count,
+                    "sqlDurationMs": round(stats.sql_duration * 1000, 3),
+                }
+                for field, stats in fields
+            ],
+        }
+
+
+def start_trace(context, operation_ast):
+    """
+    Attach a new trace to the request context, or return None when
+    instrumentation is disabled.
+    """
+    if not get_config()["ENABLED"]:
+        return None
+    operation = operation_ast.operation.value if operation_ast is not None else "unknown"
+    trace = RequestTrace(operation)
+    if isinstance(context, dict):
+        context[TRACE_ATTR] = trace
+    else:
+        setattr(context, TRACE_ATTR, trace)
+    return trace
+
+
+def get_trace(info):
+    context = info.context
+    if isinstance(context, dict):
+        return context.get(TRACE_ATTR)
+    return getattr(context, TRACE_ATTR, None)
+
+
+@contextmanager
+def tracing(trace):
+    """
+    Count the SQL issued on every connection while the operation runs, then
+    record the trace in the histograms. A no-op for a None trace.
+    """
+    if trace is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(trace))
+            yield
+    finally:
+        trace.duration = time.perf_counter() - start
+        record_metrics(trace, get_config())
+
+
+@asynccontextmanager
+async def async_tracing(trace):
+    """
+    `tracing` for the async view. Connections are per thread, so the SQL
+    wrappers are installed in the thread the async ORM runs queries on.
+    """
+    if trace is None:
+        yield
+        return
+    stack = ExitStack()
+    await sync_to_async(stack.enter_context)(tracing(trace))
+    try:
+        yield
+    finally:
+        await sync_to_async(stack.close)()
+
+
+def trace_extensions(trace, extensions):
+    """Add the trace report to the response extensions when configured."""
+    if trace is None or not get_config()["EXTENSIONS"]:
+        return extensions
+    return {**(extensions or {}), "trace": trace.report()}
+
+
+# -----------------------------
+# Middleware
+# -----------------------------
+class InstrumentationMiddleware:
+    """
+    Graphene middleware timing every resolver of a traced operation. Does
+    nothing for operations executed without a trace (e.g. scheduled jobs).
+    """
+
+    def resolve(self, next, root, info, **args):
+        trace = get_trace(info)
+        if trace is None or info.field_name.startswith("__"):
+            return next(root, info, **args)
+
+        field = f"{info.parent_type.name}.{info.field_name}"
+        trace.current = field
+        start = time.perf_counter()
+        try:
+            result = next(root, info, **args)
+        finally:
+            trace.add_call(field, time.perf_counter() - start)
+        if isawaitable(result):
+            return trace.timed(field, result)
+        return result
@@ -0,0 +1,226 @@
+import atexit
+import json
+import logging
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from logging.handlers import MemoryHandler, QueueHandler, QueueListener, RotatingFileHandler
+
+from django.conf import settings
+
+# -----------------------------
+# Configuration
+# -----------------------------
+DEFAULTS = {
+    "PATH": "/tmp/crm_jobs.log",
+    # Rotate once the file reaches MAX_BYTES, keeping BACKUP_COUNT old files.
+    "MAX_BYTES": 10 * 1024 * 1024,
+    "BACKUP_COUNT": 5,
+    # Records held in memory before a write; errors flush immediately.
+    "BUFFER_SIZE": 100,
+    # Hand records to a background writer thread instead of writing inline.
+    "USE_QUEUE": False,
+}
+
+LOGGER_NAME = "crm.jobs"
+
+# How long a flush waits for the background writer.
+FLUSH_TIMEOUT = 5
+
+_configured = False
+_lock = threading.Lock()
+# The buffer in front of the file and, with USE_QUEUE, the queue and the
+# listener thread that feed it.
+_buffer = None
+_records = None
+_listener = None
+
+
+def get_config():
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, "CRM_JOB_LOG", {}))
+    return config
+
+
+class JSONLinesFormatter(logging.Formatter):
+    """
+    One JSON object per line. Fields passed as `extra={"fields": {...}}` are
+    merged in without replacing the standard keys.
+    """
+
+    def format(self, record):
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in getattr(record, "fields", {}).items():
+            entry.setdefault(key, value)
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class FlushRequest(logging.LogRecord):
+    """A flush sent down the queue, so it reaches the buffer after the records before it."""
+
+    def __init__(self):
+        super().__init__(LOGGER_NAME, logging.INFO, __file__, 0, "flush", None, None)
+        self.done = threading.Event()
+
+
+class JobLogBuffer(MemoryHandler):
+    """MemoryHandler that flushes on a FlushRequest instead of buffering it."""
+
+    def handle(self, record):
+        if isinstance(record, FlushRequest):
+            self.flush()
+            record.done.set()
+            return True
+        return super().handle(record)
+
+
+class LocalQueueHandler(QueueHandler):
+    """
+    Queues records as they are. The queue never leaves the process, so the
+    JSON formatter on the listener still gets `fields` and `exc_info`.
+    """
+
+    def prepare(self, record):
+        return record
+
+
+def get_job_logger():
+    """
+    The `crm.jobs` logger, writing JSON lines to a size-rotated file through
+    a memory buffer, so a job keeps one file handle open and writes in blocks.
+    """
+    global _configured, _buffer, _records, _listener
+    logger = logging.getLogger(LOGGER_NAME)
+    if _configured:
+        return logger
+
+    with _lock:
+        if _configured:
+            return logger
+        config = get_config()
+        file_handler = RotatingFileHandler(
+            config["PATH"],
+            maxBytes=config["MAX_BYTES"],
+            backupCount=config["BACKUP_COUNT"],
+            delay=True,
+        )
+        file_handler.setFormatter(JSONLinesFormatter())
+        _buffer = JobLogBuffer(
+            config["BUFFER_SIZE"], flushLevel=logging.ERROR, target=file_handler
+        )
+
+        if config["USE_QUEUE"]:
+            _records = queue.SimpleQueue()
+            _listener = QueueListener(_records, _buffer)
+            _listener.start()
+            logger.addHandler(LocalQueueHandler(_records))
+        else:
+            logger.addHandler(_buffer)
+
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+        _configured = True
+    return logger
+
+
+def flush_job_logs():
+    """
+    Write out the buffered records. With USE_QUEUE the flush goes through
+    the queue, so records still queued ahead of it are written too; this
+    waits up to FLUSH_TIMEOUT seconds for the listener to get there.
+    """
+    get_job_logger()
+    if _listener is not None:
+        request = FlushRequest()
+        _records.put(request)
+        request.done.wait(FLUSH_TIMEOUT)
+    else:
+        _buffer.flush()
+
+
+def close_job_logs():
+    """
+    Stop the listener first, which drains the queue into the buffer, then
+    flush and close the buffer and the file. Runs at exit.
+    """
+    global _configured, _buffer, _records, _listener
+    with _lock:
+        if not _configured:
+            return
+        if _listener is not None:
+            _listener.stop()
+        target = _buffer.target
+        _buffer.close()
+        target.close()
+        logger = logging.getLogger(LOGGER_NAME)
+        for handler in list(logger.handlers):
+            logger.removeHandler(handler)
+        _configured, _buffer, _records, _listener = False, None, None, None
+
+
+atexit.register(close_job_logs)
+
+
+# -----------------------------
+# Job Runs
+# -----------------------------
+class JobRun:
+    """Counters and fields collected while a job runs."""
+
+    def __init__(self, name, logger):
+        self.name = name
+        self.logger = logger
+        self.rows = {}
+        self.fields = {}
+
+    def count(self, key, n=1):
+        self.rows[key] = self.rows.get(key, 0) + n
+
+    def record(self, **fields):
+        self.fields.update(fields)
+
+    def log(self, message, level=logging.INFO, **fields):
+        self.logger.log(level, message, extra={"fields": {"job": self.name, **fields}})
+
+
+@contextmanager
+def job_run(name):
+    """
+    Time a job and log one summary record with its status, duration, row
+    counts and recorded fields. An exception is logged with its traceback
+    and re-raised.
+    """
+    logger = get_job_logger()
+    run = JobRun(name, logger)
+    start = time.perf_counter()
+    status = "ok"
+    try:
+        yield run
+    except Exception:
+        status = "error"
+        logger.exception(
+            f"{name} failed",
+            extra={"fields": {"job": name, "rows": run.rows, **run.fields}},
+        )
+        raise
+    finally:
+        logger.info(
+            f"{name} finished",
+            extra={"fields": {
+                "job": name,
+                "status": status,
+                "duration_ms": round((time.perf_counter() - start) * 1000, 3),
+                "rows": run.rows,
+                **run.fields,
+            }},
+        )
+        flush_job_logs()
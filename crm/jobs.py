@@ -0,0 +1,96 @@
+import threading
+from functools import lru_cache
+
+from django.conf import settings
+from graphql import execute
+
+from .persisted_queries import get_document
+
+# -----------------------------
+# Job Runtime
+# -----------------------------
+class JobError(Exception):
+    """A job's GraphQL operation returned errors."""
+
+    def __init__(self, errors):
+        self.errors = errors
+        super().__init__("; ".join(str(error) for error in errors))
+
+
+class JobContext:
+    """Stands in for the request as the resolver context; holds the loaders."""
+
+
+class LocalJobRuntime:
+    """
+    Runs operations against the schema in this process. Documents come from
+    the parsed/validated document cache, so a scheduled job costs neither
+    an HTTP round trip nor an introspection query.
+    """
+
+    def __init__(self, schema=None):
+        if schema is None:
+            from alx_backend_graphql_crm.schema import schema
+        self.schema = schema.graphql_schema
+
+    def execute(self, query, variables=None):
+        document, errors = get_document(self.schema, query)
+        if errors:
+            raise JobError(errors)
+        result = execute(
+            self.schema, document, context_value=JobContext(), variable_values=variables
+        )
+        if result.errors:
+            raise JobError(result.errors)
+        return result.data
+
+
+class RemoteJobRuntime:
+    """
+    Runs operations against a GraphQL endpoint through one gql session per
+    process, so the HTTP connection is pooled across runs. The schema is
+    never fetched from the server.
+    """
+
+    def __init__(self, url, timeout=10):
+        from gql import Client
+        from gql.transport.requests import RequestsHTTPTransport
+
+        self.client = Client(
+            transport=RequestsHTTPTransport(url=url, retries=3, timeout=timeout),
+            fetch_schema_from_transport=False,
+        )
+        self._session = None
+        self._lock = threading.Lock()
+
+    @property
+    def session(self):
+        with self._lock:
+            if self._session is None:
+                self._session = self.client.connect_sync()
+            return self._session
+
+    def execute(self, query, variables=None):
+        from gql import GraphQLRequest
+
+        return self.session.execute(
+            GraphQLRequest(parse_request(query), variable_values=variables)
+        )
+
+
+@lru_cache(maxsize=None)
+def parse_request(query):
+    from gql import gql
+    return gql(query).document
+
+
+@lru_cache(maxsize=None)
+def get_runtime():
+    """
+    The process-wide job runtime: remote when CRM_JOBS_GRAPHQL_URL is set,
+    otherwise in-process.
+    """
+    url = getattr(settings, "CRM_JOBS_GRAPHQL_URL", None)
+    if url:
+        return RemoteJobRuntime(url, getattr(settings, "CRM_JOBS_GRAPHQL_TIMEOUT", 10))
+    return LocalJobRuntime()
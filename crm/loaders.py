@@ -0,0 +1,221 @@
+import asyncio
+from collections import defaultdict
+
+from .async_utils import is_async
+from .models import Customer, Product, Order
+
+# -----------------------------
+# DataLoader
+# -----------------------------
+class DataLoader:
+    """
+    Per-request batch loader.
+
+    Keys are queued with `prime()` as parent objects are materialised, and the
+    first `load()` miss fetches every queued key with a single batch call.
+    Results are cached for the rest of the request and handed to `on_load`
+    so that nested relations can be queued in turn.
+    """
+
+    def __init__(self, batch_load_fn, default=None, on_load=None):
+        self.batch_load_fn = batch_load_fn
+        self.default = default
+        self.on_load = on_load
+        self._cache = {}
+        self._queue = {}
+
+    def prime(self, keys):
+        for key in keys:
+            if key is not None and key not in self._cache:
+                self._queue[key] = None
+
+    def load(self, key):
+        if key not in self._cache:
+            self._queue[key] = None
+            self.dispatch()
+        return self._cache[key]
+
+    def load_many(self, keys):
+        self.prime(keys)
+        return [self.load(key) for key in keys]
+
+    def dispatch(self):
+        keys = list(self._queue)
+        self._queue = {}
+        if not keys:
+            return
+        self.store(keys, self.batch_load_fn(keys).evaluate(None))
+
+    def store(self, keys, results):
+        for key in keys:
+            value = results.get(key)
+            if value is None and self.default is not None:
+                value = self.default()
+            self._cache[key] = value
+        if self.on_load is not None:
+            self.on_load(results.values())
+
+
+class AsyncDataLoader(DataLoader):
+    """
+    DataLoader for the async view. `load()` returns a future; keys requested
+    during the same event loop tick are fetched together by one batch query
+    through the async ORM.
+    """
+
+    def __init__(self, batch_load_fn, default=None, on_load=None):
+        super().__init__(batch_load_fn, default=default, on_load=on_load)
+        self._futures = {}
+        self._scheduled = False
+        # The event loop only keeps weak references to tasks.
+        self._tasks = set()
+
+    def load(self, key):
+        if key in self._cache:
+            return self._cache[key]
+        if key not in self._futures:
+            self._futures[key] = asyncio.get_running_loop().create_future()
+            self._queue[key] = None
+            if not self._scheduled:
+                self._scheduled = True
+                asyncio.get_running_loop().call_soon(self.schedule_dispatch)
+        return self._futures[key]
+
+    def schedule_dispatch(self):
+        task = asyncio.ensure_future(self.dispatch_async())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def dispatch_async(self):
+        self._scheduled = False
+        keys = list(self._queue)
+        self._queue = {}
+        futures = {key: self._futures.pop(key) for key in keys if key in self._futures}
+        try:
+            query = self.batch_load_fn(keys)
+            self.store(keys, query.evaluate([row async for row in query.queryset]))
+        except Exception as e:
+            for future in futures.values():
+                future.set_exception(e)
+            return
+        for key, future in futures.items():
+            future.set_result(self._cache[key])
+
+
+# -----------------------------
+# Batch functions
+# -----------------------------
+class BatchQuery:
+    """
+    A batch lookup as a lazy queryset plus how to key its rows, so the same
+    batch runs on the sync ORM or the async ORM.
+    """
+
+    def __init__(self, queryset, key, value=None, many=True):
+        self.queryset = queryset
+        self.key = key
+        self.value = value or (lambda row: row)
+        self.many = many
+
+    def evaluate(self, rows):
+        if rows is None:
+            rows = list(self.queryset)
+        if not self.many:
+            return {self.key(row): self.value(row) for row in rows}
+        grouped = defaultdict(list)
+        for row in rows:
+            grouped[self.key(row)].append(self.value(row))
+        return grouped
+
+
+def batch_customers(keys):
+    return BatchQuery(Customer.objects.filter(pk__in=keys), key=lambda c: c.pk, many=False)
+
+
+def batch_products_by_order(keys):
+    rows = Order.products.through.objects.filter(order_id__in=keys).select_related("product")
+    return BatchQuery(rows.order_by("pk"), key=lambda row: row.order_id, value=lambda row: row.product)
+
+
+def batch_orders_by_customer(keys):
+    rows = Order.objects.filter(customer_id__in=keys).order_by("pk")
+    return BatchQuery(rows, key=lambda order: order.customer_id)
+
+
+def batch_orders_by_product(keys):
+    rows = Order.products.through.objects.filter(product_id__in=keys).select_related("order")
+    return BatchQuery(rows.order_by("pk"), key=lambda row: row.product_id, value=lambda row: row.order)
+
+
+# -----------------------------
+# Request-scoped registry
+# -----------------------------
+class Loaders:
+    """All loaders used while resolving one GraphQL request."""
+
+    def __init__(self, loader_class=DataLoader):
+        self.customer = loader_class(batch_customers, on_load=self.prime)
+        self.order_products = loader_class(batch_products_by_order, default=list, on_load=self.prime_lists)
+        self.customer_orders = loader_class(batch_orders_by_customer, default=list, on_load=self.prime_lists)
+        self.product_orders = loader_class(batch_orders_by_product, default=list, on_load=self.prime_lists)
+
+    def prime(self, instances):
+        """
+        Queue the relation keys of freshly fetched model instances so that
+        their nested fields are loaded together on first access. Columns
+        pruned by `.only()` are skipped rather than loaded row by row.
+        """
+        for instance in instances:
+            if isinstance(instance, Order):
+                if "customer_id" in instance.__dict__:
+                    self.customer.prime([instance.customer_id])
+                self.order_products.prime([instance.pk])
+            elif isinstance(instance, Customer):
+                self.customer_orders.prime([instance.pk])
+            elif isinstance(instance, Product):
+                self.product_orders.prime([instance.pk])
+
+    def prime_lists(self, groups):
+        for instances in groups:
+            self.prime(instances)
+
+
+LOADERS_ATTR = "_crm_loaders"
+
+
+def get_loaders(info):
+    """
+    Return the loaders attached to the request in `info.context`, creating
+    them on first use. Without a context every call gets a fresh registry.
+    """
+    context = info.context
+    loader_class = AsyncDataLoader if is_async(info) else DataLoader
+    if context is None:
+        return Loaders(loader_class)
+    if isinstance(context, dict):
+        if LOADERS_ATTR not in context:
+            context[LOADERS_ATTR] = Loaders(loader_class)
+        return context[LOADERS_ATTR]
+    loaders = getattr(context, LOADERS_ATTR, None)
+    if loaders is None:
+        loaders = Loaders(loader_class)
+        setattr(context, LOADERS_ATTR, loaders)
+    return loaders
+
+
+def prime(info, instances):
+    instances = list(instances)
+    get_loaders(info).prime(instances)
+    return instances
+
+
+def fetch(info, queryset):
+    """
+    Evaluate a root queryset and prime the loaders with its rows, through the
+    async ORM when the request is served by the async view.
+    """
+    if is_async(info):
+        async def fetch_async():
+            return prime(info, [instance async for instance in queryset])
+        return fetch_async()
+    return prime(info, queryset)
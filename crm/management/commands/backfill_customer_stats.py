@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from crm.models import Customer
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute last_order_at, order_count and lifetime_value for every "
+        "customer from the orders table, one primary-key batch per transaction."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        last_pk = 0
+        updated = 0
+        while True:
+            pks = list(
+                Customer.objects.filter(pk__gt=last_pk)
+                .order_by("pk")
+                .values_list("pk", flat=True)[:batch_size]
+            )
+            if not pks:
+                break
+            updated += Customer.objects.filter(pk__in=pks).refresh_order_stats()
+            last_pk = pks[-1]
+        self.stdout.write(self.style.SUCCESS(f"Backfilled order stats for {updated} customers."))
@@ -0,0 +1,132 @@
+import json
+import platform
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings
+from django.utils import timezone
+
+from crm.benchmarks import Dataset, get_commit, get_operations, measure
+from crm.datagen import generate
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a throwaway test database and time a fixed catalogue of GraphQL "
+        "queries, mutations and scheduled jobs through the real schema. "
+        "Reports latency percentiles, SQL query counts and peak memory per "
+        "operation as JSON; --compare prints the change against an earlier "
+        "report."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--customers", type=int, default=1000)
+        parser.add_argument("--products", type=int, default=100)
+        parser.add_argument("--orders", type=int, default=5000)
+        parser.add_argument("--seed", type=int, default=0, help="Random seed for the dataset.")
+        parser.add_argument("--repeat", type=int, default=20, help="Timed runs per operation.")
+        parser.add_argument("--warmup", type=int, default=2, help="Untimed runs per operation.")
+        parser.add_argument(
+            "--operation", action="append", dest="operations",
+            help="Run only operations whose name contains this text. Repeatable.",
+        )
+        parser.add_argument(
+            "--existing", action="store_true",
+            help="Benchmark the configured database as it is, without seeding. "
+                 "Writes are still rolled back.",
+        )
+        parser.add_argument("--output", help="Write the JSON report to this file.")
+        parser.add_argument("--compare", help="Earlier JSON report to compare against.")
+
+    def handle(self, *args, **options):
+        operations = get_operations()
+        if options["operations"]:
+            operations = [
+                operation for operation in operations
+                if any(text in operation.name for text in options["operations"])
+            ]
+            if not operations:
+                raise CommandError("No operation matches --operation.")
+
+        baseline = self.load_report(options["compare"]) if options["compare"] else None
+
+        old_name = None
+        if not options["existing"]:
+            old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            # Reminder emails go to memory instead of an SMTP server.
+            with override_settings(EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend"):
+                if not options["existing"]:
+                    self.stderr.write("Seeding dataset...")
+                    generate(
+                        options["customers"], options["products"], options["orders"],
+                        seed=options["seed"],
+                    )
+                report = self.run(operations, options)
+        finally:
+            if old_name is not None:
+                connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        output = json.dumps(report, indent=2)
+        if options["output"]:
+            with open(options["output"], "w") as f:
+                f.write(output + "\n")
+        else:
+            self.stdout.write(output)
+
+        if baseline is not None:
+            self.compare(baseline, report)
+
+    def run(self, operations, options):
+        dataset = Dataset()
+        results = []
+        for operation in operations:
+            self.stderr.write(f"{operation.kind:<9} {operation.name}")
+            try:
+                results.append(measure(operation, dataset, options["repeat"], options["warmup"]))
+            except Exception as e:
+                results.append({"name": operation.name, "kind": operation.kind, "error": str(e)})
+                self.stderr.write(self.style.ERROR(f"  failed: {e}"))
+
+        return {
+            "meta": {
+                "commit": get_commit(),
+                "timestamp": timezone.now().isoformat(),
+                "python": platform.python_version(),
+                "django": django.get_version(),
+                "database": connection.vendor,
+                "dataset": None if options["existing"] else {
+                    "customers": options["customers"],
+                    "products": options["products"],
+                    "orders": options["orders"],
+                    "seed": options["seed"],
+                },
+                "repeat": options["repeat"],
+                "warmup": options["warmup"],
+            },
+            "operations": results,
+        }
+
+    def load_report(self, path):
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            raise CommandError(f"Cannot read report {path}: {e}")
+
+    def compare(self, baseline, report):
+        before = {result["name"]: result for result in baseline["operations"]}
+        self.stderr.write(self.style.MIGRATE_HEADING(
+            f"Compared with {baseline['meta'].get('commit')} (p50 ms, SQL queries, peak KiB)"
+        ))
+        for result in report["operations"]:
+            old = before.get(result["name"])
+            if old is None or "error" in old or "error" in result:
+                continue
+            self.stderr.write(
+                f"{result['name']:<26}"
+                f" {old['latency_ms']['p50']:>9.3f} -> {result['latency_ms']['p50']:>9.3f}"
+                f" {old['sql_queries']['max']:>5} -> {result['sql_queries']['max']:<5}"
+                f" {old['peak_memory_bytes'] // 1024:>7} -> {result['peak_memory_bytes'] // 1024}"
+            )
@@ -0,0 +1,122 @@
+import json
+import os
+import platform
+import tempfile
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings
+from django.utils import timezone
+
+from crm.benchmarks import Dataset, get_commit, get_operations, run_concurrent
+from crm.datagen import generate
+from crm.db_connections import sqlite_pragmas
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a throwaway test database and run a mix of createOrder "
+        "mutations and orders queries from several threads at once, "
+        "reporting throughput, latency percentiles, errors such as "
+        "'database is locked', and how many connections were opened. "
+        "--untuned runs the same load with Django's defaults: a connection "
+        "per request, no SQLite PRAGMAs and deferred transactions."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--customers", type=int, default=1000)
+        parser.add_argument("--products", type=int, default=100)
+        parser.add_argument("--orders", type=int, default=2000)
+        parser.add_argument("--seed", type=int, default=0, help="Random seed for the dataset and mix.")
+        parser.add_argument("--threads", type=int, default=8)
+        parser.add_argument("--requests", type=int, default=50, help="Operations per thread.")
+        parser.add_argument(
+            "--writes", type=float, default=0.2,
+            help="Share of operations that are createOrder mutations.",
+        )
+        parser.add_argument(
+            "--untuned", action="store_true",
+            help="Use Django's default connection handling for comparison.",
+        )
+        parser.add_argument("--output", help="Write the JSON report to this file.")
+
+    def handle(self, *args, **options):
+        if not 0 <= options["writes"] <= 1:
+            raise CommandError("--writes must be between 0 and 1.")
+        operations = {operation.name: operation for operation in get_operations()}
+        mix = {
+            operations["createOrder"]: options["writes"],
+            operations["orders"]: 1 - options["writes"],
+        }
+
+        settings_dict = connection.settings_dict
+        saved = {
+            "CONN_MAX_AGE": settings_dict["CONN_MAX_AGE"],
+            "OPTIONS": settings_dict["OPTIONS"],
+            "TEST": settings_dict["TEST"],
+        }
+        overrides = {"EMAIL_BACKEND": "django.core.mail.backends.locmem.EmailBackend"}
+        if options["untuned"]:
+            settings_dict["CONN_MAX_AGE"] = 0
+            settings_dict["OPTIONS"] = {
+                key: value for key, value in settings_dict["OPTIONS"].items()
+                if key != "transaction_mode"
+            }
+            overrides["CRM_DB_CONNECTIONS"] = {"SQLITE_PRAGMAS": {}}
+
+        with tempfile.TemporaryDirectory() as directory, override_settings(**overrides):
+            if connection.vendor == "sqlite":
+                # The default in-memory test database is shared-cache, which
+                # locks whole tables; concurrency needs a real file.
+                settings_dict["TEST"] = dict(
+                    settings_dict["TEST"], NAME=os.path.join(directory, "benchmark.sqlite3")
+                )
+            old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+            try:
+                self.stderr.write("Seeding dataset...")
+                generate(
+                    options["customers"], options["products"], options["orders"],
+                    seed=options["seed"],
+                )
+                dataset = Dataset()
+                self.stderr.write(
+                    f"Running {options['threads']} threads x {options['requests']} operations..."
+                )
+                result = run_concurrent(
+                    mix, dataset, options["threads"], options["requests"], options["seed"]
+                )
+                report = {
+                    "meta": self.get_meta(options),
+                    **result,
+                }
+            finally:
+                connection.creation.destroy_test_db(old_name, verbosity=0)
+                settings_dict.update(saved)
+
+        output = json.dumps(report, indent=2)
+        if options["output"]:
+            with open(options["output"], "w") as f:
+                f.write(output + "\n")
+        else:
+            self.stdout.write(output)
+
+    def get_meta(self, options):
+        return {
+            "commit": get_commit(),
+            "timestamp": timezone.now().isoformat(),
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "database": connection.vendor,
+            "conn_max_age": connection.settings_dict["CONN_MAX_AGE"],
+            "transaction_mode": connection.settings_dict["OPTIONS"].get("transaction_mode"),
+            "sqlite_pragmas": sqlite_pragmas(connection) if connection.vendor == "sqlite" else None,
+            "dataset": {
+                "customers": options["customers"],
+                "products": options["products"],
+                "orders": options["orders"],
+                "seed": options["seed"],
+            },
+            "writes": options["writes"],
+            "untuned": options["untuned"],
+        }
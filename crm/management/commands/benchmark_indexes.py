@@ -0,0 +1,106 @@
+import datetime
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from crm.fields import keyset_filter
+from crm.filters import CustomerFilter, OrderFilter, ProductFilter
+from crm.models import Customer, Order, Product
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Time the CRM filter hot paths and print their query plans with the "
+        "model indexes in place and, inside a rolled-back transaction, "
+        "without them."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--repeat", type=int, default=20, help="Runs per query.")
+        parser.add_argument(
+            "--no-plans", action="store_true", help="Print timings only, not EXPLAIN output."
+        )
+
+    def handle(self, *args, **options):
+        workload = self.get_workload()
+        self.stdout.write(self.style.MIGRATE_HEADING("With indexes"))
+        after = self.measure(workload, options)
+
+        if not connection.features.can_rollback_ddl:
+            self.stdout.write(
+                self.style.WARNING(f"{connection.vendor} cannot roll back DDL; skipping baseline.")
+            )
+            return
+
+        self.stdout.write(self.style.MIGRATE_HEADING("Without indexes"))
+        # SQLite refuses schema changes in a transaction with FK checks on.
+        try:
+            with connection.constraint_checks_disabled(), transaction.atomic():
+                with connection.schema_editor(atomic=False) as editor:
+                    for model in (Customer, Product, Order):
+                        for index in model._meta.indexes:
+                            editor.remove_index(model, index)
+                before = self.measure(workload, options)
+                raise Rollback
+        except Rollback:
+            pass
+
+        self.stdout.write(self.style.MIGRATE_HEADING("Summary (median ms)"))
+        for label in workload:
+            self.stdout.write(
+                f"{label:<28} {before[label]:>10.3f} -> {after[label]:>10.3f}"
+            )
+
+    def get_workload(self):
+        """The queries behind the GraphQL filters, loaders and keyset pages."""
+        orders = Order.objects.order_by("order_date", "id")
+        count = orders.count()
+        if not count:
+            raise CommandError("No orders to benchmark; seed the database first.")
+        middle = orders.values("id", "order_date")[count // 2]
+        day = middle["order_date"].date()
+        top_total = (
+            Order.objects.order_by("-total_amount").values_list("total_amount", flat=True)
+        )[count // 100]
+        customer_ids = list(
+            Order.objects.values_list("customer_id", flat=True).distinct()[:100]
+        )
+        phone = Customer.objects.exclude(phone=None).values_list("phone", flat=True).first()
+
+        return {
+            "orders on one day": lambda: OrderFilter(
+                {"order_date_gte": day, "order_date_lte": day + datetime.timedelta(days=1)}
+            ).qs,
+            "top 1% orders by total": lambda: OrderFilter({"total_amount_gte": top_total}).qs,
+            "orders keyset page": lambda: orders.filter(
+                keyset_filter(["order_date", "id"], [middle["order_date"], middle["id"]])
+            )[:50],
+            "orders of customers": lambda: Order.objects.filter(
+                customer_id__in=customer_ids
+            ).order_by("customer_id", "order_date"),
+            "low stock products": lambda: ProductFilter({"low_stock": True}).qs,
+            "customers by phone prefix": lambda: CustomerFilter(
+                {"phone_pattern": (phone or "+1")[:4]}
+            ).qs,
+        }
+
+    def measure(self, workload, options):
+        timings = {}
+        for label, build in workload.items():
+            samples = []
+            for _ in range(options["repeat"]):
+                queryset = build()
+                start = time.perf_counter()
+                list(queryset)
+                samples.append((time.perf_counter() - start) * 1000)
+            timings[label] = statistics.median(samples)
+            self.stdout.write(f"{label}: {timings[label]:.3f} ms")
+            if not options["no_plans"]:
+                self.stdout.write(build().explain())
+        return timings
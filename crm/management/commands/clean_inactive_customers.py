@@ -0,0 +1,154 @@
+import json
+import os
+import time
+from datetime import datetime, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.utils import timezone
+
+from crm.job_logging import job_run
+from crm.models import Customer, Order, Product
+from crm.response_cache import invalidate_on_commit
+from crm.search import get_backend
+
+CHECKPOINT_FILE = "/tmp/clean_inactive_customers.checkpoint"
+
+
+def reverse_relations(model):
+    return {
+        field.related_model
+        for field in model._meta.get_fields(include_hidden=True)
+        if field.auto_created and not field.concrete and (field.one_to_many or field.one_to_one)
+    }
+
+
+def raw_cascade_is_safe():
+    """
+    The set-based delete handles exactly Customer -> Order -> order/product
+    rows. Any other relation (a new FK, PROTECT, SET_NULL) needs the ORM
+    collector.
+    """
+    return (
+        reverse_relations(Customer) == {Order}
+        and reverse_relations(Order) == {Order.products.through}
+    )
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete customers with no order in the last --days days, found through "
+        "the last_order_at index and deleted in bounded primary-key batches, "
+        "each in its own short transaction. Progress is checkpointed so an "
+        "interrupted run can --resume."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=365)
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--sleep", type=float, default=0.0,
+            help="Seconds to pause between batches so order writes can proceed.",
+        )
+        parser.add_argument("--checkpoint", default=CHECKPOINT_FILE)
+        parser.add_argument(
+            "--resume", action="store_true",
+            help="Continue from the checkpoint, with the cutoff of the interrupted run.",
+        )
+        parser.add_argument(
+            "--dry-run", action="store_true",
+            help="Count the customers and orders that would be deleted.",
+        )
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        using = options["database"]
+        state = self.load_checkpoint(options) if options["resume"] else None
+        if state is None:
+            cutoff = timezone.now() - timedelta(days=options["days"])
+            state = {"cutoff": cutoff.isoformat(), "last_pk": 0, "deleted": 0}
+        cutoff = datetime.fromisoformat(state["cutoff"])
+        inactive = Customer.objects.using(using).inactive(cutoff)
+
+        if options["dry_run"]:
+            customers = inactive.filter(pk__gt=state["last_pk"])
+            orders = Order.objects.using(using).filter(customer__in=customers.values("pk"))
+            self.stdout.write(
+                f"Would delete {customers.count()} customers and {orders.count()} orders "
+                f"with no order since {cutoff:%Y-%m-%d}."
+            )
+            return
+
+        delete_batch = self.delete_raw if raw_cascade_is_safe() else self.delete_collected
+        batch_size = options["batch_size"]
+        with job_run("clean_inactive_customers") as run:
+            run.record(cutoff=cutoff, resumed_from=state["last_pk"])
+            while True:
+                pks = list(
+                    inactive.filter(pk__gt=state["last_pk"])
+                    .order_by("pk")
+                    .values_list("pk", flat=True)[:batch_size]
+                )
+                if not pks:
+                    break
+                deleted = delete_batch(using, cutoff, pks)
+                state["deleted"] += deleted
+                state["last_pk"] = pks[-1]
+                run.count("customers", deleted)
+                run.count("batches")
+                self.save_checkpoint(options, state)
+                if options["sleep"]:
+                    time.sleep(options["sleep"])
+            run.record(total_deleted=state["deleted"])
+
+        if os.path.exists(options["checkpoint"]):
+            os.remove(options["checkpoint"])
+        self.stdout.write(str(state["deleted"]))
+
+    def delete_raw(self, using, cutoff, pks):
+        """
+        Delete one batch with three set-based DELETEs, children first,
+        without loading rows or sending per-row signals. The work of the
+        post_delete receivers is done once for the batch.
+        """
+        with transaction.atomic(using=using):
+            # Re-check inside the transaction in case an order just arrived;
+            # on PostgreSQL the row locks hold off new orders until commit.
+            customers = Customer.objects.using(using).inactive(cutoff).filter(pk__in=pks)
+            if connections[using].features.has_select_for_update:
+                customers = customers.select_for_update()
+            pks = list(customers.values_list("pk", flat=True))
+            if not pks:
+                return 0
+
+            through = Order.products.through
+            through.objects.using(using).filter(order__customer_id__in=pks)._raw_delete(using)
+            Order.objects.using(using).filter(customer_id__in=pks)._raw_delete(using)
+            deleted = Customer.objects.using(using).filter(pk__in=pks)._raw_delete(using)
+
+            get_backend(using).remove(Customer, pks)
+            invalidate_on_commit(Customer, Order, Product)
+        return deleted
+
+    def delete_collected(self, using, cutoff, pks):
+        """Delete one batch through the ORM collector, with signals."""
+        with transaction.atomic(using=using):
+            _, per_model = (
+                Customer.objects.using(using).inactive(cutoff).filter(pk__in=pks).delete()
+            )
+        return per_model.get(Customer._meta.label, 0)
+
+    def load_checkpoint(self, options):
+        try:
+            with open(options["checkpoint"]) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except ValueError:
+            raise CommandError(f"Unreadable checkpoint file {options['checkpoint']}")
+
+    def save_checkpoint(self, options, state):
+        tmp = options["checkpoint"] + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(state, f)
+        os.replace(tmp, options["checkpoint"])
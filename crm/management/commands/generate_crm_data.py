@@ -0,0 +1,88 @@
+import time
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+from django.utils import timezone
+
+from crm.datagen import generate
+from crm.models import Customer, Order, Product
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate a production-shaped CRM dataset: customers, products and "
+        "orders with Zipfian product popularity, seasonal order dates and "
+        "varying basket sizes, bulk-inserted in batches. The same --seed, "
+        "sizes and --end-date give the same data in an empty database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--customers", type=int, default=100000)
+        parser.add_argument("--products", type=int, default=5000)
+        parser.add_argument("--orders", type=int, default=1000000)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument(
+            "--end-date", type=datetime.fromisoformat,
+            help="Last day of the order history (YYYY-MM-DD). Defaults to today.",
+        )
+        parser.add_argument("--days", type=int, default=730, help="Days of order history.")
+        parser.add_argument(
+            "--zipf-exponent", type=float, default=1.1,
+            help="Skew of product popularity; higher concentrates orders on fewer products.",
+        )
+        parser.add_argument(
+            "--customer-skew", type=float, default=2.0,
+            help="Skew of orders per customer; 1 is uniform.",
+        )
+        parser.add_argument("--mean-basket", type=float, default=2.5)
+        parser.add_argument("--max-basket", type=int, default=10)
+        parser.add_argument(
+            "--clear", action="store_true",
+            help="Delete all existing customers, products and orders first.",
+        )
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        for name in ("customers", "products", "orders", "days", "batch_size"):
+            if options[name] < 0 or (name in ("days", "batch_size") and not options[name]):
+                raise CommandError(f"--{name.replace('_', '-')} must be positive.")
+        end = options["end_date"]
+        if end is not None and timezone.is_naive(end):
+            end = timezone.make_aware(end)
+
+        self.started = self.reported = time.monotonic()
+        generate(
+            options["customers"],
+            options["products"],
+            options["orders"],
+            clear=options["clear"],
+            seed=options["seed"],
+            batch_size=options["batch_size"],
+            end=end,
+            days=options["days"],
+            zipf_exponent=options["zipf_exponent"],
+            customer_skew=options["customer_skew"],
+            mean_basket=options["mean_basket"],
+            max_basket=options["max_basket"],
+            using=options["database"],
+            progress=self.progress,
+        )
+
+        using = options["database"]
+        self.stdout.write(self.style.SUCCESS(
+            f"Done in {time.monotonic() - self.started:.1f}s: "
+            f"{Customer.objects.using(using).count()} customers, "
+            f"{Product.objects.using(using).count()} products, "
+            f"{Order.objects.using(using).count()} orders."
+        ))
+
+    def progress(self, stage, done, total):
+        # At most one line a second per stage, plus its last batch.
+        now = time.monotonic()
+        if done < total and now - self.reported < 1:
+            return
+        self.reported = now
+        percent = 100 * done // total if total else 100
+        self.stdout.write(f"{stage}: {done}/{total} ({percent}%) {now - self.started:.1f}s")
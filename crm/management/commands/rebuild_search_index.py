@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from crm.search import get_backend
+
+
+class Command(BaseCommand):
+    help = "Re-create the CRM search index from the customer and product tables."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--database", default="default", help="Database alias to rebuild.")
+
+    def handle(self, *args, **options):
+        backend = get_backend(options["database"])
+        backend.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt search index with {type(backend).__name__}."))
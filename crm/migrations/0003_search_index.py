@@ -0,0 +1,22 @@
+from django.db import migrations
+
+
+def install_search_index(apps, schema_editor):
+    from crm.search import get_backend
+    get_backend(schema_editor.connection.alias).install(schema_editor)
+
+
+def uninstall_search_index(apps, schema_editor):
+    from crm.search import get_backend
+    get_backend(schema_editor.connection.alias).uninstall(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('crm', '0002_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(install_search_index, uninstall_search_index),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:30
+
+from django.db import migrations, models
+from django.db.models import Count, Max, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+
+def backfill_order_stats(apps, schema_editor):
+    """Compute the new columns for existing customers in one UPDATE."""
+    Customer = apps.get_model('crm', 'Customer')
+    Order = apps.get_model('crm', 'Order')
+    using = schema_editor.connection.alias
+    orders = (
+        Order.objects.using(using)
+        .filter(customer=OuterRef('pk')).order_by().values('customer')
+    )
+    Customer.objects.using(using).update(
+        order_count=Coalesce(Subquery(orders.annotate(n=Count('pk')).values('n')), 0),
+        lifetime_value=Coalesce(
+            Subquery(orders.annotate(total=Sum('total_amount')).values('total')), 0,
+            output_field=models.DecimalField(),
+        ),
+        last_order_at=Subquery(orders.annotate(latest=Max('order_date')).values('latest')),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('crm', '0003_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customer',
+            name='last_order_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='customer',
+            name='lifetime_value',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, max_digits=12),
+        ),
+        migrations.AddField(
+            model_name='customer',
+            name='order_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='customer',
+            index=models.Index(fields=['last_order_at'], name='crm_customer_last_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='customer',
+            index=models.Index(fields=['lifetime_value'], name='crm_customer_ltv_idx'),
+        ),
+        migrations.RunPython(backfill_order_stats, migrations.RunPython.noop),
+    ]
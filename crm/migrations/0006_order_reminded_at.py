@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 21:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('crm', '0005_order_date_default'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='reminded_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -1,19 +1,163 @@
-from django.db import models
+from django.db import connections, models, router, transaction
+from django.db.models import Count, Exists, F, Max, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+
+from .response_cache import invalidate_on_commit
+
+
+class CustomerQuerySet(models.QuerySet):
+    """
+    Maintains the denormalised order stats on Customer with set-based
+    UPDATEs, so reads never aggregate over the orders table.
+    """
+
+    def _order_stats(self, orders):
+        orders = orders.filter(customer=OuterRef("pk")).order_by().values("customer")
+        return (
+            Subquery(orders.annotate(n=Count("pk")).values("n")),
+            Subquery(orders.annotate(total=Sum("total_amount")).values("total")),
+            Subquery(orders.annotate(latest=Max("order_date")).values("latest")),
+        )
+
+    def add_orders(self, order_ids):
+        """Fold newly created orders into their customers' stats in one UPDATE."""
+        new_orders = Order.objects.filter(pk__in=order_ids)
+        count, total, latest = self._order_stats(new_orders)
+        return self.filter(pk__in=new_orders.values("customer")).update(
+            order_count=F("order_count") + count,
+            lifetime_value=F("lifetime_value") + total,
+            last_order_at=Greatest(Coalesce("last_order_at", latest), latest),
+        )
+
+    def remove_order(self, order):
+        """Take a deleted order out of its customer's stats."""
+        _, _, latest = self._order_stats(Order.objects.all())
+        return self.filter(pk=order.customer_id).update(
+            order_count=F("order_count") - 1,
+            lifetime_value=F("lifetime_value") - order.total_amount,
+            last_order_at=latest,
+        )
+
+    def refresh_order_stats(self):
+        """Recompute the stats of these customers from the orders table."""
+        count, total, latest = self._order_stats(Order.objects.all())
+        return self.update(
+            order_count=Coalesce(count, 0),
+            lifetime_value=Coalesce(total, 0, output_field=models.DecimalField()),
+            last_order_at=latest,
+        )
+
+    def inactive(self, cutoff):
+        """
+        Customers with no order since `cutoff`, served by the last_order_at
+        index. A NULL last_order_at only counts when the customer really has
+        no orders, so stats that were never filled in cannot mark a
+        customer for deletion.
+        """
+        has_orders = Exists(Order.objects.filter(customer=OuterRef("pk")))
+        return self.filter(
+            Q(last_order_at__lt=cutoff) | Q(last_order_at__isnull=True) & ~has_orders
+        )
+
 
 class Customer(models.Model):
     name = models.CharField(max_length=255)
     email = models.EmailField(unique=True)
     phone = models.CharField(max_length=20, blank=True, null=True)
+    # Maintained from order writes by CustomerQuerySet; see crm/signals.py.
+    last_order_at = models.DateTimeField(null=True, blank=True, editable=False)
+    order_count = models.PositiveIntegerField(default=0, editable=False)
+    lifetime_value = models.DecimalField(max_digits=12, decimal_places=2, default=0, editable=False)
+
+    objects = CustomerQuerySet.as_manager()
+
+    STATS_FIELDS = ("last_order_at", "order_count", "lifetime_value")
+
+    class Meta:
+        indexes = [
+            # phone_pattern filters with LIKE 'prefix%'; the pattern opclass
+            # lets PostgreSQL use the index under any collation.
+            models.Index(
+                fields=["phone"], name="crm_customer_phone_like_idx",
+                opclasses=["varchar_pattern_ops"],
+            ),
+            models.Index(fields=["last_order_at"], name="crm_customer_last_order_idx"),
+            models.Index(fields=["lifetime_value"], name="crm_customer_ltv_idx"),
+        ]
+
+    def save(self, *args, **kwargs):
+        # The order stats are written in SQL; a stale instance must not
+        # overwrite them.
+        if not self._state.adding and kwargs.get("update_fields") is None:
+            kwargs["update_fields"] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.STATS_FIELDS
+            ]
+        super().save(*args, **kwargs)
 
     def __str__(self):
         return self.name
 
 
+def supports_update_returning(connection):
+    """UPDATE ... RETURNING: PostgreSQL, and SQLite from 3.35."""
+    if connection.vendor == "postgresql":
+        return True
+    if connection.vendor == "sqlite":
+        return connection.Database.sqlite_version_info >= (3, 35)
+    return False
+
+
+class ProductQuerySet(models.QuerySet):
+    def restock_low_stock(self, threshold, amount):
+        """
+        Add `amount` to the stock of every product in this queryset below
+        `threshold` with a single `stock = stock + amount` UPDATE and return
+        the updated rows.
+
+        Backends that support UPDATE ... RETURNING get the rows back from the
+        same statement; others lock and re-read the affected ids.
+        """
+        # Routed as a write, as update() is: raw() alone would ask the read router.
+        using = self._db or router.db_for_write(self.model, **self._hints)
+        connection = connections[using]
+        low_stock = self.using(using).filter(stock__lt=threshold).order_by()
+        with transaction.atomic(using=using):
+            if supports_update_returning(connection):
+                qn = connection.ops.quote_name
+                opts = self.model._meta
+                columns = ", ".join(qn(f.column) for f in opts.concrete_fields)
+                stock = qn(opts.get_field("stock").column)
+                ids, params = low_stock.values("pk").query.get_compiler(using).as_sql()
+                sql = (
+                    f"UPDATE {qn(opts.db_table)} SET {stock} = {stock} + %s "
+                    f"WHERE {qn(opts.pk.column)} IN ({ids}) RETURNING {columns}"
+                )
+                return sorted(self.raw(sql, [amount, *params], using=using), key=lambda p: p.pk)
+
+            ids = list(low_stock.select_for_update().values_list("pk", flat=True))
+            products = self.model._default_manager.using(using).filter(pk__in=ids)
+            products.update(stock=F("stock") + amount)
+            return list(products.order_by("pk"))
+
+
 class Product(models.Model):
     name = models.CharField(max_length=255)
     price = models.DecimalField(max_digits=10, decimal_places=2)
     stock = models.PositiveIntegerField(default=0)
 
+    objects = ProductQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # low_stock and the restock mutation only touch stock < 10.
+            models.Index(
+                fields=["stock"], name="crm_product_low_stock_idx", condition=Q(stock__lt=10)
+            ),
+        ]
+
     def __str__(self):
         return self.name
 
@@ -22,11 +166,75 @@ class Order(models.Model):
     customer = models.ForeignKey(Customer, related_name="orders", on_delete=models.CASCADE)
     products = models.ManyToManyField(Product, related_name="orders")
     total_amount = models.DecimalField(max_digits=10, decimal_places=2, default=0)
-    order_date = models.DateTimeField(auto_now_add=True)
+    # A default rather than auto_now_add, so an explicit date is kept.
+    order_date = models.DateTimeField(default=timezone.now)
+    # Set once the order has been included in a reminder email.
+    reminded_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # Date-range filters and the (order_date, id) keyset ordering.
+            models.Index(fields=["order_date", "id"], name="crm_order_date_id_idx"),
+            # A customer's orders by date, and the customer_orders loader.
+            models.Index(fields=["customer", "order_date"], name="crm_order_customer_date_idx"),
+            models.Index(fields=["total_amount"], name="crm_order_total_idx"),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # The customer the row belongs to, so save() can tell a move.
+        instance._loaded_customer_id = instance.__dict__.get("customer_id")
+        return instance
 
     def save(self, *args, **kwargs):
-        self.total_amount = sum([p.price for p in self.products.all()])
+        # A new order has no products yet; its creator sets total_amount from
+        # the product rows it already fetched. Existing orders re-total in SQL.
+        previous = self.total_amount
+        update_fields = kwargs.get("update_fields")
+        if not self._state.adding and update_fields is None:
+            self.total_amount = self.products.aggregate(total=Sum("price"))["total"] or 0
+        moved_from = None
+        if self.pk is not None and (
+            update_fields is None or {"customer", "customer_id"} & set(update_fields)
+        ):
+            moved_from = getattr(self, "_loaded_customer_id", None)
+            if moved_from is None:
+                # Not loaded from the database (or customer deferred).
+                moved_from = (
+                    Order.objects.using(kwargs.get("using") or self._state.db)
+                    .filter(pk=self.pk).values_list("customer_id", flat=True).first()
+                )
         super().save(*args, **kwargs)
+        if moved_from is not None and moved_from != self.customer_id:
+            # Both customers' stats change; recount them from the orders.
+            Customer.objects.using(self._state.db).filter(
+                pk__in=[moved_from, self.customer_id]
+            ).refresh_order_stats()
+            # Queryset updates send no post_save for Customer.
+            invalidate_on_commit(Customer)
+        elif self.total_amount != previous:
+            Customer.objects.using(self._state.db).filter(pk=self.customer_id).update(
+                lifetime_value=F("lifetime_value") + (self.total_amount - previous)
+            )
+            invalidate_on_commit(Customer)
+        self._loaded_customer_id = self.customer_id
+
+    @staticmethod
+    def link_products(order_products, batch_size=None):
+        """
+        Insert the order/product M2M rows for `(order, products)` pairs with
+        one bulk INSERT per batch, bypassing the per-order `.set()` diff.
+        """
+        through = Order.products.through
+        through.objects.bulk_create(
+            [
+                through(order_id=order.pk, product_id=product.pk)
+                for order, products in order_products
+                for product in products
+            ],
+            batch_size=batch_size,
+        )
 
     def __str__(self):
         return f"Order {self.id} - {self.customer.name}"
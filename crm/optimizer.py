@@ -0,0 +1,132 @@
+import graphene
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
+from graphene.utils.str_converters import to_snake_case
+from graphql import FieldNode, FragmentSpreadNode, InlineFragmentNode, get_named_type
+
+# -----------------------------
+# Selection Set Helpers
+# -----------------------------
+def collect_fields(selection_set, fragments, fields=None):
+    """
+    Flatten a selection set into {field name: [FieldNode, ...]}, expanding
+    inline fragments and named fragment spreads.
+    """
+    if fields is None:
+        fields = {}
+    if selection_set is None:
+        return fields
+
+    for selection in selection_set.selections:
+        if isinstance(selection, FieldNode):
+            fields.setdefault(selection.name.value, []).append(selection)
+        elif isinstance(selection, InlineFragmentNode):
+            collect_fields(selection.selection_set, fragments, fields)
+        elif isinstance(selection, FragmentSpreadNode):
+            fragment = fragments.get(selection.name.value)
+            if fragment is not None:
+                collect_fields(fragment.selection_set, fragments, fields)
+    return fields
+
+
+def sub_fields(nodes, fragments):
+    fields = {}
+    for node in nodes:
+        collect_fields(node.selection_set, fragments, fields)
+    return fields
+
+
+def connection_node_fields(fields, fragments):
+    """Return the fields selected under `edges { node { ... } }`."""
+    edges = sub_fields(fields.get("edges", []), fragments)
+    return sub_fields(edges.get("node", []), fragments)
+
+
+# -----------------------------
+# Query Plan
+# -----------------------------
+class QueryPlan:
+    """Joins, prefetches and columns needed to serve one selection set."""
+
+    def __init__(self):
+        self.only = set()
+        self.select_related = []
+        self.prefetch_related = []
+        self.prune = True
+
+    def apply(self, queryset):
+        if self.select_related:
+            queryset = queryset.select_related(*self.select_related)
+        if self.prefetch_related:
+            queryset = queryset.prefetch_related(*self.prefetch_related)
+        if self.prune and self.only:
+            queryset = queryset.only(*self.only)
+        return queryset
+
+
+def build_plan(model, fields, fragments, prefix="", plan=None):
+    """
+    Map selected GraphQL fields onto `model`.
+
+    Forward foreign keys are joined with select_related, reverse and
+    many-to-many relations become nested Prefetch objects, and scalar fields
+    are collected for `.only()`. A selected field that does not map to a
+    model field may need any column, so column pruning is disabled then.
+    """
+    if plan is None:
+        plan = QueryPlan()
+    plan.only.add(prefix + model._meta.pk.attname)
+
+    for name, nodes in fields.items():
+        if name.startswith("__"):
+            continue
+        try:
+            field = model._meta.get_field(to_snake_case(name))
+        except FieldDoesNotExist:
+            plan.prune = False
+            continue
+
+        if not field.is_relation:
+            plan.only.add(prefix + field.attname)
+        elif field.concrete and (field.many_to_one or field.one_to_one):
+            plan.only.add(prefix + field.attname)
+            plan.select_related.append(prefix + field.name)
+            build_plan(field.related_model, sub_fields(nodes, fragments), fragments,
+                       prefix=f"{prefix}{field.name}__", plan=plan)
+        else:
+            child = build_plan(field.related_model, sub_fields(nodes, fragments), fragments)
+            if field.one_to_many:
+                # The prefetch groups rows by the foreign key back to the parent.
+                child.only.add(field.field.attname)
+            lookup = prefix + (field.get_accessor_name() if field.auto_created else field.name)
+            queryset = child.apply(field.related_model._default_manager.all())
+            plan.prefetch_related.append(Prefetch(lookup, queryset=queryset))
+    return plan
+
+
+def optimize(queryset, info, required=()):
+    """
+    Shape `queryset` to the fields selected under the field being resolved.
+    `required` names columns the caller reads itself, such as ordering keys.
+    """
+    fields = sub_fields(info.field_nodes, info.fragments)
+    graphene_type = getattr(get_named_type(info.return_type), "graphene_type", None)
+    if graphene_type is not None and issubclass(graphene_type, graphene.relay.Connection):
+        fields = connection_node_fields(fields, info.fragments)
+    plan = build_plan(queryset.model, fields, info.fragments)
+    plan.only.update(required)
+    return plan.apply(queryset)
+
+
+def get_cached_relation(instance, name):
+    """
+    Return a relation already fetched by select_related/prefetch_related,
+    or None when it still has to be loaded.
+    """
+    prefetched = getattr(instance, "_prefetched_objects_cache", {})
+    if name in prefetched:
+        return list(prefetched[name])
+    field = instance._meta.get_field(name)
+    if field.concrete and field.is_relation and field.is_cached(instance):
+        return getattr(instance, name)
+    return None
@@ -0,0 +1,139 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from graphql import parse
+from graphql.error import GraphQLError
+from graphql.validation import validate
+
+# -----------------------------
+# Parsed Document Cache
+# -----------------------------
+class DocumentCache:
+    """
+    Thread-safe LRU of parsed and validated DocumentNodes keyed by the
+    sha256 of the query text. Only documents that passed validation are
+    stored, so a hit can go straight to execution.
+    """
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._documents = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            document = self._documents.get(key)
+            if document is not None:
+                self._documents.move_to_end(key)
+            return document
+
+    def set(self, key, document):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._documents[key] = document
+            self._documents.move_to_end(key)
+            while len(self._documents) > self.maxsize:
+                self._documents.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._documents.clear()
+
+    def __len__(self):
+        return len(self._documents)
+
+
+document_cache = DocumentCache(getattr(settings, "GRAPHQL_DOCUMENT_CACHE_SIZE", 1000))
+
+
+def query_hash(query):
+    return hashlib.sha256(query.encode("utf-8")).hexdigest()
+
+
+def get_document(schema, query, validation_rules=None, max_errors=None, key=None):
+    """
+    Return `(document, errors)` for `query`, parsing and validating it only
+    on a cache miss.
+    """
+    key = key or query_hash(query)
+    cache_key = (id(schema), tuple(validation_rules or ()), key)
+    document = document_cache.get(cache_key)
+    if document is not None:
+        return document, None
+
+    try:
+        document = parse(query)
+    except GraphQLError as e:
+        return None, [e]
+
+    errors = validate(schema, document, validation_rules, max_errors)
+    if errors:
+        return None, errors
+
+    document_cache.set(cache_key, document)
+    return document, None
+
+
+# -----------------------------
+# Automatic Persisted Queries
+# -----------------------------
+PERSISTED_QUERY_CACHE_PREFIX = "graphql:apq:"
+
+
+class PersistedQueryNotFound(GraphQLError):
+    def __init__(self):
+        super().__init__(
+            "PersistedQueryNotFound", extensions={"code": "PERSISTED_QUERY_NOT_FOUND"}
+        )
+
+
+def get_persisted_query_hash(extensions):
+    """
+    Read the APQ sha256 hash from request `extensions`, which GET requests
+    send as a JSON string.
+    """
+    if not extensions:
+        return None
+    if isinstance(extensions, str):
+        try:
+            extensions = json.loads(extensions)
+        except ValueError:
+            raise GraphQLError("Extensions are invalid JSON.")
+    persisted = extensions.get("persistedQuery") if isinstance(extensions, dict) else None
+    if not persisted:
+        return None
+    if persisted.get("version", 1) != 1:
+        raise GraphQLError("Unsupported persisted query version.")
+    sha256_hash = persisted.get("sha256Hash")
+    if not isinstance(sha256_hash, str):
+        raise GraphQLError("Persisted query is missing sha256Hash.")
+    return sha256_hash.lower()
+
+
+def _persisted_cache():
+    return caches[getattr(settings, "GRAPHQL_PERSISTED_QUERY_CACHE", "default")]
+
+
+def resolve_persisted_query(sha256_hash, query=None):
+    """
+    Return the query text for an APQ request. A request carrying both the
+    text and its hash registers it; a hash alone is looked up in the shared
+    cache so any worker can serve it.
+    """
+    cache = _persisted_cache()
+    key = PERSISTED_QUERY_CACHE_PREFIX + sha256_hash
+    if query:
+        if query_hash(query) != sha256_hash:
+            raise GraphQLError("provided sha does not match query")
+        cache.set(key, query, getattr(settings, "GRAPHQL_PERSISTED_QUERY_TIMEOUT", None))
+        return query
+
+    query = cache.get(key)
+    if query is None:
+        raise PersistedQueryNotFound()
+    return query
@@ -0,0 +1,176 @@
+from django.conf import settings
+from graphene.relay import Connection
+from graphene_django.settings import graphene_settings
+from graphql import (
+    FragmentDefinitionNode,
+    GraphQLList,
+    GraphQLNonNull,
+    OperationType,
+    get_named_type,
+)
+from graphql.error import GraphQLError
+from graphql.execution.values import get_argument_values
+
+from .optimizer import collect_fields, sub_fields
+from .response_cache import is_structural
+
+# -----------------------------
+# Configuration
+# -----------------------------
+DEFAULTS = {
+    "ENABLED": True,
+    # Budgets per request. None disables the check. The default cost is
+    # ROOT_LIST_SIZE * (1 + DEFAULT_LIST_SIZE): an unpaginated root list
+    # (e.g. `orders`) can be fanned out into one relation, which the
+    # loaders batch into one query, but not into a relation of a relation.
+    "MAX_COST": 1010000,
+    "MAX_DEPTH": 5,
+    # Estimated length of a list that is not paginated with first/last.
+    "DEFAULT_LIST_SIZE": 100,
+    # The same at the root of an operation, where such a list reads the
+    # whole table.
+    "ROOT_LIST_SIZE": 10000,
+    # "TypeName.fieldName" -> estimated list length, for known small lists.
+    "LIST_SIZES": {},
+    # Add the cost report to the response extensions.
+    "REPORT": True,
+}
+
+
+def get_config():
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, "GRAPHQL_QUERY_COST", {}))
+    return config
+
+
+# -----------------------------
+# Cost Estimation
+# -----------------------------
+class QueryTooComplex(GraphQLError):
+    def __init__(self, message, report):
+        super().__init__(message, extensions={"code": "QUERY_TOO_COMPLEX", "cost": report})
+
+
+def is_list(field_type):
+    if isinstance(field_type, GraphQLNonNull):
+        field_type = field_type.of_type
+    return isinstance(field_type, GraphQLList)
+
+
+def is_connection(graphene_type):
+    return isinstance(graphene_type, type) and issubclass(graphene_type, Connection)
+
+
+def page_size(field, node, variables):
+    """The `first`/`last` limit requested on a field, if any."""
+    if "first" not in field.args and "last" not in field.args:
+        return None
+    try:
+        args = get_argument_values(field, node, variables)
+    except GraphQLError:
+        # Execution reports bad arguments; estimate without them.
+        return None
+    sizes = [args[name] for name in ("first", "last") if args.get(name) is not None]
+    return min(sizes) if sizes else None
+
+
+def estimate(parent_type, fields, fragments, variables, config, inherited_size=None,
+             list_size=None):
+    """
+    Return `(cost, depth)` for a selection on `parent_type`.
+
+    Every object a field resolves costs 1 and scalars are free. A list
+    multiplies the cost of its selection by its expected length: the
+    `first`/`last` of the enclosing connection, a LIST_SIZES hint, or
+    `list_size` (ROOT_LIST_SIZE for the root fields, DEFAULT_LIST_SIZE
+    below them). Connection, edge and page info wrappers add neither cost
+    nor depth.
+    """
+    cost = 0
+    depth = 0
+    for name, nodes in fields.items():
+        if name.startswith("__"):
+            continue
+        field = parent_type.fields.get(name)
+        if field is None:
+            continue
+        named = get_named_type(field.type)
+        if not hasattr(named, "fields"):
+            continue
+
+        graphene_type = getattr(named, "graphene_type", None)
+        requested = page_size(field, nodes[0], variables)
+        if is_list(field.type):
+            multiplier = (
+                inherited_size
+                or requested
+                or config["LIST_SIZES"].get(f"{parent_type.name}.{name}")
+                or list_size
+                or config["DEFAULT_LIST_SIZE"]
+            )
+        else:
+            multiplier = 1
+
+        child_size = None
+        if is_connection(graphene_type):
+            child_size = requested or graphene_settings.RELAY_CONNECTION_MAX_LIMIT
+
+        child_cost, child_depth = estimate(
+            named, sub_fields(nodes, fragments), fragments, variables, config, child_size
+        )
+        own = 0 if is_structural(graphene_type) else 1
+        cost += multiplier * (own + child_cost)
+        depth = max(depth, own + child_depth)
+    return cost, depth
+
+
+def analyze_query_cost(schema, document, operation_ast, variables=None, max_cost=None,
+                       max_depth=None):
+    """
+    Estimate the cost of an operation before it runs.
+
+    Runs per request rather than inside the cached validation step, since
+    `first`/`last` may come from variables. Returns the cost report, or None
+    when analysis is disabled, and raises QueryTooComplex when the operation
+    is over budget. `max_cost`/`max_depth` override the configured budgets.
+    """
+    config = get_config()
+    if not config["ENABLED"] or operation_ast is None:
+        return None
+
+    root_type = {
+        OperationType.QUERY: schema.query_type,
+        OperationType.MUTATION: schema.mutation_type,
+        OperationType.SUBSCRIPTION: schema.subscription_type,
+    }[operation_ast.operation]
+    fragments = {
+        definition.name.value: definition
+        for definition in document.definitions
+        if isinstance(definition, FragmentDefinitionNode)
+    }
+    cost, depth = estimate(
+        root_type,
+        collect_fields(operation_ast.selection_set, fragments),
+        fragments,
+        variables or {},
+        config,
+        list_size=config["ROOT_LIST_SIZE"],
+    )
+
+    max_cost = config["MAX_COST"] if max_cost is None else max_cost
+    max_depth = config["MAX_DEPTH"] if max_depth is None else max_depth
+    report = {
+        "requestedQueryCost": cost,
+        "maximumAvailable": max_cost,
+        "depth": depth,
+        "maximumDepth": max_depth,
+    }
+    if max_depth is not None and depth > max_depth:
+        raise QueryTooComplex(
+            f"Query depth {depth} exceeds the maximum depth of {max_depth}.", report
+        )
+    if max_cost is not None and cost > max_cost:
+        raise QueryTooComplex(
+            f"Query cost {cost} exceeds the maximum cost of {max_cost}.", report
+        )
+    return report
@@ -0,0 +1,174 @@
+import hashlib
+import json
+import time
+
+import graphene
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from graphql import FragmentDefinitionNode, OperationType, get_named_type, print_ast
+
+from .optimizer import collect_fields, sub_fields
+
+# -----------------------------
+# Configuration
+# -----------------------------
+DEFAULTS = {
+    "ENABLED": False,
+    "CACHE": "default",
+    "KEY_PREFIX": "graphql:response:",
+    # Root query field (GraphQL name) -> timeout in seconds. Only queries
+    # whose root fields all have a hint are cached, for the smallest one.
+    "FIELD_TIMEOUTS": {},
+}
+
+
+def get_config():
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, "GRAPHQL_RESPONSE_CACHE", {}))
+    return config
+
+
+def get_cache(config):
+    return caches[config["CACHE"]]
+
+
+# -----------------------------
+# Model Versions
+# -----------------------------
+def version_key(config, label):
+    return f"{config['KEY_PREFIX']}version:{label}"
+
+
+def get_versions(config, labels):
+    """
+    Current version of each model label. Missing versions are seeded with a
+    timestamp so an evicted counter never revisits an old version number.
+    """
+    cache = get_cache(config)
+    keys = {version_key(config, label): label for label in labels}
+    versions = cache.get_many(list(keys))
+    for key in keys:
+        if key not in versions:
+            cache.add(key, time.time_ns(), None)
+            versions[key] = cache.get(key)
+    return [f"{keys[key]}={versions[key]}" for key in sorted(keys)]
+
+
+def invalidate(*models):
+    """Bump the version of each model so cached responses built on it miss."""
+    config = get_config()
+    cache = get_cache(config)
+    for model in models:
+        key = version_key(config, model._meta.label_lower)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, time.time_ns(), None)
+
+
+def invalidate_on_commit(*models):
+    """
+    Invalidate once the surrounding transaction commits, so a concurrent
+    reader cannot cache uncommitted state under the new version. Bulk writes
+    that bypass model signals call this directly.
+    """
+    transaction.on_commit(lambda: invalidate(*models))
+
+
+# -----------------------------
+# Cache Policy
+# -----------------------------
+def is_structural(graphene_type):
+    """Connection, edge and page info types carry no data of their own."""
+    if graphene_type is graphene.relay.PageInfo:
+        return True
+    if isinstance(graphene_type, type) and issubclass(graphene_type, graphene.relay.Connection):
+        return True
+    fields = getattr(getattr(graphene_type, "_meta", None), "fields", {})
+    return "node" in fields and "cursor" in fields
+
+
+def selected_models(parent_type, fields, fragments, labels):
+    """
+    Collect the Django models reachable from a selection. Returns False when
+    a field resolves to a non-model object whose dependencies are unknown.
+    """
+    known = True
+    for name, nodes in fields.items():
+        if name.startswith("__"):
+            continue
+        field = parent_type.fields.get(name)
+        if field is None:
+            continue
+        named = get_named_type(field.type)
+        graphene_type = getattr(named, "graphene_type", None)
+        meta = getattr(graphene_type, "_meta", None)
+        model = getattr(meta, "model", None)
+        if model is not None:
+            labels.add(model._meta.label_lower)
+        elif hasattr(named, "fields") and not is_structural(graphene_type):
+            # Plain object types (reports, payloads) may read any table.
+            known = False
+        if hasattr(named, "fields"):
+            known &= selected_models(named, sub_fields(nodes, fragments), fragments, labels)
+    return known
+
+
+class CacheEntry:
+    def __init__(self, config, key, timeout):
+        self.config = config
+        self.key = key
+        self.timeout = timeout
+
+    def get(self):
+        return get_cache(self.config).get(self.key)
+
+    def set(self, data):
+        get_cache(self.config).set(self.key, data, self.timeout)
+
+
+def user_key(user):
+    if user is None or not user.is_authenticated:
+        return "anonymous"
+    return f"user:{user.pk}"
+
+
+def get_cache_entry(schema, document, operation_ast, variables=None, operation_name=None,
+                    user=None):
+    """
+    Return the CacheEntry for a query operation, or None when it must not be
+    cached: caching is off, it is not a query, or a root field has no hint.
+    Entries are kept per user, with one shared entry for anonymous requests.
+    """
+    config = get_config()
+    if not config["ENABLED"] or operation_ast is None:
+        return None
+    if operation_ast.operation != OperationType.QUERY:
+        return None
+
+    fragments = {
+        definition.name.value: definition
+        for definition in document.definitions
+        if isinstance(definition, FragmentDefinitionNode)
+    }
+    root_fields = collect_fields(operation_ast.selection_set, fragments)
+    timeouts = config["FIELD_TIMEOUTS"]
+    if not root_fields or any(name not in timeouts for name in root_fields):
+        return None
+
+    labels = set()
+    if not selected_models(schema.query_type, root_fields, fragments, labels):
+        labels = {model._meta.label_lower for model in apps.get_app_config("crm").get_models()}
+
+    normalized = json.dumps(
+        [
+            print_ast(document), operation_name, variables or {}, user_key(user),
+            get_versions(config, labels),
+        ],
+        sort_keys=True,
+        default=str,
+    )
+    key = config["KEY_PREFIX"] + hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+    return CacheEntry(config, key, min(timeouts[name] for name in root_fields))
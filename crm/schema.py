@@ -1,83 +1,496 @@
 import graphene
-from graphene_django import DjangoObjectType
-from graphene_django.filter import DjangoFilterConnectionField
+from graphene_django import DjangoObjectType, DjangoListField
 from .models import Customer, Product, Order
-from django.db import transaction
+from .async_utils import async_safe, is_async
+from .loaders import fetch, get_loaders, prime
+from .optimizer import optimize, get_cached_relation
+from .fields import KeysetConnectionField
+from .filters import SearchFilterMixin
+from .response_cache import invalidate_on_commit
+from .search import get_backend
+from django.db import IntegrityError, connection, router, transaction
+from django.db.models import Count, DateField, Sum
+from django.db.models.functions import TruncDate, TruncWeek
 from django.core.exceptions import ValidationError
+from django.utils import timezone
 import django_filters
-from datetime import datetime
+import re
+from datetime import datetime, time, timedelta
+from decimal import Decimal
 
 # -----------------------------
 # GraphQL Types
 # -----------------------------
+class CountableConnection(graphene.relay.Connection):
+    class Meta:
+        abstract = True
+
+    total_count = graphene.Int()
+
+    def resolve_total_count(root, info):
+        # Keyset pages leave the count to be run only when it is selected.
+        length = getattr(root, "length", None)
+        if length is None:
+            if is_async(info):
+                return root.iterable.acount()
+            length = root.iterable.count()
+        return length
+
 class CustomerType(DjangoObjectType):
+    orders = DjangoListField(lambda: OrderType)
+
     class Meta:
         model = Customer
         fields = "__all__"
+        use_connection = True
+        connection_class = CountableConnection
+
+    def resolve_orders(self, info):
+        cached = get_cached_relation(self, "orders")
+        if cached is not None:
+            return cached
+        return get_loaders(info).customer_orders.load(self.pk)
 
 class ProductType(DjangoObjectType):
+    orders = DjangoListField(lambda: OrderType)
+
     class Meta:
         model = Product
         fields = "__all__"
+        use_connection = True
+        connection_class = CountableConnection
+
+    def resolve_orders(self, info):
+        cached = get_cached_relation(self, "orders")
+        if cached is not None:
+            return cached
+        return get_loaders(info).product_orders.load(self.pk)
 
 class OrderType(DjangoObjectType):
+    products = DjangoListField(ProductType)
+
     class Meta:
         model = Order
         fields = "__all__"
+        use_connection = True
+        connection_class = CountableConnection
+
+    def resolve_customer(self, info):
+        cached = get_cached_relation(self, "customer")
+        if cached is not None:
+            return cached
+        return get_loaders(info).customer.load(self.customer_id)
+
+    def resolve_products(self, info):
+        cached = get_cached_relation(self, "products")
+        if cached is not None:
+            return cached
+        return get_loaders(info).order_products.load(self.pk)
 
 # -----------------------------
 # Filters
 # -----------------------------
-class CustomerFilter(django_filters.FilterSet):
+class CustomerFilter(SearchFilterMixin, django_filters.FilterSet):
+    search = django_filters.CharFilter(method="filter_search")
     name_icontains = django_filters.CharFilter(field_name="name", lookup_expr="icontains")
     email_icontains = django_filters.CharFilter(field_name="email", lookup_expr="icontains")
 
     class Meta:
         model = Customer
-        fields = ["name_icontains", "email_icontains"]
+        fields = ["search", "name_icontains", "email_icontains"]
 
-class ProductFilter(django_filters.FilterSet):
+class ProductFilter(SearchFilterMixin, django_filters.FilterSet):
+    search = django_filters.CharFilter(method="filter_search")
     name_icontains = django_filters.CharFilter(field_name="name", lookup_expr="icontains")
     low_stock = django_filters.BooleanFilter(method="filter_low_stock")
 
     class Meta:
         model = Product
-        fields = ["name_icontains", "low_stock"]
+        fields = ["search", "name_icontains", "low_stock"]
 
     def filter_low_stock(self, queryset, name, value):
         if value:
             return queryset.filter(stock__lt=10)
         return queryset
 
-class OrderFilter(django_filters.FilterSet):
+class OrderFilter(SearchFilterMixin, django_filters.FilterSet):
+    search = django_filters.CharFilter(method="filter_search")
     order_date_gte = django_filters.DateFilter(field_name="order_date", lookup_expr="gte")
     order_date_lte = django_filters.DateFilter(field_name="order_date", lookup_expr="lte")
 
     class Meta:
         model = Order
-        fields = ["order_date_gte", "order_date_lte"]
+        fields = ["search", "order_date_gte", "order_date_lte"]
 
 # -----------------------------
-# Existing Mutations
+# Reports
 # -----------------------------
-# Define your CreateCustomer, BulkCreateCustomers, CreateProduct, CreateOrder here
-# ... [existing mutations]
+CENT = Decimal("0.01")
+
+def money(value):
+    # Sums come back with the backend's scale (fifteen digits on SQLite).
+    return (value or Decimal("0")).quantize(CENT)
+
+class StatsGrouping(graphene.Enum):
+    DAY = "day"
+    WEEK = "week"
+    CUSTOMER = "customer"
+
+class StatsBucket(graphene.ObjectType):
+    key = graphene.String()
+    label = graphene.String()
+    orders = graphene.Int()
+    revenue = graphene.Decimal()
+
+class CRMStats(graphene.ObjectType):
+    """
+    Aggregates computed in the database over the orders in range. Each field
+    only runs its query when it is selected.
+    """
+    total_customers = graphene.Int()
+    total_orders = graphene.Int()
+    total_revenue = graphene.Decimal()
+    groups = graphene.List(StatsBucket, group_by=StatsGrouping(required=True))
+
+    def __init__(self, orders):
+        super().__init__()
+        self.orders = orders
+        self._totals = None
+
+    def totals(self):
+        if self._totals is None:
+            self._totals = self.orders.aggregate(count=Count("id"), revenue=Sum("total_amount"))
+        return self._totals
+
+    @async_safe
+    def resolve_total_customers(self, info):
+        return Customer.objects.count()
+
+    @async_safe
+    def resolve_total_orders(self, info):
+        return self.totals()["count"]
+
+    @async_safe
+    def resolve_total_revenue(self, info):
+        return money(self.totals()["revenue"])
+
+    @async_safe
+    def resolve_groups(self, info, group_by):
+        if group_by == StatsGrouping.CUSTOMER.value:
+            rows = (
+                self.orders.values("customer_id", "customer__name")
+                .annotate(orders=Count("id"), revenue=Sum("total_amount"))
+                .order_by("customer_id")
+            )
+            return [
+                StatsBucket(key=row["customer_id"], label=row["customer__name"],
+                            orders=row["orders"], revenue=money(row["revenue"]))
+                for row in rows
+            ]
+
+        trunc = TruncDate if group_by == StatsGrouping.DAY.value else TruncWeek
+        rows = (
+            self.orders.annotate(bucket=trunc("order_date", output_field=DateField()))
+            .values("bucket")
+            .annotate(orders=Count("id"), revenue=Sum("total_amount"))
+            .order_by("bucket")
+        )
+        return [
+            StatsBucket(key=row["bucket"].isoformat(), label=row["bucket"].isoformat(),
+                        orders=row["orders"], revenue=money(row["revenue"]))
+            for row in rows
+        ]
+
+def orders_in_range(start_date=None, end_date=None):
+    """Orders placed between two dates inclusive, as an index-friendly range."""
+    orders = Order.objects.all()
+    if start_date:
+        orders = orders.filter(
+            order_date__gte=timezone.make_aware(datetime.combine(start_date, time.min))
+        )
+    if end_date:
+        orders = orders.filter(
+            order_date__lt=timezone.make_aware(datetime.combine(end_date + timedelta(days=1), time.min))
+        )
+    return orders
+
+# -----------------------------
+# Customer Mutations
+# -----------------------------
+PHONE_PATTERN = re.compile(r'^(\+\d{10,15}|\d{3}-\d{3}-\d{4})$')
+BULK_CREATE_BATCH_SIZE = 1000
+
+def chunked(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+class CreateCustomer(graphene.Mutation):
+    class Arguments:
+        name = graphene.String(required=True)
+        email = graphene.String(required=True)
+        phone = graphene.String(required=False)
+
+    customer = graphene.Field(CustomerType)
+    message = graphene.String()
+
+    @async_safe
+    def mutate(self, info, name, email, phone=None):
+        # Validate email uniqueness
+        if Customer.objects.filter(email=email).exists():
+            raise ValidationError("Email already exists")
+
+        # Validate phone format if provided
+        if phone and not PHONE_PATTERN.match(phone):
+            raise ValidationError("Phone format invalid")
+
+        customer = Customer.objects.create(name=name, email=email, phone=phone)
+        return CreateCustomer(customer=customer, message="Customer created successfully")
+
+
+class CustomerInput(graphene.InputObjectType):
+    name = graphene.String(required=True)
+    email = graphene.String(required=True)
+    phone = graphene.String()
+
+class BulkRowError(graphene.ObjectType):
+    index = graphene.Int()
+    email = graphene.String()
+    message = graphene.String()
+
+class BulkCreateCustomers(graphene.Mutation):
+    """
+    Validate every row in memory, check email uniqueness with one email__in
+    query per chunk, then insert the valid rows with bulk_create inside one
+    transaction. Invalid rows are reported and skipped.
+    """
+    class Arguments:
+        input = graphene.List(CustomerInput, required=True)
+        batch_size = graphene.Int(default_value=BULK_CREATE_BATCH_SIZE)
+
+    customers = graphene.List(CustomerType)
+    errors = graphene.List(graphene.String)
+    row_errors = graphene.List(BulkRowError)
+
+    @async_safe
+    def mutate(self, info, input, batch_size=BULK_CREATE_BATCH_SIZE):
+        if batch_size is None:
+            # An explicit null overrides the argument default.
+            batch_size = BULK_CREATE_BATCH_SIZE
+        if batch_size < 1:
+            raise ValidationError("batch_size must be positive")
+
+        row_errors = []
+        seen = set()
+        candidates = []
+        for index, c in enumerate(input):
+            if c.email in seen:
+                row_errors.append(BulkRowError(index=index, email=c.email,
+                                               message=f"Email {c.email} is duplicated in the batch"))
+            elif c.phone and not PHONE_PATTERN.match(c.phone):
+                row_errors.append(BulkRowError(index=index, email=c.email,
+                                               message=f"Phone format invalid for {c.phone}"))
+            else:
+                candidates.append((index, c))
+            seen.add(c.email)
+
+        emails = [c.email for _, c in candidates]
+        existing = set()
+        for chunk in chunked(emails, batch_size):
+            existing.update(Customer.objects.filter(email__in=chunk).values_list("email", flat=True))
+
+        new_customers = []
+        for index, c in candidates:
+            if c.email in existing:
+                row_errors.append(BulkRowError(index=index, email=c.email,
+                                               message=f"Email {c.email} already exists"))
+            else:
+                new_customers.append(Customer(name=c.name, email=c.email, phone=c.phone))
+
+        try:
+            with transaction.atomic():
+                created = Customer.objects.bulk_create(new_customers, batch_size=batch_size)
+                # bulk_create sends no post_save, so index the rows here.
+                get_backend().index(Customer, created)
+                invalidate_on_commit(Customer)
+        except IntegrityError as e:
+            # Another writer took one of the emails after the uniqueness check.
+            row_errors.append(BulkRowError(message=f"Batch rejected: {e}"))
+            created = []
+
+        row_errors.sort(key=lambda error: -1 if error.index is None else error.index)
+        return BulkCreateCustomers(
+            customers=created,
+            errors=[error.message for error in row_errors],
+            row_errors=row_errors,
+        )
+
+# -----------------------------
+# Product & Order Mutations
+# -----------------------------
+class CreateProduct(graphene.Mutation):
+    class Arguments:
+        name = graphene.String(required=True)
+        price = graphene.Float(required=True)
+        stock = graphene.Int(required=False)
+
+    product = graphene.Field(ProductType)
+
+    @async_safe
+    def mutate(self, info, name, price, stock=0):
+        if price <= 0:
+            raise ValidationError("Price must be positive")
+        if stock < 0:
+            raise ValidationError("Stock cannot be negative")
+
+        product = Product.objects.create(name=name, price=Decimal(str(price)), stock=stock)
+        return CreateProduct(product=product)
+
+
+def parse_order_date(value):
+    """An ISO 8601 date or datetime, in the current time zone if naive."""
+    try:
+        order_date = datetime.fromisoformat(value)
+    except ValueError:
+        raise ValidationError(f"Invalid order date: {value}")
+    if timezone.is_naive(order_date):
+        order_date = timezone.make_aware(order_date)
+    return order_date
+
+class CreateOrder(graphene.Mutation):
+    class Arguments:
+        customer_id = graphene.ID(required=True)
+        product_ids = graphene.List(graphene.ID, required=True)
+        order_date = graphene.String(required=False)
+
+    order = graphene.Field(OrderType)
+
+    @async_safe
+    def mutate(self, info, customer_id, product_ids, order_date=None):
+        try:
+            customer_id = Customer._meta.pk.to_python(customer_id)
+            product_ids = [Product._meta.pk.to_python(pid) for pid in product_ids]
+        except ValidationError as e:
+            raise ValidationError("; ".join(e.messages))
+
+        products = list(Product.objects.filter(id__in=product_ids).only("id", "price"))
+        if not products:
+            raise ValidationError("No valid products selected")
+
+        # Checked up front: the foreign key itself is only enforced when the
+        # outermost transaction commits, which with ATOMIC_MUTATIONS is the
+        # request's, too late to report. Read on the primary, as the write.
+        customers = Customer.objects.using(router.db_for_write(Customer))
+        if not customers.filter(pk=customer_id).exists():
+            raise ValidationError(f"Customer {customer_id} does not exist")
+
+        order = Order(customer_id=customer_id, total_amount=sum(p.price for p in products))
+        if order_date:
+            order.order_date = parse_order_date(order_date)
+
+        with transaction.atomic():
+            order.save()
+            Order.link_products([(order, products)])
+            invalidate_on_commit(Order, Product)
+
+        return CreateOrder(order=order)
+
+
+class OrderInput(graphene.InputObjectType):
+    customer_id = graphene.ID(required=True)
+    product_ids = graphene.List(graphene.ID, required=True)
+    order_date = graphene.String()
+
+class BulkCreateOrders(graphene.Mutation):
+    """
+    Create many orders with one lookup for all customers, one for all
+    product prices, and bulk INSERTs for the orders and their M2M rows.
+    """
+    class Arguments:
+        input = graphene.List(OrderInput, required=True)
+        batch_size = graphene.Int(default_value=BULK_CREATE_BATCH_SIZE)
+
+    orders = graphene.List(OrderType)
+    errors = graphene.List(graphene.String)
+    row_errors = graphene.List(BulkRowError)
+
+    @async_safe
+    def mutate(self, info, input, batch_size=BULK_CREATE_BATCH_SIZE):
+        if batch_size < 1:
+            raise ValidationError("batch_size must be positive")
+
+        rows = []
+        row_errors = []
+        for index, o in enumerate(input):
+            try:
+                customer_id = Customer._meta.pk.to_python(o.customer_id)
+                product_ids = [Product._meta.pk.to_python(pid) for pid in o.product_ids]
+                order_date = parse_order_date(o.order_date) if o.order_date else None
+            except ValidationError as e:
+                row_errors.append(BulkRowError(index=index, message="; ".join(e.messages)))
+                continue
+            rows.append((index, o, customer_id, list(dict.fromkeys(product_ids)), order_date))
+
+        known_customers = set()
+        for ids in chunked(list({row[2] for row in rows}), batch_size):
+            known_customers.update(Customer.objects.filter(id__in=ids).values_list("id", flat=True))
+        prices = {}
+        for ids in chunked(list({pid for row in rows for pid in row[3]}), batch_size):
+            prices.update(Product.objects.filter(id__in=ids).values_list("id", "price"))
+
+        new_orders = []
+        for index, o, customer_id, product_ids, order_date in rows:
+            valid_ids = [pid for pid in product_ids if pid in prices]
+            if customer_id not in known_customers:
+                row_errors.append(
+                    BulkRowError(index=index, message=f"Customer {o.customer_id} does not exist")
+                )
+                continue
+            if not valid_ids:
+                row_errors.append(BulkRowError(index=index, message="No valid products selected"))
+                continue
+            order = Order(customer_id=customer_id, total_amount=sum(prices[pid] for pid in valid_ids))
+            if order_date:
+                order.order_date = order_date
+            new_orders.append((order, [Product(pk=pid) for pid in valid_ids]))
+
+        with transaction.atomic():
+            orders = [order for order, _ in new_orders]
+            if connection.features.can_return_rows_from_bulk_insert:
+                Order.objects.bulk_create(orders, batch_size=batch_size)
+                # bulk_create sends no post_save, so update the stats here.
+                Customer.objects.add_orders([order.pk for order in orders])
+            else:
+                for order in orders:
+                    order.save()
+            Order.link_products(new_orders, batch_size=batch_size)
+            invalidate_on_commit(Customer, Order, Product)
+
+        row_errors.sort(key=lambda error: error.index)
+        return BulkCreateOrders(
+            orders=prime(info, orders),
+            errors=[error.message for error in row_errors],
+            row_errors=row_errors,
+        )
+
 
 # -----------------------------
 # Mutation for updating low-stock products
 # -----------------------------
 class UpdateLowStockProducts(graphene.Mutation):
+    class Arguments:
+        threshold = graphene.Int(default_value=10)
+        restock_amount = graphene.Int(default_value=10)
+
     updated_products = graphene.List(ProductType)
     message = graphene.String()
 
-    def mutate(self, info):
-        low_stock_products = Product.objects.filter(stock__lt=10)
-        updated_list = []
+    @async_safe
+    def mutate(self, info, threshold=10, restock_amount=10):
+        if restock_amount <= 0:
+            raise ValidationError("Restock amount must be positive")
 
-        for product in low_stock_products:
-            product.stock += 10  # Restock by 10
-            product.save()
-            updated_list.append(ProductType(id=product.id, name=product.name, stock=product.stock))
+        updated_list = prime(info, Product.objects.restock_low_stock(threshold, restock_amount))
+        invalidate_on_commit(Product)
 
         return UpdateLowStockProducts(
             updated_products=updated_list,
@@ -89,10 +502,11 @@ class UpdateLowStockProducts(graphene.Mutation):
 # -----------------------------
 class Mutation(graphene.ObjectType):
     # Existing mutations
-    # create_customer = CreateCustomer.Field()
-    # bulk_create_customers = BulkCreateCustomers.Field()
-    # create_product = CreateProduct.Field()
-    # create_order = CreateOrder.Field()
+    create_customer = CreateCustomer.Field()
+    bulk_create_customers = BulkCreateCustomers.Field()
+    create_product = CreateProduct.Field()
+    create_order = CreateOrder.Field()
+    bulk_create_orders = BulkCreateOrders.Field()
 
     # Low-stock mutation
     update_low_stock_products = UpdateLowStockProducts.Field()
@@ -101,20 +515,27 @@ class Mutation(graphene.ObjectType):
 # Query Class
 # -----------------------------
 class Query(graphene.ObjectType):
-    all_customers = DjangoFilterConnectionField(CustomerType, filterset_class=CustomerFilter)
-    all_products = DjangoFilterConnectionField(ProductType, filterset_class=ProductFilter)
-    all_orders = DjangoFilterConnectionField(OrderType, filterset_class=OrderFilter)
+    all_customers = KeysetConnectionField(CustomerType, filterset_class=CustomerFilter)
+    all_products = KeysetConnectionField(ProductType, filterset_class=ProductFilter)
+    all_orders = KeysetConnectionField(
+        OrderType, filterset_class=OrderFilter, ordering=("order_date", "id")
+    )
 
     customers = graphene.List(CustomerType)
     products = graphene.List(ProductType)
     orders = graphene.List(OrderType)
 
+    crm_stats = graphene.Field(CRMStats, start_date=graphene.Date(), end_date=graphene.Date())
+
+    def resolve_crm_stats(self, info, start_date=None, end_date=None):
+        return CRMStats(orders_in_range(start_date, end_date))
+
     def resolve_customers(self, info):
-        return Customer.objects.all()
+        return fetch(info, optimize(Customer.objects.all(), info))
 
     def resolve_products(self, info):
-        return Product.objects.all()
+        return fetch(info, optimize(Product.objects.all(), info))
 
     def resolve_orders(self, info):
-        return Order.objects.all()
+        return fetch(info, optimize(Order.objects.all(), info))
 
@@ -0,0 +1,241 @@
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+
+from .models import Customer, Order, Product
+
+# -----------------------------
+# Search Configuration
+# -----------------------------
+# Text fields matched by `search` on each model. Orders are found through
+# their customer and products.
+SEARCH_FIELDS = {
+    Customer: ("name", "email"),
+    Product: ("name",),
+}
+
+# Annotation carrying the relevance of each row; higher is better.
+SEARCH_RANK = "search_rank"
+
+
+def searchable_models():
+    return list(SEARCH_FIELDS)
+
+
+# -----------------------------
+# Search Backends
+# -----------------------------
+class SearchBackend:
+    """
+    Substring search over SEARCH_FIELDS. `search` filters a queryset to the
+    matching rows and annotates SEARCH_RANK; the default implementation is
+    an unranked `icontains` scan that works on any database.
+    """
+
+    def __init__(self, using="default"):
+        self.using = using
+
+    def install(self, schema_editor):
+        """Create the index structures. Called from a migration."""
+
+    def uninstall(self, schema_editor):
+        """Drop the index structures created by `install`."""
+
+    def index(self, model, instances):
+        """Add or refresh `instances` in the index."""
+
+    def remove(self, model, pks):
+        """Drop the rows with primary keys `pks` from the index."""
+
+    def rebuild(self):
+        """Re-create the index structures and contents from the tables."""
+        with connections[self.using].schema_editor() as schema_editor:
+            self.uninstall(schema_editor)
+            self.install(schema_editor)
+
+    def rank(self, model, term):
+        return Value(0.0, output_field=FloatField())
+
+    def match(self, queryset, term):
+        model = queryset.model
+        predicate = reduce(
+            or_, (Q(**{f"{field}__icontains": term}) for field in SEARCH_FIELDS[model])
+        )
+        return queryset.filter(predicate).annotate(**{SEARCH_RANK: self.rank(model, term)})
+
+    def matching_pks(self, model, term):
+        return self.match(model._default_manager.using(self.using), term).values("pk")
+
+    def search(self, queryset, term):
+        term = term.strip()
+        if not term:
+            return queryset
+        if queryset.model is Order:
+            # Subqueries instead of joins, so no .distinct() is needed.
+            through = Order.products.through
+            return queryset.filter(
+                Q(customer__in=self.matching_pks(Customer, term))
+                | Q(pk__in=through.objects.filter(
+                    product__in=self.matching_pks(Product, term)
+                ).values("order_id"))
+            )
+        return self.match(queryset, term)
+
+
+class SQLiteFTSBackend(SearchBackend):
+    """
+    SQLite FTS5 tables with the trigram tokenizer (SQLite >= 3.34), one per
+    model, keyed by the row's primary key and kept in sync by model signals.
+    Trigrams index every substring of three or more characters, so partial
+    names are looked up in the index and ranked by bm25. Shorter terms fall
+    back to the `icontains` scan.
+    """
+
+    MIN_TERM_LENGTH = 3
+
+    def table(self, model):
+        return f"{model._meta.db_table}_search"
+
+    def columns(self, model):
+        return [model._meta.get_field(field).column for field in SEARCH_FIELDS[model]]
+
+    def install(self, schema_editor):
+        qn = schema_editor.quote_name
+        for model in searchable_models():
+            table = qn(self.table(model))
+            columns = ", ".join(qn(column) for column in self.columns(model))
+            schema_editor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {table} "
+                f"USING fts5({columns}, tokenize='trigram')"
+            )
+            schema_editor.execute(
+                f"INSERT INTO {table}(rowid, {columns}) "
+                f"SELECT {qn(model._meta.pk.column)}, {columns} FROM {qn(model._meta.db_table)}"
+            )
+
+    def uninstall(self, schema_editor):
+        for model in searchable_models():
+            schema_editor.execute(f"DROP TABLE IF EXISTS {schema_editor.quote_name(self.table(model))}")
+
+    def index(self, model, instances):
+        if model not in SEARCH_FIELDS:
+            return
+        fields = SEARCH_FIELDS[model]
+        rows = [
+            [instance.pk, *(getattr(instance, field) for field in fields)]
+            for instance in instances
+            if instance.pk is not None
+        ]
+        if not rows:
+            return
+        connection = connections[self.using]
+        qn = connection.ops.quote_name
+        table = qn(self.table(model))
+        columns = ", ".join(qn(column) for column in self.columns(model))
+        placeholders = ", ".join(["%s"] * (len(fields) + 1))
+        with connection.cursor() as cursor:
+            cursor.executemany(f"DELETE FROM {table} WHERE rowid = %s", [[row[0]] for row in rows])
+            cursor.executemany(
+                f"INSERT INTO {table}(rowid, {columns}) VALUES ({placeholders})", rows
+            )
+
+    def remove(self, model, pks):
+        if model not in SEARCH_FIELDS:
+            return
+        connection = connections[self.using]
+        table = connection.ops.quote_name(self.table(model))
+        with connection.cursor() as cursor:
+            cursor.executemany(f"DELETE FROM {table} WHERE rowid = %s", [[pk] for pk in pks])
+
+    def phrase(self, term):
+        return '"{}"'.format(term.replace('"', '""'))
+
+    def match(self, queryset, term):
+        if len(term) < self.MIN_TERM_LENGTH:
+            return super().match(queryset, term)
+        model = queryset.model
+        qn = connections[self.using].ops.quote_name
+        table = qn(self.table(model))
+        pk = f"{qn(model._meta.db_table)}.{qn(model._meta.pk.column)}"
+        # Joined on rowid rather than matched per row, so MATCH runs once
+        # and drives the join. FTS5 rank is bm25, where lower is better.
+        return queryset.extra(
+            tables=[self.table(model)],
+            where=[f"{table} MATCH %s", f"{table}.rowid = {pk}"],
+            params=[self.phrase(term)],
+        ).annotate(**{SEARCH_RANK: RawSQL(f"-{table}.rank", [], output_field=FloatField())})
+
+    def matching_pks(self, model, term):
+        if len(term) < self.MIN_TERM_LENGTH:
+            return super().matching_pks(model, term)
+        table = connections[self.using].ops.quote_name(self.table(model))
+        return RawSQL(f"SELECT rowid FROM {table} WHERE {table} MATCH %s", [self.phrase(term)])
+
+
+class PostgresTrigramBackend(SearchBackend):
+    """
+    pg_trgm GIN indexes on `UPPER(column)`, the expression Django's
+    `icontains` compiles to, so both `search` and the existing `icontains`
+    filters are served from the index. Results are ranked by trigram word
+    similarity. The indexes live on the tables, so nothing needs syncing.
+    """
+
+    def index_name(self, model, column):
+        return f"{model._meta.db_table}_{column}_trgm"
+
+    def install(self, schema_editor):
+        qn = schema_editor.quote_name
+        schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        for model in searchable_models():
+            for column in (model._meta.get_field(field).column for field in SEARCH_FIELDS[model]):
+                schema_editor.execute(
+                    f"CREATE INDEX IF NOT EXISTS {qn(self.index_name(model, column))} "
+                    f"ON {qn(model._meta.db_table)} USING gin (UPPER({qn(column)}::text) gin_trgm_ops)"
+                )
+
+    def uninstall(self, schema_editor):
+        for model in searchable_models():
+            for field in SEARCH_FIELDS[model]:
+                column = model._meta.get_field(field).column
+                schema_editor.execute(
+                    f"DROP INDEX IF EXISTS {schema_editor.quote_name(self.index_name(model, column))}"
+                )
+
+    def rank(self, model, term):
+        from django.contrib.postgres.search import TrigramWordSimilarity
+        from django.db.models.functions import Greatest
+
+        similarities = [TrigramWordSimilarity(term, field) for field in SEARCH_FIELDS[model]]
+        return similarities[0] if len(similarities) == 1 else Greatest(*similarities)
+
+
+BACKENDS = {
+    "sqlite": SQLiteFTSBackend,
+    "postgresql": PostgresTrigramBackend,
+}
+
+
+def get_backend(using="default"):
+    """
+    The backend named by the CRM_SEARCH_BACKEND setting, or the one matching
+    the database vendor.
+    """
+    path = getattr(settings, "CRM_SEARCH_BACKEND", None)
+    if path:
+        return import_string(path)(using)
+    connection = connections[using]
+    if connection.vendor == "sqlite":
+        import sqlite3
+        if sqlite3.sqlite_version_info < (3, 34):
+            return SearchBackend(using)
+    return BACKENDS.get(connection.vendor, SearchBackend)(using)
+
+
+def search(queryset, term):
+    """Filter `queryset` to rows matching `term`, annotated with SEARCH_RANK."""
+    return get_backend(queryset.db).search(queryset, term)
@@ -0,0 +1,70 @@
+from django.db.backends.signals import connection_created
+from django.db.models import QuerySet
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from . import db_connections, response_cache, search
+from .models import Customer, Product, Order
+
+# -----------------------------
+# Response Cache Invalidation
+# -----------------------------
+@receiver(post_save, sender=Customer)
+@receiver(post_save, sender=Product)
+@receiver(post_save, sender=Order)
+@receiver(post_delete, sender=Customer)
+@receiver(post_delete, sender=Product)
+@receiver(post_delete, sender=Order)
+def invalidate_cached_responses(sender, **kwargs):
+    response_cache.invalidate_on_commit(sender)
+
+
+@receiver(m2m_changed, sender=Order.products.through)
+def invalidate_cached_order_products(sender, action, **kwargs):
+    if action in ("post_add", "post_remove", "post_clear"):
+        response_cache.invalidate_on_commit(Order, Product)
+
+
+# -----------------------------
+# Search Index Sync
+# -----------------------------
+@receiver(post_save, sender=Customer)
+@receiver(post_save, sender=Product)
+def index_searchable(sender, instance, using, update_fields=None, **kwargs):
+    if update_fields is not None and not set(update_fields) & set(search.SEARCH_FIELDS[sender]):
+        return
+    search.get_backend(using).index(sender, [instance])
+
+
+@receiver(post_delete, sender=Customer)
+@receiver(post_delete, sender=Product)
+def unindex_searchable(sender, instance, using, **kwargs):
+    search.get_backend(using).remove(sender, [instance.pk])
+
+
+# -----------------------------
+# Customer Order Stats
+# -----------------------------
+@receiver(post_save, sender=Order)
+def add_order_to_customer_stats(sender, instance, created, **kwargs):
+    if created:
+        Customer.objects.add_orders([instance.pk])
+        response_cache.invalidate_on_commit(Customer)
+
+
+@receiver(post_delete, sender=Order)
+def remove_order_from_customer_stats(sender, instance, origin=None, **kwargs):
+    # Orders cascading from a customer delete take the customer with them.
+    origin_model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    if origin_model is Customer:
+        return
+    Customer.objects.remove_order(instance)
+    response_cache.invalidate_on_commit(Customer)
+
+
+# -----------------------------
+# Database Connections
+# -----------------------------
+@receiver(connection_created)
+def configure_connection(sender, connection, **kwargs):
+    db_connections.configure_connection(connection)
@@ -1,59 +1,110 @@
 import datetime
-from gql import gql, Client
-from gql.transport.requests import RequestsHTTPTransport
 
-LOG_FILE = "/tmp/crm_report_log.txt"
+from celery import group
+from django.utils import timezone
 
-from celery import shared_task
+from . import reminders
+from .celery import app
+from .job_logging import job_run
+from .jobs import get_runtime
 
-@shared_task
+# -----------------------------
+# Heartbeat
+# -----------------------------
+@app.task
+def log_crm_heartbeat():
+    """
+    Logs a heartbeat every 5 minutes. Queries the GraphQL hello field to
+    verify the schema is responsive.
+    """
+    with job_run("crm_heartbeat") as run:
+        try:
+            run.record(responsive=True, result=get_runtime().execute("query { hello }"))
+        except Exception as e:
+            run.record(responsive=False, error=str(e))
+
+
+# -----------------------------
+# Low-Stock Restocking
+# -----------------------------
+@app.task
+def update_low_stock():
+    """
+    Runs every 12 hours to update products with stock < 10 and logs the
+    restocked products.
+    """
+    with job_run("update_low_stock") as run:
+        result = get_runtime().execute("""
+        mutation {
+            updateLowStockProducts {
+                message
+                updatedProducts {
+                    id
+                    name
+                    stock
+                }
+            }
+        }
+        """)["updateLowStockProducts"]
+        run.count("products", len(result["updatedProducts"]))
+        run.record(summary=result["message"], products=result["updatedProducts"])
+
+
+# -----------------------------
+# Weekly CRM Report
+# -----------------------------
+@app.task
 def generate_crm_report():
     """
     Generates a weekly CRM report with total customers, orders, and revenue.
-    Logs the report to /tmp/crm_report_log.txt
-    """
-    timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    
-    # Setup GraphQL client
-    transport = RequestsHTTPTransport(
-        url="http://localhost:8000/graphql",
-        verify=True,
-        retries=3,
-    )
-    client = Client(transport=transport, fetch_schema_from_transport=True)
-    
-    # GraphQL query for totals
-    query = gql("""
-    query {
-        allCustomers {
-            totalCount
-        }
-        allOrders {
-            totalCount
-            edges {
-                node {
-                    totalAmount
-                }
+    """
+    with job_run("crm_report") as run:
+        # Totals are aggregated by the database
+        stats = get_runtime().execute("""
+        query {
+            crmStats {
+                totalCustomers
+                totalOrders
+                totalRevenue
             }
         }
-    }
-    """)
-    
-    try:
-        result = client.execute(query)
-        
-        total_customers = result['allCustomers']['totalCount']
-        total_orders = result['allOrders']['totalCount']
-        total_revenue = sum(order['node']['totalAmount'] for order in result['allOrders']['edges'])
-        
-        # Log report
-        with open(LOG_FILE, "a") as f:
-            f.write(f"{timestamp} - Report: {total_customers} customers, {total_orders} orders, {total_revenue} revenue\n")
-        
-        print("CRM weekly report generated!")
-    
-    except Exception as e:
-        with open(LOG_FILE, "a") as f:
-            f.write(f"{timestamp} - Failed to generate report: {e}\n")
-        print("Error generating CRM report:", e)
+        """)["crmStats"]
+        run.record(
+            customers=stats["totalCustomers"],
+            orders=stats["totalOrders"],
+            revenue=stats["totalRevenue"],
+        )
+
+
+# -----------------------------
+# Order Reminders
+# -----------------------------
+@app.task
+def send_order_reminders():
+    """
+    Fans the weekly order reminders out over ORDER_REMINDER_SHARDS workers,
+    one task per customer id shard.
+    """
+    with job_run("send_order_reminders") as run:
+        shards = reminders.get_config()["SHARDS"]
+        since = timezone.now() - datetime.timedelta(days=reminders.get_config()["DAYS"])
+        group(
+            send_order_reminders_shard.s(shard, shards, since.isoformat())
+            for shard in range(shards)
+        ).apply_async()
+        run.record(shards=shards, since=since)
+    return shards
+
 
+@app.task
+def send_order_reminders_shard(shard, shards, since):
+    """
+    Emails one reminder per customer in the shard with unreminded orders since
+    `since`; reminded orders are marked so re-runs and retries skip them.
+    """
+    with job_run("send_order_reminders_shard") as run:
+        run.record(shard=shard, shards=shards)
+        customers, orders = reminders.send_reminders(
+            shard, shards, datetime.datetime.fromisoformat(since), run=run
+        )
+    return {"shard": shard, "customers": customers, "orders": orders}
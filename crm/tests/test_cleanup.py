@@ -0,0 +1,78 @@
+import datetime
+import json
+import os
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from crm.management.commands import clean_inactive_customers
+from crm.models import Customer, Order
+
+from .utils import make_customer, make_product
+
+
+# -----------------------------
+# Inactive Customer Cleanup
+# -----------------------------
+class CleanInactiveCustomersTests(TestCase):
+    def setUp(self):
+        lamp = make_product()
+        self.names = {}
+        for name, days_ago in (("Ada", 400), ("Bob", 10), ("Carol", None), ("Dan", 500), ("Eve", 2)):
+            customer = make_customer(name)
+            if days_ago is not None:
+                order = Order.objects.create(
+                    customer=customer, total_amount=lamp.price,
+                    order_date=timezone.now() - datetime.timedelta(days=days_ago),
+                )
+                order.products.add(lamp)
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.checkpoint = os.path.join(directory.name, "checkpoint")
+
+    def clean(self, *args, **options):
+        out = StringIO()
+        call_command(
+            "clean_inactive_customers", *args, days=365, batch_size=2,
+            checkpoint=self.checkpoint, stdout=out, **options,
+        )
+        return out.getvalue()
+
+    def remaining(self):
+        return sorted(Customer.objects.values_list("name", flat=True))
+
+    def test_dry_run(self):
+        out = self.clean(dry_run=True)
+        self.assertIn("Would delete 3 customers and 2 orders", out)
+        self.assertEqual(len(self.remaining()), 5)
+
+    def test_deletes_inactive_customers_in_batches(self):
+        self.assertEqual(self.clean().strip(), "3")
+        self.assertEqual(self.remaining(), ["Bob", "Eve"])
+        self.assertEqual(Order.objects.count(), 2)
+        self.assertEqual(Order.products.through.objects.count(), 2)
+        self.assertFalse(os.path.exists(self.checkpoint))
+
+    def test_collector_path(self):
+        with mock.patch.object(clean_inactive_customers, "raw_cascade_is_safe", return_value=False):
+            self.assertEqual(self.clean().strip(), "3")
+        self.assertEqual(self.remaining(), ["Bob", "Eve"])
+        self.assertEqual(Order.objects.count(), 2)
+
+    def test_resume_from_checkpoint(self):
+        ada = Customer.objects.get(name="Ada")
+        cutoff = timezone.now() - datetime.timedelta(days=365)
+        with open(self.checkpoint, "w") as f:
+            json.dump({"cutoff": cutoff.isoformat(), "last_pk": ada.pk, "deleted": 1}, f)
+        self.assertEqual(self.clean(resume=True).strip(), "3")
+        # Ada was before the checkpoint, so this run skipped her.
+        self.assertEqual(self.remaining(), ["Ada", "Bob", "Eve"])
+
+    def test_customers_with_unfilled_stats_are_kept(self):
+        Customer.objects.filter(name="Eve").update(last_order_at=None, order_count=0)
+        self.clean()
+        self.assertIn("Eve", self.remaining())
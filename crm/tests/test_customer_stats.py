@@ -0,0 +1,146 @@
+import datetime
+from decimal import Decimal
+
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.db.models import Count, Max, Sum
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+
+from crm.models import Customer, Order
+
+from .utils import execute, make_customer, make_product
+
+
+def recounted(customer):
+    totals = Order.objects.filter(customer=customer).aggregate(
+        order_count=Count("pk"), lifetime_value=Sum("total_amount"), last_order_at=Max("order_date")
+    )
+    totals["lifetime_value"] = totals["lifetime_value"] or Decimal("0")
+    return totals
+
+
+# -----------------------------
+# Stats Upkeep
+# -----------------------------
+class CustomerOrderStatsTests(TestCase):
+    def setUp(self):
+        self.ada = make_customer("Ada")
+        self.bob = make_customer("Bob")
+        self.lamp = make_product("Lamp", price="10.00")
+        self.desk = make_product("Desk", price="2.50")
+
+    def assertStatsMatchRecount(self):
+        for customer in Customer.objects.order_by("pk"):
+            with self.subTest(customer.name):
+                self.assertEqual(
+                    {field: getattr(customer, field) for field in Customer.STATS_FIELDS},
+                    recounted(customer),
+                )
+
+    def order(self, customer, *products, days_ago=0):
+        order = Order.objects.create(
+            customer=customer,
+            total_amount=sum(product.price for product in products),
+            order_date=timezone.now() - datetime.timedelta(days=days_ago),
+        )
+        order.products.set(products)
+        return order
+
+    def test_created_orders(self):
+        self.order(self.ada, self.lamp, days_ago=3)
+        self.order(self.ada, self.desk)
+        ada = Customer.objects.get(pk=self.ada.pk)
+        self.assertEqual(ada.order_count, 2)
+        self.assertEqual(ada.lifetime_value, Decimal("12.50"))
+        self.assertStatsMatchRecount()
+
+    def test_mutations(self):
+        execute(
+            "mutation ($c: ID!, $p: [ID]!) { createOrder(customerId: $c, productIds: $p) { order { id } } }",
+            {"c": self.ada.pk, "p": [self.lamp.pk]},
+        )
+        execute(
+            "mutation ($input: [OrderInput]!) { bulkCreateOrders(input: $input) { errors } }",
+            {"input": [
+                {"customerId": self.bob.pk, "productIds": [self.desk.pk]},
+                {"customerId": self.ada.pk, "productIds": [self.lamp.pk, self.desk.pk]},
+            ]},
+        )
+        self.assertEqual(Customer.objects.get(pk=self.ada.pk).order_count, 2)
+        self.assertStatsMatchRecount()
+
+    def test_deleted_order(self):
+        self.order(self.ada, self.lamp, days_ago=3)
+        self.order(self.ada, self.desk).delete()
+        self.assertEqual(Customer.objects.get(pk=self.ada.pk).order_count, 1)
+        self.assertStatsMatchRecount()
+
+    def test_retotalled_order(self):
+        order = self.order(self.ada, self.lamp)
+        order.products.add(self.desk)
+        order.save()
+        self.assertEqual(Customer.objects.get(pk=self.ada.pk).lifetime_value, Decimal("12.50"))
+        self.assertStatsMatchRecount()
+
+    def test_order_moved_to_another_customer(self):
+        self.order(self.ada, self.desk, days_ago=5)
+        order = self.order(self.ada, self.lamp)
+
+        order = Order.objects.get(pk=order.pk)
+        order.customer = self.bob
+        order.save()
+        self.assertEqual(Customer.objects.get(pk=self.ada.pk).order_count, 1)
+        self.assertEqual(Customer.objects.get(pk=self.bob.pk).order_count, 1)
+        self.assertStatsMatchRecount()
+
+    def test_order_moved_on_an_unloaded_instance(self):
+        order = self.order(self.ada, self.lamp)
+        Order(pk=order.pk, customer=self.bob, order_date=order.order_date).save()
+        self.assertStatsMatchRecount()
+
+    def test_inactive(self):
+        cutoff = timezone.now() - datetime.timedelta(days=30)
+        make_customer("Carol")
+        self.order(self.ada, self.lamp, days_ago=60)
+        self.order(self.bob, self.lamp)
+        # Stats that were never filled in do not make Bob inactive.
+        Customer.objects.filter(pk=self.bob.pk).update(last_order_at=None, order_count=0)
+        self.assertEqual(
+            set(Customer.objects.inactive(cutoff).values_list("name", flat=True)), {"Ada", "Carol"}
+        )
+
+
+# -----------------------------
+# Migration Backfill
+# -----------------------------
+class OrderStatsMigrationTests(TransactionTestCase):
+    before = [("crm", "0003_search_index")]
+    after = [("crm", "0004_customer_order_stats")]
+
+    def migrate(self, targets):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(targets)
+        return executor.loader.project_state(targets).apps
+
+    def tearDown(self):
+        self.migrate(MigrationExecutor(connection).loader.graph.leaf_nodes())
+
+    def test_existing_customers_are_backfilled(self):
+        apps = self.migrate(self.before)
+        OldCustomer = apps.get_model("crm", "Customer")
+        OldOrder = apps.get_model("crm", "Order")
+        ada = OldCustomer.objects.create(name="Ada", email="ada@example.com")
+        OldCustomer.objects.create(name="Bob", email="bob@example.com")
+        OldOrder.objects.create(customer=ada, total_amount=Decimal("10.00"))
+        latest = OldOrder.objects.create(customer=ada, total_amount=Decimal("2.50"))
+
+        apps = self.migrate(self.after)
+        Customer = apps.get_model("crm", "Customer")
+        self.assertEqual(
+            list(Customer.objects.order_by("name").values_list(
+                "name", "order_count", "lifetime_value", "last_order_at"
+            )),
+            [("Ada", 2, Decimal("12.50"), latest.order_date), ("Bob", 0, Decimal("0"), None)],
+        )
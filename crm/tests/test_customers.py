@@ -0,0 +1,77 @@
+from django.test import TestCase
+
+from crm.models import Customer
+
+from .utils import execute, make_customer
+
+BULK_CREATE_CUSTOMERS = """
+mutation ($input: [CustomerInput]!, $batchSize: Int) {
+    bulkCreateCustomers(input: $input, batchSize: $batchSize) {
+        customers { email } errors rowErrors { index email message } } }
+"""
+
+
+def row(n, **fields):
+    return {"name": f"Customer {n}", "email": f"c{n}@example.com", **fields}
+
+
+# -----------------------------
+# bulkCreateCustomers
+# -----------------------------
+class BulkCreateCustomersTests(TestCase):
+    def bulk_create(self, rows, **variables):
+        result = execute(BULK_CREATE_CUSTOMERS, {"input": rows, **variables})
+        self.assertIsNone(result.errors)
+        payload = result.data["bulkCreateCustomers"]
+        return payload, [(e["index"], e["email"], e["message"]) for e in payload["rowErrors"]]
+
+    def test_creates_every_valid_row(self):
+        payload, errors = self.bulk_create([row(1, phone="+1234567890"), row(2, phone="123-456-7890")])
+        self.assertEqual(errors, [])
+        self.assertEqual(
+            [c["email"] for c in payload["customers"]], ["c1@example.com", "c2@example.com"]
+        )
+        self.assertEqual(Customer.objects.count(), 2)
+
+    def test_duplicate_emails_in_the_batch_keep_the_first_row(self):
+        payload, errors = self.bulk_create([row(1), row(2), {**row(3), "email": "c1@example.com"}])
+        self.assertEqual(
+            errors, [(2, "c1@example.com", "Email c1@example.com is duplicated in the batch")]
+        )
+        self.assertEqual(Customer.objects.get(email="c1@example.com").name, "Customer 1")
+        self.assertEqual(len(payload["customers"]), 2)
+
+    def test_existing_emails_are_reported(self):
+        make_customer("Ada", email="c2@example.com")
+        payload, errors = self.bulk_create([row(1), row(2), row(3)])
+        self.assertEqual(errors, [(1, "c2@example.com", "Email c2@example.com already exists")])
+        self.assertEqual(Customer.objects.get(email="c2@example.com").name, "Ada")
+        self.assertEqual(len(payload["customers"]), 2)
+
+    def test_invalid_phones_are_reported(self):
+        payload, errors = self.bulk_create([row(1, phone="12345"), row(2, phone="+1234567890")])
+        self.assertEqual(errors, [(0, "c1@example.com", "Phone format invalid for 12345")])
+        self.assertEqual(payload["errors"], ["Phone format invalid for 12345"])
+        self.assertEqual([c["email"] for c in payload["customers"]], ["c2@example.com"])
+
+    def test_errors_are_ordered_by_row(self):
+        make_customer("Ada", email="c0@example.com")
+        _, errors = self.bulk_create([row(0), row(1, phone="bad"), row(0)])
+        self.assertEqual([index for index, _, _ in errors], [0, 1, 2])
+
+    def test_queries_grow_with_batches_not_rows(self):
+        rows = [row(n) for n in range(6)]
+        # Per batch of 3: one email__in lookup, one INSERT and one search
+        # index write; plus the savepoint and its release.
+        with self.assertNumQueries(2 * 3 + 2):
+            payload, errors = self.bulk_create(rows, batchSize=3)
+        self.assertEqual((len(payload["customers"]), errors), (6, []))
+
+    def test_null_batch_size_uses_the_default(self):
+        payload, errors = self.bulk_create([row(1)], batchSize=None)
+        self.assertEqual((len(payload["customers"]), errors), (1, []))
+
+    def test_batch_size_must_be_positive(self):
+        result = execute(BULK_CREATE_CUSTOMERS, {"input": [row(1)], "batchSize": 0})
+        self.assertIn("batch_size must be positive", result.errors[0].message)
+        self.assertFalse(Customer.objects.exists())
@@ -0,0 +1,49 @@
+import os
+import tempfile
+
+from django.db import connections
+from django.test import SimpleTestCase, override_settings
+
+from crm.db_connections import sqlite_pragmas
+
+
+# -----------------------------
+# SQLite Connection Setup
+# -----------------------------
+class SQLitePragmaTests(SimpleTestCase):
+    """New connections to a database file are tuned by the connection_created signal."""
+
+    # Each test opens its own connection to a throwaway file.
+    databases = {"default"}
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.name = os.path.join(directory.name, "crm.sqlite3")
+
+    def connect(self):
+        wrapper = connections.create_connection("default")
+        wrapper.settings_dict = {**wrapper.settings_dict, "NAME": self.name}
+        self.addCleanup(wrapper.close)
+        wrapper.ensure_connection()
+        return wrapper
+
+    def test_new_connections_get_the_configured_pragmas(self):
+        self.assertEqual(sqlite_pragmas(self.connect()), {
+            "journal_mode": "wal",
+            "busy_timeout": 5000,
+            "synchronous": 1,
+            "mmap_size": 256 * 1024 * 1024,
+        })
+
+    @override_settings(CRM_DB_CONNECTIONS={"SQLITE_PRAGMAS": {"busy_timeout": 100}})
+    def test_configured_pragmas_replace_the_defaults(self):
+        pragmas = sqlite_pragmas(self.connect())
+        self.assertEqual(pragmas["busy_timeout"], 100)
+        self.assertEqual(pragmas["journal_mode"], "delete")
+
+    @override_settings(CRM_DB_CONNECTIONS={"SQLITE_PRAGMAS": {}})
+    def test_no_pragmas_leaves_sqlite_defaults(self):
+        pragmas = sqlite_pragmas(self.connect())
+        self.assertEqual(pragmas["journal_mode"], "delete")
+        self.assertEqual(pragmas["synchronous"], 2)
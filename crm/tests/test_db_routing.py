@@ -0,0 +1,99 @@
+import json
+import time
+from unittest import mock
+
+from django.test import TransactionTestCase, override_settings
+
+from crm import db_routing
+from crm.models import Customer, Product
+
+from .utils import make_customer, make_product
+
+CUSTOMERS = json.dumps({"query": "{ customers { name } }"})
+CREATE_CUSTOMER = json.dumps({
+    "query": 'mutation { createCustomer(name: "Bob", email: "bob@example.com") { customer { id } } }'
+})
+PRODUCTS = json.dumps({"query": "{ products { stock } }"})
+RESTOCK = json.dumps({"query": "mutation { updateLowStockProducts { message } }"})
+
+
+# -----------------------------
+# Replica Routing
+# -----------------------------
+@override_settings(CRM_DB_ROUTING={"REPLICAS": ["replica"], "STICKY_SECONDS": 5})
+class ReplicaRoutingTests(TransactionTestCase):
+    """
+    'default' and 'replica' are separate SQLite databases here, and the
+    replica copy of Ada carries a different name, so each response shows
+    which database served it. Reads inside a transaction use the primary,
+    hence no TestCase.
+    """
+
+    databases = {"default", "replica"}
+
+    def setUp(self):
+        self.ada = make_customer("Ada")
+        Customer.objects.using("replica").bulk_create(
+            [Customer(pk=self.ada.pk, name="Ada (replica)", email=self.ada.email)]
+        )
+
+    def post(self, query):
+        response = self.client.post("/graphql", query, content_type="application/json")
+        return response, json.loads(response.content)
+
+    def names(self):
+        return [customer["name"] for customer in self.post(CUSTOMERS)[1]["data"]["customers"]]
+
+    def test_queries_read_from_the_replica(self):
+        self.assertEqual(self.names(), ["Ada (replica)"])
+        self.assertNotIn("crm_primary_until", self.client.cookies)
+
+    def test_mutations_use_the_primary(self):
+        response, result = self.post(CREATE_CUSTOMER)
+        self.assertNotIn("errors", result)
+        self.assertTrue(Customer.objects.using("default").filter(name="Bob").exists())
+        self.assertFalse(Customer.objects.using("replica").filter(name="Bob").exists())
+        self.assertIn("crm_primary_until", response.cookies)
+
+    def test_client_reads_its_writes_after_a_mutation(self):
+        self.post(CREATE_CUSTOMER)
+        self.assertEqual(self.names(), ["Ada", "Bob"])
+
+        # Once the cookie lapses the client is back on the replica.
+        self.client.cookies["crm_primary_until"] = str(time.time() - 1)
+        self.assertEqual(self.names(), ["Ada (replica)"])
+
+    def test_restock_marks_the_request_as_a_write(self):
+        lamp = make_product("Lamp", stock=5)
+        Product.objects.using("replica").bulk_create([Product(pk=lamp.pk, name="Lamp", price=lamp.price, stock=5)])
+
+        response, result = self.post(RESTOCK)
+        self.assertNotIn("errors", result)
+        self.assertEqual(Product.objects.using("default").get().stock, 15)
+        self.assertIn("crm_primary_until", response.cookies)
+        self.assertEqual(self.post(PRODUCTS)[1]["data"]["products"], [{"stock": 15}])
+
+
+class ReplicaLagTests(TransactionTestCase):
+    databases = {"default", "replica"}
+    config = {"LAG_CHECK_INTERVAL": 5}
+
+    def setUp(self):
+        db_routing._lags.clear()
+
+    def wait_for_refresh(self):
+        for thread in list(db_routing.threading.enumerate()):
+            if thread.name == "crm-lag-replica":
+                thread.join()
+
+    def test_lag_is_measured_off_the_request_thread(self):
+        with mock.patch.dict(db_routing.LAG_QUERIES, {"sqlite": "SELECT 3"}):
+            with self.assertNumQueries(0, using="replica"):
+                # Unknown until the first measurement lands.
+                self.assertEqual(db_routing.replica_lag("replica", self.config), float("inf"))
+                self.wait_for_refresh()
+                self.assertEqual(db_routing.replica_lag("replica", self.config), 3.0)
+
+    def test_backends_without_a_lag_query_are_never_behind(self):
+        with self.assertNumQueries(0, using="replica"):
+            self.assertEqual(db_routing.replica_lag("replica", self.config), 0.0)
@@ -0,0 +1,68 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from crm.models import Order
+
+from .utils import make_customer
+
+
+# -----------------------------
+# Streaming Exports
+# -----------------------------
+class ExportViewTests(TestCase):
+    def setUp(self):
+        self.ada = make_customer("Ada", phone="+15550000001")
+        self.bob = make_customer("Bob", phone="555-000-0002")
+        Order.objects.create(customer=self.ada, total_amount="12.50")
+        self.staff = get_user_model().objects.create_user("staff", is_staff=True)
+
+    def export(self, path, **params):
+        response = self.client.get(path, params)
+        return response, b"".join(response.streaming_content).decode()
+
+    def test_requires_staff(self):
+        for path in ("/export/customers", "/export/orders"):
+            with self.subTest(path, user="anonymous"):
+                self.assertEqual(self.client.get(path).status_code, 403)
+
+        user = get_user_model().objects.create_user("clerk")
+        self.client.force_login(user)
+        response = self.client.get("/export/customers")
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(response.json(), {"errors": ["Staff login required."]})
+
+    def test_customers_ndjson(self):
+        self.client.force_login(self.staff)
+        response, body = self.export("/export/customers", name="ad")
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        self.assertEqual(
+            [json.loads(line) for line in body.splitlines()],
+            [{"id": self.ada.pk, "name": "Ada", "email": "ada@example.com", "phone": "+15550000001"}],
+        )
+
+    def test_customers_by_phone_prefix(self):
+        self.client.force_login(self.staff)
+        _, body = self.export("/export/customers", phone_pattern="555")
+        self.assertEqual([json.loads(line)["name"] for line in body.splitlines()], ["Bob"])
+
+    def test_unknown_filters_are_ignored(self):
+        self.client.force_login(self.staff)
+        response, body = self.export("/export/customers", created_at_gte="2024-01-01")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(body.splitlines()), 2)
+
+    def test_orders_csv(self):
+        self.client.force_login(self.staff)
+        response, body = self.export("/export/orders", format="csv", customer_name="ada")
+        self.assertEqual(response["Content-Type"], "text/csv")
+        header, row = body.splitlines()
+        self.assertEqual(header, "id,customer_id,customer__name,customer__email,total_amount,order_date")
+        self.assertTrue(row.startswith(f"{Order.objects.get().pk},{self.ada.pk},Ada,ada@example.com,12.50,"))
+
+    def test_invalid_filter(self):
+        self.client.force_login(self.staff)
+        response = self.client.get("/export/orders", {"order_date_gte": "soon"})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("order_date_gte", response.json()["errors"])
@@ -0,0 +1,97 @@
+import json
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+
+from crm.instrumentation import registry
+
+from .utils import make_customer
+
+CUSTOMERS = json.dumps({"query": "{ customers { name orders { id } } }"})
+
+
+def parse_metrics(text):
+    """Map each sample line of a Prometheus text exposition to its value."""
+    samples = {}
+    for line in text.splitlines():
+        if line and not line.startswith("#"):
+            name, value = line.rsplit(" ", 1)
+            samples[name] = float(value)
+    return samples
+
+
+# -----------------------------
+# Request Traces
+# -----------------------------
+@override_settings(GRAPHQL_INSTRUMENTATION={"ENABLED": True, "EXTENSIONS": True})
+class InstrumentationTests(TestCase):
+    def setUp(self):
+        registry.clear()
+        make_customer("Ada")
+        make_customer("Bob")
+
+    def post(self, body):
+        response = self.client.post("/graphql", body, content_type="application/json")
+        return json.loads(response.content)
+
+    def test_trace_is_returned_in_the_extensions(self):
+        trace = self.post(CUSTOMERS)["extensions"]["trace"]
+        fields = {field["field"]: field for field in trace["fields"]}
+
+        # The customers and their prefetched orders: both charged to the root field.
+        self.assertEqual(trace["sql"]["count"], 2)
+        self.assertEqual(fields["Query.customers"]["calls"], 1)
+        self.assertEqual(fields["Query.customers"]["sqlCount"], 2)
+        self.assertEqual(fields["CustomerType.orders"]["calls"], 2)
+        self.assertEqual(fields["CustomerType.orders"]["sqlCount"], 0)
+        self.assertGreater(trace["durationMs"], 0)
+
+    def test_extensions_are_off_by_default(self):
+        with self.settings(GRAPHQL_INSTRUMENTATION={"ENABLED": True}):
+            self.assertNotIn("trace", self.post(CUSTOMERS)["extensions"])
+
+    def test_metrics_are_served_after_a_request(self):
+        self.post(CUSTOMERS)
+        response = self.client.get("/metrics")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Content-Type"].startswith("text/plain; version=0.0.4"))
+
+        samples = parse_metrics(response.content.decode())
+        self.assertEqual(samples['crm_graphql_request_duration_seconds_count{operation="query"}'], 1)
+        self.assertEqual(samples['crm_graphql_request_sql_queries_sum{operation="query"}'], 2)
+        self.assertEqual(
+            samples['crm_graphql_request_sql_queries_bucket{operation="query",le="1.0"}'], 0
+        )
+        self.assertEqual(
+            samples['crm_graphql_request_sql_queries_bucket{operation="query",le="2.0"}'], 1
+        )
+        self.assertEqual(
+            samples['crm_graphql_resolver_duration_seconds_count{field="Query.customers"}'], 1
+        )
+        self.assertEqual(samples['crm_graphql_field_sql_queries_sum{field="Query.customers"}'], 2)
+
+    def test_disabled_instrumentation_records_nothing(self):
+        with self.settings(GRAPHQL_INSTRUMENTATION={"ENABLED": False}):
+            self.post(CUSTOMERS)
+        self.assertEqual(self.client.get("/metrics").content, b"")
+
+
+# -----------------------------
+# Metrics Access
+# -----------------------------
+class MetricsAccessTests(TestCase):
+    def get(self, remote_addr):
+        return self.client.get("/metrics", REMOTE_ADDR=remote_addr)
+
+    def test_allowed_ips_may_scrape(self):
+        self.assertEqual(self.get("127.0.0.1").status_code, 200)
+        with self.settings(GRAPHQL_INSTRUMENTATION={"METRICS_ALLOWED_IPS": ["10.0.0.9"]}):
+            self.assertEqual(self.get("10.0.0.9").status_code, 200)
+            self.assertEqual(self.get("127.0.0.1").status_code, 403)
+
+    def test_other_clients_need_a_staff_login(self):
+        self.assertEqual(self.get("10.0.0.1").status_code, 403)
+        self.client.force_login(User.objects.create_user("alice"))
+        self.assertEqual(self.get("10.0.0.1").status_code, 403)
+        self.client.force_login(User.objects.create_user("admin", is_staff=True))
+        self.assertEqual(self.get("10.0.0.1").status_code, 200)
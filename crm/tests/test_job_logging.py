@@ -0,0 +1,79 @@
+import json
+import os
+import tempfile
+
+from django.test import SimpleTestCase, override_settings
+
+from crm.job_logging import close_job_logs, get_job_logger, job_run
+
+
+# -----------------------------
+# Job Logging
+# -----------------------------
+class JobLoggingTests(SimpleTestCase):
+    use_queue = False
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "jobs.log")
+        settings = override_settings(CRM_JOB_LOG={
+            "PATH": self.path, "BUFFER_SIZE": 100, "USE_QUEUE": self.use_queue,
+        })
+        settings.enable()
+        self.addCleanup(settings.disable)
+        # The logger is configured once per process; start from scratch.
+        close_job_logs()
+        self.addCleanup(close_job_logs)
+
+    def entries(self):
+        if not os.path.exists(self.path):
+            return []
+        with open(self.path) as log:
+            return [json.loads(line) for line in log]
+
+    def test_run_summary_is_written_when_the_run_ends(self):
+        with job_run("restock") as run:
+            run.log("batch done", products=3)
+            run.count("products", 3)
+            run.record(summary="3 products restocked")
+
+        batch, summary = self.entries()
+        self.assertEqual(
+            {key: batch[key] for key in ("level", "logger", "message", "job", "products")},
+            {"level": "INFO", "logger": "crm.jobs", "message": "batch done",
+             "job": "restock", "products": 3},
+        )
+        self.assertEqual(summary["message"], "restock finished")
+        self.assertEqual(summary["status"], "ok")
+        self.assertEqual(summary["rows"], {"products": 3})
+        self.assertEqual(summary["summary"], "3 products restocked")
+        self.assertIn("duration_ms", summary)
+        self.assertIn("ts", summary)
+
+    def test_every_run_is_written_without_waiting_for_exit(self):
+        for n in range(3):
+            with job_run("heartbeat"):
+                pass
+            self.assertEqual(len(self.entries()), n + 1)
+
+    def test_failed_run_logs_the_traceback(self):
+        with self.assertRaises(ZeroDivisionError):
+            with job_run("report"):
+                1 / 0
+
+        failure, summary = self.entries()
+        self.assertEqual(failure["level"], "ERROR")
+        self.assertIn("ZeroDivisionError", failure["exception"])
+        self.assertEqual(summary["status"], "error")
+
+    def test_close_writes_buffered_records(self):
+        get_job_logger().info("pending", extra={"fields": {"job": "cleanup"}})
+        close_job_logs()
+        self.assertEqual([entry["message"] for entry in self.entries()], ["pending"])
+
+
+class QueuedJobLoggingTests(JobLoggingTests):
+    """The same through the background writer thread (USE_QUEUE)."""
+
+    use_queue = True
@@ -0,0 +1,30 @@
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.test import TestCase
+
+from crm.loaders import AsyncDataLoader, batch_customers
+
+from .utils import make_customer
+
+
+# -----------------------------
+# Async DataLoaders
+# -----------------------------
+class AsyncDataLoaderTests(TestCase):
+    async def test_batches_loads_from_one_tick(self):
+        ada = await sync_to_async(make_customer)("Ada")
+        bob = await sync_to_async(make_customer)("Bob")
+        loader = AsyncDataLoader(batch_customers)
+
+        futures = [loader.load(ada.pk), loader.load(bob.pk), loader.load(ada.pk)]
+        await asyncio.sleep(0)
+        # The dispatch task is referenced until it finishes.
+        self.assertEqual(len(loader._tasks), 1)
+
+        self.assertEqual(await asyncio.gather(*futures), [ada, bob, ada])
+        await asyncio.sleep(0)
+        self.assertEqual(loader._tasks, set())
+        # Later loads are served from the cache.
+        self.assertEqual(loader.load(bob.pk), bob)
+
@@ -0,0 +1,133 @@
+import datetime
+import json
+import warnings
+
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+
+from crm.models import Order
+
+from .test_views import patch_graphene_settings
+from .utils import execute, make_customer, make_product
+
+CREATE_ORDER = """
+mutation ($customer: ID!, $products: [ID]!, $date: String) {
+    createOrder(customerId: $customer, productIds: $products, orderDate: $date) {
+        order { id totalAmount orderDate } } }
+"""
+
+BULK_CREATE_ORDERS = """
+mutation ($input: [OrderInput]!) { bulkCreateOrders(input: $input) {
+    orders { id orderDate } errors rowErrors { index message } } }
+"""
+
+
+# -----------------------------
+# createOrder
+# -----------------------------
+class CreateOrderTests(TestCase):
+    def setUp(self):
+        self.customer = make_customer()
+        self.lamp = make_product("Lamp", price="10.00")
+        self.desk = make_product("Desk", price="2.50")
+
+    def test_creates_order_with_total(self):
+        result = execute(CREATE_ORDER, {
+            "customer": self.customer.pk, "products": [self.lamp.pk, self.desk.pk],
+        })
+        self.assertIsNone(result.errors)
+        order = Order.objects.get()
+        self.assertEqual(result.data["createOrder"]["order"]["totalAmount"], "12.50")
+        self.assertEqual(set(order.products.all()), {self.lamp, self.desk})
+
+    def test_naive_order_date_is_made_aware(self):
+        with warnings.catch_warnings():
+            warnings.simplefilter("error", RuntimeWarning)
+            result = execute(CREATE_ORDER, {
+                "customer": self.customer.pk, "products": [self.lamp.pk],
+                "date": "2024-03-01T12:30:00",
+            })
+        self.assertIsNone(result.errors)
+        self.assertEqual(
+            Order.objects.get().order_date,
+            timezone.make_aware(datetime.datetime(2024, 3, 1, 12, 30)),
+        )
+
+    def test_invalid_ids_report_readable_messages(self):
+        result = execute(CREATE_ORDER, {"customer": "abc", "products": [self.lamp.pk]})
+        message = result.errors[0].message
+        self.assertIn("“abc” value must be an integer.", message)
+        self.assertNotIn("%(value)s", message)
+
+    def test_invalid_order_date(self):
+        result = execute(CREATE_ORDER, {
+            "customer": self.customer.pk, "products": [self.lamp.pk], "date": "yesterday",
+        })
+        self.assertIn("Invalid order date: yesterday", result.errors[0].message)
+        self.assertFalse(Order.objects.exists())
+
+
+class CreateOrderCustomerTests(TransactionTestCase):
+    """
+    SQLite checks foreign keys when the outermost transaction commits, so
+    these go through the view without a test transaction around them.
+    """
+
+    def setUp(self):
+        self.lamp = make_product()
+
+    def post(self, customer):
+        body = {"query": CREATE_ORDER, "variables": {"customer": customer, "products": [self.lamp.pk]}}
+        response = self.client.post("/graphql", json.dumps(body), content_type="application/json")
+        return response.json()
+
+    def assert_unknown_customer_is_reported(self, queries=2):
+        # The product prices and the customer lookup; nothing is written.
+        with self.assertNumQueries(queries):
+            result = self.post(999)
+        self.assertEqual(result["errors"][0]["message"], "Customer 999 does not exist")
+        self.assertFalse(Order.objects.exists())
+
+    def test_unknown_customer(self):
+        self.assert_unknown_customer_is_reported()
+
+    def test_unknown_customer_with_atomic_mutations(self):
+        with patch_graphene_settings(ATOMIC_MUTATIONS=True):
+            # Plus the request's BEGIN and COMMIT.
+            self.assert_unknown_customer_is_reported(queries=4)
+            result = self.post(make_customer().pk)
+        self.assertNotIn("errors", result)
+        self.assertEqual(Order.objects.count(), 1)
+
+
+# -----------------------------
+# bulkCreateOrders
+# -----------------------------
+class BulkCreateOrdersTests(TestCase):
+    def setUp(self):
+        self.customer = make_customer()
+        self.lamp = make_product()
+
+    def test_bad_rows_are_reported_without_aborting_the_batch(self):
+        result = execute(BULK_CREATE_ORDERS, {"input": [
+            {"customerId": self.customer.pk, "productIds": [self.lamp.pk], "orderDate": "2024-03-01"},
+            {"customerId": self.customer.pk, "productIds": [self.lamp.pk], "orderDate": "not a date"},
+            {"customerId": "abc", "productIds": [self.lamp.pk]},
+            {"customerId": 999, "productIds": [self.lamp.pk]},
+            {"customerId": self.customer.pk, "productIds": [self.lamp.pk]},
+        ]})
+        self.assertIsNone(result.errors)
+        payload = result.data["bulkCreateOrders"]
+        self.assertEqual(len(payload["orders"]), 2)
+        self.assertEqual(
+            [(error["index"], error["message"]) for error in payload["rowErrors"]],
+            [
+                (1, "Invalid order date: not a date"),
+                (2, "“abc” value must be an integer."),
+                (3, "Customer 999 does not exist"),
+            ],
+        )
+        self.assertEqual(
+            Order.objects.order_by("pk").first().order_date,
+            timezone.make_aware(datetime.datetime(2024, 3, 1)),
+        )
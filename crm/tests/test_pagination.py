@@ -0,0 +1,99 @@
+import datetime
+
+from django.test import TestCase
+from django.utils import timezone
+
+from crm.fields import encode_cursor
+from crm.models import Order
+
+from .utils import execute, make_customer
+
+ALL_ORDERS = """
+query ($first: Int, $last: Int, $after: String, $before: String) {
+    allOrders(first: $first, last: $last, after: $after, before: $before) {
+        edges { cursor node { id } }
+        pageInfo { hasNextPage hasPreviousPage startCursor endCursor } } }
+"""
+
+SEARCH_CUSTOMERS = """
+query ($after: String) {
+    allCustomers(search: "smith", first: 2, after: $after) {
+        edges { node { id } } pageInfo { hasNextPage endCursor } } }
+"""
+
+
+# -----------------------------
+# Keyset Pagination
+# -----------------------------
+class KeysetPaginationTests(TestCase):
+    def setUp(self):
+        customer = make_customer()
+        day = timezone.make_aware(datetime.datetime(2024, 3, 1))
+        # Pairs of orders share a date, so pages must break ties on id.
+        dates = [day, day, day + datetime.timedelta(days=1), day, day + datetime.timedelta(days=1)]
+        self.orders = [Order.objects.create(customer=customer, order_date=date) for date in dates]
+        self.ordered = [
+            str(pk) for pk in Order.objects.order_by("order_date", "id").values_list("pk", flat=True)
+        ]
+
+    def page(self, **variables):
+        result = execute(ALL_ORDERS, variables)
+        self.assertIsNone(result.errors)
+        connection = result.data["allOrders"]
+        return [edge["node"]["id"] for edge in connection["edges"]], connection["pageInfo"]
+
+    def test_first_after_walks_forward_through_ties(self):
+        seen, after = [], None
+        while True:
+            ids, info = self.page(first=2, after=after)
+            seen += ids
+            if not info["hasNextPage"]:
+                break
+            after = info["endCursor"]
+        self.assertEqual(seen, self.ordered)
+
+    def test_last_before_walks_backward_through_ties(self):
+        seen, before = [], None
+        while True:
+            ids, info = self.page(last=2, before=before)
+            seen = ids + seen
+            if not info["hasPreviousPage"]:
+                break
+            before = info["startCursor"]
+        self.assertEqual(seen, self.ordered)
+
+    def test_after_and_before_bound_a_range(self):
+        _, start = self.page(first=1)
+        _, end = self.page(first=4)
+        ids, info = self.page(first=10, after=start["endCursor"], before=end["endCursor"])
+        self.assertEqual(ids, self.ordered[1:3])
+        self.assertTrue(info["hasPreviousPage"])
+        # With `first`, hasNextPage only reports more edges than `first`.
+        self.assertFalse(info["hasNextPage"])
+
+    def test_invalid_cursors_are_rejected(self):
+        for cursor in ["not a cursor", encode_cursor(["2024-03-01"]), "YXJyYXljb25uZWN0aW9uOjA="]:
+            result = execute(ALL_ORDERS, {"first": 2, "after": cursor})
+            self.assertIn(f"Invalid cursor: {cursor}", result.errors[0].message)
+
+    def test_offset_is_not_an_argument(self):
+        result = execute("{ allOrders(first: 2, offset: 2) { edges { node { id } } } }")
+        self.assertIn("Unknown argument 'offset'", result.errors[0].message)
+
+
+class RankedPaginationTests(TestCase):
+    def test_cursor_carries_the_rank_and_breaks_ties_on_id(self):
+        # Identical names rank the same, so only the id orders them.
+        joes = [make_customer("Jo Smith", email=f"jo{n}@example.com") for n in range(3)]
+        smithson = make_customer("Smith Smithson", email="ss@example.com")
+
+        seen, after = [], None
+        while True:
+            result = execute(SEARCH_CUSTOMERS, {"after": after})
+            self.assertIsNone(result.errors)
+            connection = result.data["allCustomers"]
+            seen += [int(edge["node"]["id"]) for edge in connection["edges"]]
+            if not connection["pageInfo"]["hasNextPage"]:
+                break
+            after = connection["pageInfo"]["endCursor"]
+        self.assertEqual(seen, [smithson.pk, *(joe.pk for joe in joes)])
@@ -0,0 +1,95 @@
+import json
+from unittest import mock
+
+from django.core.cache import caches
+from django.test import TestCase
+
+from crm import persisted_queries
+from crm.persisted_queries import document_cache, query_hash
+
+from .utils import make_customer
+
+QUERY = "{ customers { name } }"
+
+
+def persisted(sha256_hash):
+    return {"persistedQuery": {"version": 1, "sha256Hash": sha256_hash}}
+
+
+# -----------------------------
+# Automatic Persisted Queries
+# -----------------------------
+class PersistedQueryTests(TestCase):
+    def setUp(self):
+        caches["default"].clear()
+        document_cache.clear()
+        make_customer("Ada")
+
+    def post(self, **body):
+        response = self.client.post("/graphql", json.dumps(body), content_type="application/json")
+        return json.loads(response.content)
+
+    def test_query_is_registered_with_its_hash(self):
+        result = self.post(query=QUERY, extensions=persisted(query_hash(QUERY)))
+        self.assertEqual(result["data"], {"customers": [{"name": "Ada"}]})
+        key = persisted_queries.PERSISTED_QUERY_CACHE_PREFIX + query_hash(QUERY)
+        self.assertEqual(caches["default"].get(key), QUERY)
+
+    def test_hash_alone_is_served_after_registration(self):
+        self.post(query=QUERY, extensions=persisted(query_hash(QUERY)))
+        result = self.post(extensions=persisted(query_hash(QUERY)))
+        self.assertEqual(result["data"], {"customers": [{"name": "Ada"}]})
+
+        # GET requests send the extensions as a JSON string.
+        response = self.client.get(
+            "/graphql", {"extensions": json.dumps(persisted(query_hash(QUERY)))},
+            HTTP_ACCEPT="application/json",
+        )
+        self.assertEqual(response.json()["data"], {"customers": [{"name": "Ada"}]})
+
+    def test_unknown_hash_is_not_found(self):
+        error = self.post(extensions=persisted(query_hash(QUERY)))["errors"][0]
+        self.assertEqual(error["message"], "PersistedQueryNotFound")
+        self.assertEqual(error["extensions"]["code"], "PERSISTED_QUERY_NOT_FOUND")
+
+    def test_hash_must_match_the_query(self):
+        result = self.post(query=QUERY, extensions=persisted(query_hash("{ products { name } }")))
+        self.assertEqual(result["errors"][0]["message"], "provided sha does not match query")
+        self.assertNotIn("data", result)
+
+
+# -----------------------------
+# Parsed Document Cache
+# -----------------------------
+class DocumentCacheTests(TestCase):
+    def setUp(self):
+        document_cache.clear()
+
+    def test_hit_skips_parse_and_validate(self):
+        parse = mock.patch.object(persisted_queries, "parse", wraps=persisted_queries.parse)
+        validate = mock.patch.object(persisted_queries, "validate", wraps=persisted_queries.validate)
+        with parse as parse_mock, validate as validate_mock:
+            for _ in range(3):
+                response = self.client.post(
+                    "/graphql", json.dumps({"query": QUERY}), content_type="application/json"
+                )
+                self.assertEqual(response.json()["data"], {"customers": []})
+        self.assertEqual(parse_mock.call_count, 1)
+        self.assertEqual(validate_mock.call_count, 1)
+        self.assertEqual(len(document_cache), 1)
+
+    def test_invalid_documents_are_not_cached(self):
+        for _ in range(2):
+            response = self.client.post(
+                "/graphql", json.dumps({"query": "{ nope }"}), content_type="application/json"
+            )
+            self.assertIn("Cannot query field 'nope'", response.json()["errors"][0]["message"])
+        self.assertEqual(len(document_cache), 0)
+
+    def test_least_recently_used_document_is_evicted(self):
+        cache = persisted_queries.DocumentCache(2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        self.assertEqual((cache.get("a"), cache.get("b"), cache.get("c")), (1, None, 3))
@@ -0,0 +1,50 @@
+from unittest import mock
+
+from django.test import TestCase
+
+from crm import models
+from crm.models import Product
+
+from .utils import execute, make_product
+
+
+# -----------------------------
+# Restocking
+# -----------------------------
+class RestockLowStockTests(TestCase):
+    def setUp(self):
+        make_product("Lamp", stock=2)
+        make_product("Desk", stock=5)
+        make_product("Chair", stock=50)
+
+    def assertStock(self, updated, expected):
+        self.assertEqual([(product.name, product.stock) for product in updated], expected)
+        stock = dict(Product.objects.values_list("name", "stock"))
+        for name, amount in expected:
+            self.assertEqual(stock[name], amount)
+        self.assertEqual(stock["Chair"], 50)
+
+    def test_restocks_products_below_threshold(self):
+        updated = Product.objects.restock_low_stock(10, 10)
+        self.assertStock(updated, [("Lamp", 12), ("Desk", 15)])
+
+    def test_respects_queryset_filters(self):
+        updated = Product.objects.filter(name="Lamp").restock_low_stock(10, 10)
+        self.assertStock(updated, [("Lamp", 12)])
+        self.assertEqual(Product.objects.get(name="Desk").stock, 5)
+
+    def test_respects_queryset_filters_without_returning(self):
+        with mock.patch.object(models, "supports_update_returning", return_value=False):
+            updated = Product.objects.filter(name="Lamp").restock_low_stock(10, 10)
+        self.assertStock(updated, [("Lamp", 12)])
+        self.assertEqual(Product.objects.get(name="Desk").stock, 5)
+
+    def test_mutation(self):
+        result = execute("""mutation { updateLowStockProducts(threshold: 10, restockAmount: 5) {
+            message updatedProducts { name stock } } }""")
+        self.assertIsNone(result.errors)
+        payload = result.data["updateLowStockProducts"]
+        self.assertEqual(payload["message"], "2 low-stock products updated successfully.")
+        self.assertEqual(
+            payload["updatedProducts"], [{"name": "Lamp", "stock": 7}, {"name": "Desk", "stock": 10}]
+        )
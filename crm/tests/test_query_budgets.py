@@ -0,0 +1,141 @@
+from collections import defaultdict
+from contextlib import ExitStack, contextmanager
+
+from django.db import connections
+from django.test import TransactionTestCase
+
+from crm.benchmarks import Dataset, get_operations, rolled_back
+from crm.datagen import generate
+
+# -----------------------------
+# Query Budget Utilities
+# -----------------------------
+OUTSIDE_RESOLVERS = "(outside resolvers)"
+
+
+class QueryLog:
+    """
+    Records every SQL statement with the GraphQL resolver path that issued
+    it. Install the SQL hook with `capture()` and pass the log itself as
+    graphene middleware so statements are attributed to paths.
+
+    A statement belongs to the resolver that started most recently, which
+    includes lazy querysets evaluated while its list value is completed.
+    List indexes are left out of paths, so the N+1 statements of one field
+    group together.
+    """
+
+    def __init__(self):
+        self.statements = []
+        self.path = None
+
+    def resolve(self, next, root, info, **args):
+        self.path = ".".join(str(key) for key in info.path.as_list() if not isinstance(key, int))
+        return next(root, info, **args)
+
+    def __call__(self, execute, sql, params, many, context):
+        self.statements.append(
+            (self.path or OUTSIDE_RESOLVERS, context["connection"].alias, sql, params, many)
+        )
+        return execute(sql, params, many, context)
+
+    @contextmanager
+    def capture(self):
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(self))
+            yield self
+
+    def __len__(self):
+        return len(self.statements)
+
+    def rows_read(self):
+        """
+        Rows returned by the captured SELECTs, re-counted with COUNT(*) in
+        the same transaction once the operation has finished.
+        """
+        rows = 0
+        for _, alias, sql, params, many in self.statements:
+            if many or not sql.lstrip().upper().startswith("SELECT"):
+                continue
+            with connections[alias].cursor() as cursor:
+                cursor.execute(f"SELECT COUNT(*) FROM ({sql}) counted", params)
+                rows += cursor.fetchone()[0]
+        return rows
+
+    def report(self):
+        """
+        The statements grouped by resolver path, busiest path first. Repeats
+        of the same SQL under a path are shown once with their count and the
+        parameters of the first.
+        """
+        by_path = defaultdict(dict)
+        for path, _, sql, params, _ in self.statements:
+            count, first_params = by_path[path].get(sql, (0, params))
+            by_path[path][sql] = (count + 1, first_params)
+        lines = []
+        for path, statements in sorted(
+            by_path.items(), key=lambda item: -sum(count for count, _ in item[1].values())
+        ):
+            lines.append(f"  {path} ({sum(count for count, _ in statements.values())} queries)")
+            for sql, (count, params) in statements.items():
+                lines.append(f"    {count} x {sql} {params}")
+        return "\n".join(lines)
+
+
+def measure_queries(operation, dataset):
+    """Run an operation once, rolled back, returning its `(QueryLog, rows read)`."""
+    log = QueryLog()
+    with rolled_back():
+        with log.capture():
+            operation.run(dataset, 0, middleware=[log])
+        rows = log.rows_read()
+    return log, rows
+
+
+# -----------------------------
+# Query Budgets
+# -----------------------------
+class QueryBudgetTests(TransactionTestCase):
+    """
+    Every operation in the benchmark catalogue (crm/benchmarks.py) stays
+    within its declared query and row budget, and issues the same number
+    of queries on a small and on a hundredfold larger dataset.
+    """
+
+    SMALL = {"customers": 10, "products": 10, "orders": 30}
+    LARGE = {"customers": 1000, "products": 100, "orders": 3000}
+
+    def measure_all(self, operations):
+        dataset = Dataset()
+        return {operation.name: measure_queries(operation, dataset) for operation in operations}
+
+    def test_operations_stay_within_budget_as_data_grows(self):
+        operations = get_operations()
+
+        # Within the reminder window, so both runs have reminders to send.
+        generate(**self.SMALL, seed=1, days=7)
+        small = self.measure_all(operations)
+        generate(**{key: self.LARGE[key] - self.SMALL[key] for key in self.LARGE}, seed=2)
+        large = self.measure_all(operations)
+
+        for operation in operations:
+            with self.subTest(operation.name):
+                self.assertWithinBudget(operation, small[operation.name], large[operation.name])
+
+    def assertWithinBudget(self, operation, small, large):
+        (small_log, small_rows), (large_log, large_rows) = small, large
+        problems = []
+        if len(large_log) > operation.max_queries or len(small_log) > operation.max_queries:
+            problems.append(f"over the budget of {operation.max_queries} queries")
+        if len(large_log) != len(small_log):
+            problems.append("query count grows with the data")
+        if operation.max_rows is not None and large_rows > operation.max_rows:
+            problems.append(f"{large_rows} rows read, over the budget of {operation.max_rows}")
+        if problems:
+            self.fail(
+                f"{operation.name}: {'; '.join(problems)} "
+                f"({len(small_log)} queries at N={self.SMALL['orders']} orders, "
+                f"{len(large_log)} at N={self.LARGE['orders']}).\n"
+                f"Queries at N={self.LARGE['orders']}:\n{large_log.report()}"
+            )
@@ -0,0 +1,75 @@
+import json
+
+from django.test import TestCase
+from graphql import get_operation_ast, parse
+
+from alx_backend_graphql_crm.schema import schema
+from crm.query_cost import QueryTooComplex, analyze_query_cost
+
+
+def cost(query, variables=None):
+    document = parse(query)
+    report = analyze_query_cost(
+        schema.graphql_schema, document, get_operation_ast(document), variables
+    )
+    return report["requestedQueryCost"]
+
+
+# -----------------------------
+# Cost Estimation
+# -----------------------------
+class QueryCostTests(TestCase):
+    def test_connection_cost_follows_page_size(self):
+        self.assertEqual(cost("{ allOrders(first: 10) { edges { node { id } } } }"), 10)
+        self.assertEqual(
+            cost("query ($n: Int) { allOrders(first: $n) { edges { node { id customer { name } } } } }",
+                 {"n": 20}),
+            40,
+        )
+
+    def test_nested_lists_use_hints(self):
+        # 10 orders, each with a customer and about 10 products.
+        self.assertEqual(
+            cost("{ allOrders(first: 10) { edges { node { customer { name } products { name } } } } }"),
+            10 * (1 + 1 + 10),
+        )
+
+    def test_unpaginated_root_list_costs_the_whole_table(self):
+        self.assertEqual(cost("{ customers { name } }"), 10000)
+
+    def test_unpaginated_root_list_fans_out_into_one_relation(self):
+        self.assertEqual(cost("{ orders { id customer { email } } }"), 10000 * 2)
+        self.assertEqual(cost("{ products { orders { id } } }"), 10000 * 101)
+        self.assertEqual(
+            cost("mutation { updateLowStockProducts { updatedProducts { orders { id } } } }"),
+            1 + 100 * 101,
+        )
+
+    def test_unpaginated_root_list_cannot_fan_out_twice(self):
+        with self.assertRaisesMessage(QueryTooComplex, "exceeds the maximum cost"):
+            cost("{ orders { products { orders { id } } } }")
+
+    def test_too_deep(self):
+        with self.assertRaisesMessage(QueryTooComplex, "exceeds the maximum depth"):
+            cost("""{ allCustomers(first: 1) { edges { node { orders { products {
+                orders { customer { orders { id } } } } } } } } }""")
+
+
+class QueryCostViewTests(TestCase):
+    def post(self, query):
+        response = self.client.post(
+            "/graphql", json.dumps({"query": query}), content_type="application/json"
+        )
+        return response.json()
+
+    def test_root_list_with_a_relation_is_served(self):
+        result = self.post("{ orders { id customer { email } } }")
+        self.assertNotIn("errors", result)
+        self.assertEqual(result["data"], {"orders": []})
+
+    def test_rejected_before_execution(self):
+        error = self.post("{ orders { products { orders { id } } } }")["errors"][0]
+        self.assertEqual(error["extensions"]["code"], "QUERY_TOO_COMPLEX")
+        self.assertEqual(
+            error["extensions"]["cost"]["requestedQueryCost"], 10000 * (1 + 10 * (1 + 100))
+        )
@@ -0,0 +1,67 @@
+import datetime
+from unittest import mock
+
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.test import TestCase
+from django.utils import timezone
+
+from crm.models import Order
+from crm.reminders import send_reminders
+
+from .utils import make_customer
+
+
+# -----------------------------
+# Order Reminders
+# -----------------------------
+class SendRemindersTests(TestCase):
+    def setUp(self):
+        self.ada = make_customer("Ada")
+        self.bob = make_customer("Bob")
+        self.orders = [
+            Order.objects.create(customer=self.ada),
+            Order.objects.create(customer=self.ada),
+            Order.objects.create(customer=self.bob),
+        ]
+
+    def test_one_email_per_customer_marks_orders_reminded(self):
+        self.assertEqual(send_reminders(), (2, 3))
+        self.assertEqual(
+            [message.to for message in mail.outbox], [[self.ada.email], [self.bob.email]]
+        )
+        self.assertFalse(Order.objects.filter(reminded_at__isnull=True).exists())
+
+    def test_later_runs_skip_reminded_orders(self):
+        send_reminders()
+        late = Order.objects.create(customer=self.bob)
+        mail.outbox.clear()
+
+        self.assertEqual(send_reminders(), (1, 1))
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertIn(f"Order {late.pk} ", mail.outbox[0].body)
+        self.assertNotIn(f"Order {self.orders[2].pk} ", mail.outbox[0].body)
+
+    def test_orders_outside_the_window_are_skipped(self):
+        Order.objects.filter(customer=self.bob).update(
+            order_date=timezone.now() - datetime.timedelta(days=30)
+        )
+        self.assertEqual(send_reminders(), (1, 2))
+
+    def test_retry_after_a_failed_send_only_resends_the_rest(self):
+        send = EmailBackend.send_messages
+
+        def fail_for_bob(backend, messages):
+            if messages[0].to == [self.bob.email]:
+                raise ConnectionError("SMTP went away")
+            return send(backend, messages)
+
+        with mock.patch.object(EmailBackend, "send_messages", fail_for_bob):
+            with self.assertRaises(ConnectionError):
+                send_reminders()
+        self.assertEqual([message.to for message in mail.outbox], [[self.ada.email]])
+
+        self.assertEqual(send_reminders(), (1, 1))
+        self.assertEqual(
+            [message.to for message in mail.outbox], [[self.ada.email], [self.bob.email]]
+        )
@@ -0,0 +1,38 @@
+from decimal import Decimal
+
+from django.test import TestCase
+
+from crm.models import Order
+
+from .utils import execute, make_customer
+
+
+# -----------------------------
+# crmStats
+# -----------------------------
+class CRMStatsTests(TestCase):
+    def setUp(self):
+        ada = make_customer("Ada")
+        bob = make_customer("Bob")
+        for customer, amount in ((ada, "10.01"), (ada, "20.02"), (bob, "0.10")):
+            Order.objects.create(customer=customer, total_amount=Decimal(amount))
+
+    def test_revenue_has_two_decimal_places(self):
+        result = execute("""{ crmStats {
+            totalOrders totalRevenue
+            byDay: groups(groupBy: DAY) { revenue }
+            byCustomer: groups(groupBy: CUSTOMER) { label revenue } } }""")
+        self.assertIsNone(result.errors)
+        stats = result.data["crmStats"]
+        self.assertEqual(stats["totalOrders"], 3)
+        self.assertEqual(stats["totalRevenue"], "30.13")
+        self.assertEqual(stats["byDay"], [{"revenue": "30.13"}])
+        self.assertEqual(
+            stats["byCustomer"],
+            [{"label": "Ada", "revenue": "30.03"}, {"label": "Bob", "revenue": "0.10"}],
+        )
+
+    def test_revenue_of_no_orders_is_zero(self):
+        Order.objects.all().delete()
+        result = execute("{ crmStats { totalOrders totalRevenue } }")
+        self.assertEqual(result.data["crmStats"], {"totalOrders": 0, "totalRevenue": "0.00"})
@@ -0,0 +1,166 @@
+import json
+
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+
+from crm.models import Customer, Order, Product
+
+from .utils import make_customer, make_product
+
+CUSTOMER_STATS = json.dumps({"query": "{ customers { name orderCount lifetimeValue } }"})
+CUSTOMERS = json.dumps({"query": "{ customers { name } }"})
+PRODUCTS = json.dumps({"query": "{ products { name stock } }"})
+ORDERS = json.dumps({"query": "{ orders { totalAmount } }"})
+CREATE_PRODUCT = json.dumps({
+    "query": 'mutation { createProduct(name: "Desk", price: 5) { product { name } } }'
+})
+
+RESTOCK = json.dumps({"query": "mutation { updateLowStockProducts { message } }"})
+
+RESPONSE_CACHE = {
+    "ENABLED": True,
+    "CACHE": "default",
+    "FIELD_TIMEOUTS": {"customers": 60, "products": 60, "orders": 60},
+}
+
+
+@override_settings(GRAPHQL_RESPONSE_CACHE=RESPONSE_CACHE)
+class ResponseCacheTestCase(TestCase):
+    def setUp(self):
+        caches["default"].clear()
+
+    def post(self, body):
+        response = self.client.post("/graphql", body, content_type="application/json")
+        return json.loads(response.content)["data"]
+
+    def write(self):
+        """Run the block's on_commit invalidations, as a committed request would."""
+        return self.captureOnCommitCallbacks(execute=True)
+
+
+# -----------------------------
+# Hits and Invalidation
+# -----------------------------
+class ResponseCacheTests(ResponseCacheTestCase):
+    def setUp(self):
+        super().setUp()
+        self.ada = make_customer("Ada")
+        self.lamp = make_product("Lamp", price="10.00", stock=5)
+
+    def test_repeated_query_is_served_from_the_cache(self):
+        self.assertEqual(self.post(CUSTOMERS), {"customers": [{"name": "Ada"}]})
+        # Queryset updates send no signals, so the cached response stays.
+        Customer.objects.update(name="Grace")
+        with self.assertNumQueries(0):
+            self.assertEqual(self.post(CUSTOMERS), {"customers": [{"name": "Ada"}]})
+
+    def test_customer_writes_invalidate(self):
+        self.post(CUSTOMERS)
+        with self.write():
+            bob = make_customer("Bob")
+        self.assertEqual(self.post(CUSTOMERS)["customers"], [{"name": "Ada"}, {"name": "Bob"}])
+        bob.name = "Robert"
+        with self.write():
+            bob.save()
+        self.assertEqual(self.post(CUSTOMERS)["customers"], [{"name": "Ada"}, {"name": "Robert"}])
+        with self.write():
+            bob.delete()
+        self.assertEqual(self.post(CUSTOMERS)["customers"], [{"name": "Ada"}])
+
+    def test_product_writes_invalidate(self):
+        self.post(PRODUCTS)
+        with self.write():
+            desk = make_product("Desk", stock=1)
+        self.assertEqual(len(self.post(PRODUCTS)["products"]), 2)
+        desk.stock = 7
+        with self.write():
+            desk.save()
+        self.assertIn({"name": "Desk", "stock": 7}, self.post(PRODUCTS)["products"])
+        with self.write():
+            desk.delete()
+        self.assertEqual(self.post(PRODUCTS)["products"], [{"name": "Lamp", "stock": 5}])
+
+    def test_order_writes_invalidate(self):
+        self.assertEqual(self.post(ORDERS), {"orders": []})
+        with self.write():
+            order = Order.objects.create(customer=self.ada, total_amount=self.lamp.price)
+        self.assertEqual(self.post(ORDERS), {"orders": [{"totalAmount": "10.00"}]})
+        with self.write():
+            order.products.add(self.lamp, make_product("Desk", price="2.50"))
+            order.save()
+        self.assertEqual(self.post(ORDERS), {"orders": [{"totalAmount": "12.50"}]})
+        with self.write():
+            order.delete()
+        self.assertEqual(self.post(ORDERS), {"orders": []})
+
+    def test_restock_invalidates_products(self):
+        self.post(PRODUCTS)
+        with self.write():
+            self.post(RESTOCK)
+        self.assertEqual(self.post(PRODUCTS)["products"], [{"name": "Lamp", "stock": 15}])
+
+    def test_mutations_skip_the_cache(self):
+        with self.write():
+            self.post(CREATE_PRODUCT)
+            self.post(CREATE_PRODUCT)
+        self.assertEqual(Product.objects.filter(name="Desk").count(), 2)
+
+    def test_entries_are_kept_per_user(self):
+        alice = User.objects.create_user("alice")
+        self.client.force_login(alice)
+        self.post(CUSTOMERS)
+        Customer.objects.update(name="Grace")
+
+        # Alice's entry is hers alone; anonymous and other users miss it.
+        self.assertEqual(self.post(CUSTOMERS), {"customers": [{"name": "Ada"}]})
+        self.client.force_login(User.objects.create_user("bob"))
+        self.assertEqual(self.post(CUSTOMERS), {"customers": [{"name": "Grace"}]})
+        self.client.logout()
+        self.assertEqual(self.post(CUSTOMERS), {"customers": [{"name": "Grace"}]})
+
+
+# -----------------------------
+# Customer Order Stats
+# -----------------------------
+class CustomerStatsInvalidationTests(ResponseCacheTestCase):
+    def setUp(self):
+        super().setUp()
+        self.ada = make_customer("Ada")
+        self.bob = make_customer("Bob")
+        self.lamp = make_product("Lamp", price="10.00")
+        with self.write():
+            self.order = Order.objects.create(customer=self.ada, total_amount=self.lamp.price)
+            self.order.products.add(self.lamp)
+
+    def stats(self):
+        return {
+            customer["name"]: (customer["orderCount"], customer["lifetimeValue"])
+            for customer in self.post(CUSTOMER_STATS)["customers"]
+        }
+
+    def test_moving_an_order_refreshes_both_customers(self):
+        self.assertEqual(self.stats(), {"Ada": (1, "10.00"), "Bob": (0, "0.00")})
+
+        order = Order.objects.get()
+        order.customer = self.bob
+        with self.write():
+            order.save()
+        self.assertEqual(self.stats(), {"Ada": (0, "0.00"), "Bob": (1, "10.00")})
+
+    def test_new_and_deleted_orders_refresh_the_stats(self):
+        self.assertEqual(self.stats()["Bob"], (0, "0.00"))
+        with self.write():
+            order = Order.objects.create(customer=self.bob, total_amount=self.lamp.price)
+        self.assertEqual(self.stats()["Bob"], (1, "10.00"))
+        with self.write():
+            order.delete()
+        self.assertEqual(self.stats()["Bob"], (0, "0.00"))
+
+    def test_re_totalling_an_order_refreshes_its_customer(self):
+        self.assertEqual(self.stats()["Ada"], (1, "10.00"))
+
+        with self.write():
+            self.order.products.add(make_product("Desk", price="2.50"))
+            self.order.save()
+        self.assertEqual(self.stats()["Ada"], (1, "12.50"))
@@ -0,0 +1,76 @@
+from django.db import connection
+from django.test import TestCase
+
+from crm.models import Customer
+from crm.search import SEARCH_RANK, search
+
+from .utils import execute, make_customer
+
+ALL_CUSTOMERS = """
+query ($search: String, $after: String) {
+    allCustomers(search: $search, first: 2, after: $after) {
+        edges { cursor node { name } } pageInfo { hasNextPage endCursor } } }
+"""
+
+
+def names(queryset):
+    return [customer.name for customer in queryset]
+
+
+# -----------------------------
+# SQLite FTS Search
+# -----------------------------
+class SearchIndexTests(TestCase):
+    def test_index_follows_create_update_and_delete(self):
+        customer = make_customer("Grace Hopper", email="grace@example.com")
+        self.assertEqual(names(search(Customer.objects.all(), "hopp")), ["Grace Hopper"])
+
+        customer.name = "Grace Brewster"
+        customer.save()
+        self.assertEqual(names(search(Customer.objects.all(), "hopp")), [])
+        self.assertEqual(names(search(Customer.objects.all(), "brews")), ["Grace Brewster"])
+
+        customer.delete()
+        self.assertEqual(names(search(Customer.objects.all(), "brews")), [])
+
+    def test_short_terms_fall_back_to_a_substring_scan(self):
+        make_customer("Al Smith", email="smith@example.com")
+        self.assertEqual(names(search(Customer.objects.all(), "al")), ["Al Smith"])
+
+    def test_match_runs_once_and_drives_the_join(self):
+        queryset = search(Customer.objects.all(), "hopp").order_by(f"-{SEARCH_RANK}")
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+            plan = [row[-1] for row in cursor.fetchall()]
+        self.assertFalse([step for step in plan if "SUBQUERY" in step], plan)
+        self.assertTrue(plan[0].startswith("SCAN crm_customer_search VIRTUAL TABLE"), plan)
+
+
+class RankedSearchTests(TestCase):
+    def setUp(self):
+        for name in ["Mark Twain", "Mark Markham", "Marco Polo", "Ada Lovelace", "Mark Markmark"]:
+            make_customer(name, email=f"{name.split()[1].lower()}@example.com")
+
+    def ranked(self):
+        return list(search(Customer.objects.all(), "mark").order_by(f"-{SEARCH_RANK}", "pk"))
+
+    def test_results_come_back_in_rank_order(self):
+        ranked = self.ranked()
+        ranks = [getattr(customer, SEARCH_RANK) for customer in ranked]
+        self.assertEqual(ranks, sorted(ranks, reverse=True))
+        self.assertEqual(set(names(ranked)), {"Mark Twain", "Mark Markham", "Mark Markmark"})
+        # More occurrences of the term rank higher.
+        self.assertEqual(ranked[0].name, "Mark Markmark")
+
+    def test_cursor_paging_walks_the_ranked_results(self):
+        seen, after = [], None
+        while True:
+            result = execute(ALL_CUSTOMERS, {"search": "mark", "after": after})
+            self.assertIsNone(result.errors)
+            connection = result.data["allCustomers"]
+            seen += [edge["node"]["name"] for edge in connection["edges"]]
+            if not connection["pageInfo"]["hasNextPage"]:
+                break
+            after = connection["pageInfo"]["endCursor"]
+        self.assertEqual(seen, names(self.ranked()))
@@ -0,0 +1,78 @@
+import json
+from contextlib import ExitStack
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from django.core.management import call_command
+from django.test import AsyncClient, TransactionTestCase, override_settings
+from graphene_django.constants import MUTATION_ERRORS_FLAG
+from graphene_django.settings import graphene_settings
+
+from crm.models import Customer
+from crm.persisted_queries import query_hash
+
+CREATE_CUSTOMER = json.dumps({
+    "query": 'mutation { createCustomer(name: "Ada", email: "ada@example.com") { customer { id } } }'
+})
+
+
+class FlagMutationErrors:
+    """Graphene middleware flagging every mutation as failed, as form mutations do."""
+
+    def resolve(self, next, root, info, **args):
+        if root is None and info.operation.operation.value == "mutation":
+            setattr(info.context, MUTATION_ERRORS_FLAG, True)
+        return next(root, info, **args)
+
+
+def patch_graphene_settings(**overrides):
+    # Modules hold the settings object itself, which override_settings replaces.
+    stack = ExitStack()
+    for name, value in overrides.items():
+        stack.enter_context(mock.patch.object(graphene_settings, name, value))
+    return stack
+
+
+# -----------------------------
+# Async GraphQL View
+# -----------------------------
+class AsyncGraphQLViewTests(TransactionTestCase):
+    async def post(self, body):
+        response = await AsyncClient().post("/graphql/async", body, content_type="application/json")
+        return json.loads(response.content)
+
+    async def test_query(self):
+        await Customer.objects.acreate(name="Ada", email="ada@example.com")
+        result = await self.post(json.dumps({"query": "{ customers { name } }"}))
+        self.assertEqual(result["data"], {"customers": [{"name": "Ada"}]})
+
+    async def test_mutation_commits(self):
+        result = await self.post(CREATE_CUSTOMER)
+        self.assertNotIn("errors", result)
+        self.assertTrue(await Customer.objects.filter(email="ada@example.com").aexists())
+
+    async def test_atomic_mutation_rolls_back_when_flagged(self):
+        middleware = [FlagMutationErrors()]
+        with patch_graphene_settings(ATOMIC_MUTATIONS=True, MIDDLEWARE=middleware):
+            result = await self.post(CREATE_CUSTOMER)
+        self.assertNotIn("errors", result)
+        self.assertFalse(await Customer.objects.filter(email="ada@example.com").aexists())
+
+    async def test_mutation_without_atomic_mutations_is_not_rolled_back(self):
+        with patch_graphene_settings(MIDDLEWARE=[FlagMutationErrors()]):
+            await self.post(CREATE_CUSTOMER)
+        self.assertTrue(await Customer.objects.filter(email="ada@example.com").aexists())
+
+    @override_settings(CACHES={"default": {
+        "BACKEND": "django.core.cache.backends.db.DatabaseCache", "LOCATION": "crm_test_cache",
+    }})
+    async def test_persisted_query_with_database_cache(self):
+        # Registering and looking up the query touches the cache from sync code.
+        await sync_to_async(call_command)("createcachetable", verbosity=0)
+        query = "{ customers { name } }"
+        extensions = {"persistedQuery": {"version": 1, "sha256Hash": query_hash(query)}}
+
+        result = await self.post(json.dumps({"query": query, "extensions": extensions}))
+        self.assertEqual(result["data"], {"customers": []})
+        result = await self.post(json.dumps({"extensions": extensions}))
+        self.assertEqual(result["data"], {"customers": []})
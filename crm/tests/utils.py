@@ -0,0 +1,26 @@
+from decimal import Decimal
+
+from alx_backend_graphql_crm.schema import schema
+
+
+class Context:
+    """Stands in for the request as the resolver context."""
+
+
+def execute(query, variables=None):
+    """Run a document through the schema, returning the ExecutionResult."""
+    return schema.execute(query, variable_values=variables, context_value=Context())
+
+
+def make_customer(name="Ada", email=None, **fields):
+    from crm.models import Customer
+
+    return Customer.objects.create(
+        name=name, email=email or f"{name.lower()}@example.com", **fields
+    )
+
+
+def make_product(name="Lamp", price="10.00", stock=20):
+    from crm.models import Product
+
+    return Product.objects.create(name=name, price=Decimal(price), stock=stock)
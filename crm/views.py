@@ -1,3 +1,462 @@
-from django.shortcuts import render
+import csv
+import json
+from inspect import isawaitable
 
-# Create your views here.
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+from django.http import HttpResponse, HttpResponseNotAllowed, JsonResponse, StreamingHttpResponse
+from django.http.response import HttpResponseBadRequest
+from django.views.generic import View
+from graphene_django.constants import MUTATION_ERRORS_FLAG
+from graphene_django.settings import graphene_settings
+from graphene_django.utils.utils import set_rollback
+from graphene_django.views import GraphQLView, HttpError
+from graphql import ExecutionResult, OperationType, execute, get_operation_ast, validate_schema
+from graphql.error import GraphQLError
+
+from .async_utils import async_atomic, mark_async
+from .db_routing import route_operation
+from .filters import CustomerFilter, OrderFilter
+from .instrumentation import (
+    async_tracing,
+    get_config as get_instrumentation_config,
+    registry,
+    start_trace,
+    trace_extensions,
+    tracing,
+)
+from .models import Customer, Order
+from .persisted_queries import get_document, get_persisted_query_hash, resolve_persisted_query
+from .query_cost import QueryTooComplex, analyze_query_cost
+from .query_cost import get_config as get_query_cost_config
+from .response_cache import get_cache_entry
+
+# -----------------------------
+# GraphQL View
+# -----------------------------
+class CRMGraphQLView(GraphQLView):
+    """
+    GraphQLView with automatic persisted queries and a cache of parsed,
+    validated documents, so repeated queries skip parsing and validation
+    and APQ clients can send only the sha256 hash of a known query.
+    Query results are served from the response cache when it is enabled.
+
+    Operations are costed before they run and rejected when they exceed
+    the configured budget; `max_query_cost`/`max_query_depth` override it
+    for one endpoint. Queries may read from a replica (crm/db_routing.py).
+    """
+
+    max_query_cost = None
+    max_query_depth = None
+
+    def __init__(self, max_query_cost=None, max_query_depth=None, **kwargs):
+        super().__init__(**kwargs)
+        self.max_query_cost = max_query_cost or self.max_query_cost
+        self.max_query_depth = max_query_depth or self.max_query_depth
+
+    def prepare_execution(self, request, data, query, variables, operation_name, show_graphiql):
+        """
+        Resolve the document for a request. Returns `(result, plan)`: either
+        an early ExecutionResult (errors or a cached response), or the
+        arguments `execute` needs.
+        """
+        try:
+            sha256_hash = get_persisted_query_hash(
+                request.GET.get("extensions") or data.get("extensions")
+            )
+            if sha256_hash:
+                query = resolve_persisted_query(sha256_hash, query)
+        except GraphQLError as e:
+            return ExecutionResult(errors=[e]), None
+
+        if not query:
+            if show_graphiql:
+                return None, None
+            raise HttpError(HttpResponseBadRequest("Must provide query string."))
+
+        schema = self.schema.graphql_schema
+
+        schema_validation_errors = validate_schema(schema)
+        if schema_validation_errors:
+            return ExecutionResult(data=None, errors=schema_validation_errors), None
+
+        document, errors = get_document(
+            schema,
+            query,
+            self.validation_rules,
+            graphene_settings.MAX_VALIDATION_ERRORS,
+            key=sha256_hash,
+        )
+        if errors:
+            return ExecutionResult(data=None, errors=errors), None
+
+        operation_ast = get_operation_ast(document, operation_name)
+
+        if (
+            request.method.lower() == "get"
+            and operation_ast is not None
+            and operation_ast.operation != OperationType.QUERY
+        ):
+            if show_graphiql:
+                return None, None
+
+            raise HttpError(
+                HttpResponseNotAllowed(
+                    ["POST"],
+                    "Can only perform a {} operation from a POST request.".format(
+                        operation_ast.operation.value
+                    ),
+                )
+            )
+
+        route_operation(operation_ast)
+
+        try:
+            cost_report = analyze_query_cost(
+                schema, document, operation_ast, variables,
+                max_cost=self.max_query_cost,
+                max_depth=self.max_query_depth,
+            )
+        except QueryTooComplex as e:
+            return ExecutionResult(errors=[e]), None
+        extensions = None
+        if cost_report is not None and get_query_cost_config()["REPORT"]:
+            extensions = {"cost": cost_report}
+
+        cache_entry = get_cache_entry(
+            schema, document, operation_ast, variables, operation_name,
+            user=getattr(request, "user", None),
+        )
+        if cache_entry is not None:
+            cached = cache_entry.get()
+            if cached is not None:
+                return ExecutionResult(data=cached, extensions=extensions), None
+
+        context = self.get_context(request)
+        execute_options = {
+            "root_value": self.get_root_value(request),
+            "context_value": context,
+            "variable_values": variables,
+            "operation_name": operation_name,
+            "middleware": self.get_middleware(request),
+        }
+        if self.execution_context_class:
+            execute_options["execution_context_class"] = self.execution_context_class
+
+        return None, {
+            "schema": schema,
+            "document": document,
+            "operation_ast": operation_ast,
+            "cache_entry": cache_entry,
+            "extensions": extensions,
+            "trace": start_trace(context, operation_ast),
+            "execute_options": execute_options,
+        }
+
+    def format_response(self, request, execution_result, id):
+        """Build the response body and status, including any extensions."""
+        status_code = 200
+        response = {}
+        if execution_result.errors:
+            response["errors"] = [self.format_error(e) for e in execution_result.errors]
+
+        if execution_result.errors and any(
+            not getattr(e, "path", None) for e in execution_result.errors
+        ):
+            status_code = 400
+        else:
+            response["data"] = execution_result.data
+
+        if execution_result.extensions:
+            response["extensions"] = execution_result.extensions
+
+        if self.batch:
+            response["id"] = id
+            response["status"] = status_code
+
+        return response, status_code
+
+    def get_response(self, request, data, show_graphiql=False):
+        query, variables, operation_name, id = self.get_graphql_params(request, data)
+
+        execution_result = self.execute_graphql_request(
+            request, data, query, variables, operation_name, show_graphiql
+        )
+
+        if getattr(request, MUTATION_ERRORS_FLAG, False) is True:
+            set_rollback()
+
+        if not execution_result:
+            return None, 200
+
+        if execution_result.errors:
+            set_rollback()
+        response, status_code = self.format_response(request, execution_result, id)
+        return self.json_encode(request, response, pretty=show_graphiql), status_code
+
+    def execute_graphql_request(
+        self, request, data, query, variables, operation_name, show_graphiql=False
+    ):
+        result, plan = self.prepare_execution(
+            request, data, query, variables, operation_name, show_graphiql
+        )
+        if plan is None:
+            return result
+
+        operation_ast = plan["operation_ast"]
+        try:
+            with tracing(plan["trace"]):
+                result = self.execute_plan(request, plan)
+        except Exception as e:
+            return ExecutionResult(errors=[e])
+
+        result.extensions = trace_extensions(plan["trace"], plan["extensions"])
+        return result
+
+    def is_atomic(self, plan):
+        """Whether the operation is a mutation that ATOMIC_MUTATIONS wraps in a transaction."""
+        operation_ast = plan["operation_ast"]
+        return (
+            operation_ast is not None
+            and operation_ast.operation == OperationType.MUTATION
+            and (
+                graphene_settings.ATOMIC_MUTATIONS is True
+                or connection.settings_dict.get("ATOMIC_MUTATIONS", False) is True
+            )
+        )
+
+    def execute_plan(self, request, plan):
+        if self.is_atomic(plan):
+            with transaction.atomic():
+                result = execute(plan["schema"], plan["document"], **plan["execute_options"])
+                if getattr(request, MUTATION_ERRORS_FLAG, False) is True:
+                    transaction.set_rollback(True)
+        else:
+            result = execute(plan["schema"], plan["document"], **plan["execute_options"])
+            if plan["cache_entry"] is not None and not result.errors:
+                plan["cache_entry"].set(result.data)
+        return result
+
+
+# -----------------------------
+# Async GraphQL View
+# -----------------------------
+class AsyncCRMGraphQLView(CRMGraphQLView):
+    """
+    Serves the same schema from an async view under ASGI. Resolvers see an
+    async context and use the async ORM and async DataLoaders, so a request
+    waiting on the database does not hold a worker thread. Mutations run in
+    Django's thread-sensitive executor because transactions are sync-only;
+    with ATOMIC_MUTATIONS the transaction is opened there too. GraphiQL
+    stays on the sync endpoint.
+    """
+
+    view_is_async = True
+
+    def get_context(self, request):
+        return mark_async(request)
+
+    async def dispatch(self, request, *args, **kwargs):
+        try:
+            if request.method.lower() not in ("get", "post"):
+                raise HttpError(
+                    HttpResponseNotAllowed(
+                        ["GET", "POST"], "GraphQL only supports GET and POST requests."
+                    )
+                )
+
+            data = self.parse_body(request)
+
+            if self.batch:
+                responses = [await self.get_async_response(request, entry) for entry in data]
+                result = "[{}]".format(",".join([response[0] for response in responses]))
+                status_code = (
+                    responses
+                    and max(responses, key=lambda response: response[1])[1]
+                    or 200
+                )
+            else:
+                result, status_code = await self.get_async_response(request, data)
+
+            return HttpResponse(
+                status=status_code, content=result, content_type="application/json"
+            )
+
+        except HttpError as e:
+            response = e.response
+            response["Content-Type"] = "application/json"
+            response.content = self.json_encode(request, {"errors": [self.format_error(e)]})
+            return response
+
+    async def get_async_response(self, request, data):
+        query, variables, operation_name, id = self.get_graphql_params(request, data)
+
+        execution_result = await self.execute_graphql_request_async(
+            request, data, query, variables, operation_name
+        )
+
+        response, status_code = self.format_response(request, execution_result, id)
+        return self.json_encode(request, response), status_code
+
+    async def execute_graphql_request_async(self, request, data, query, variables, operation_name):
+        # Parsing, validation and the response cache lookup are sync code.
+        result, plan = await sync_to_async(self.prepare_execution)(
+            request, data, query, variables, operation_name, show_graphiql=False
+        )
+        if plan is None:
+            return result
+
+        try:
+            async with async_tracing(plan["trace"]):
+                if self.is_atomic(plan):
+                    async with async_atomic():
+                        result = await self.execute_plan_async(plan)
+                        if getattr(request, MUTATION_ERRORS_FLAG, False) is True:
+                            await sync_to_async(transaction.set_rollback)(True)
+                else:
+                    result = await self.execute_plan_async(plan)
+        except Exception as e:
+            return ExecutionResult(errors=[e])
+
+        if plan["cache_entry"] is not None and not result.errors:
+            await sync_to_async(plan["cache_entry"].set)(result.data)
+        result.extensions = trace_extensions(plan["trace"], plan["extensions"])
+        return result
+
+    async def execute_plan_async(self, plan):
+        result = execute(plan["schema"], plan["document"], **plan["execute_options"])
+        if isawaitable(result):
+            result = await result
+        return result
+
+
+# -----------------------------
+# Metrics
+# -----------------------------
+class MetricsView(View):
+    """
+    Resolver and SQL histograms in the Prometheus text format. Metrics are
+    kept per process; scrape each worker.
+
+    Operation and field names reveal the schema and its traffic, so only
+    staff users and the scrapers in METRICS_ALLOWED_IPS may read them.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        allowed_ips = get_instrumentation_config()["METRICS_ALLOWED_IPS"]
+        if not (
+            request.META.get("REMOTE_ADDR") in allowed_ips
+            or (request.user.is_authenticated and request.user.is_staff)
+        ):
+            return JsonResponse({"errors": ["Staff login required."]}, status=403)
+        return super().dispatch(request, *args, **kwargs)
+
+    def get(self, request):
+        return HttpResponse(
+            registry.render(), content_type="text/plain; version=0.0.4; charset=utf-8"
+        )
+
+
+# -----------------------------
+# Streaming Exports
+# -----------------------------
+class EchoBuffer:
+    """File-like object that returns what is written, for csv.writer."""
+
+    def write(self, value):
+        return value
+
+
+class ExportView(View):
+    """
+    Stream every row matching the filterset as NDJSON (default) or CSV.
+
+    Rows are read with `.values()` through `.iterator()`, so neither model
+    instances nor the whole result set are held in memory; on PostgreSQL the
+    iterator uses a server-side cursor. Lines are flushed once per chunk.
+
+    Exports contain customer contact details, so only staff users may
+    download them.
+    """
+
+    model = None
+    filterset_class = None
+    columns = ()
+    filename = None
+    formats = {
+        "ndjson": "application/x-ndjson",
+        "csv": "text/csv",
+    }
+
+    def dispatch(self, request, *args, **kwargs):
+        if not (request.user.is_authenticated and request.user.is_staff):
+            return JsonResponse({"errors": ["Staff login required."]}, status=403)
+        return super().dispatch(request, *args, **kwargs)
+
+    def get(self, request):
+        export_format = request.GET.get("format", "ndjson")
+        if export_format not in self.formats:
+            return JsonResponse(
+                {"errors": [f"Unsupported format: {export_format}"]}, status=400
+            )
+
+        filterset = self.filterset_class(request.GET, queryset=self.model.objects.all())
+        if not filterset.is_valid():
+            return JsonResponse({"errors": filterset.errors}, status=400)
+
+        rows = filterset.qs.order_by("pk").values(*self.columns)
+        chunk_size = getattr(settings, "EXPORT_CHUNK_SIZE", 2000)
+        render = self.render_csv if export_format == "csv" else self.render_ndjson
+
+        response = StreamingHttpResponse(
+            render(rows.iterator(chunk_size=chunk_size), chunk_size),
+            content_type=self.formats[export_format],
+        )
+        response["Content-Disposition"] = (
+            f'attachment; filename="{self.filename}.{export_format}"'
+        )
+        return response
+
+    def render_ndjson(self, rows, chunk_size):
+        lines = []
+        for row in rows:
+            lines.append(json.dumps(row, cls=DjangoJSONEncoder) + "\n")
+            if len(lines) >= chunk_size:
+                yield "".join(lines)
+                lines = []
+        if lines:
+            yield "".join(lines)
+
+    def render_csv(self, rows, chunk_size):
+        writer = csv.writer(EchoBuffer())
+        lines = [writer.writerow(self.columns)]
+        for row in rows:
+            lines.append(writer.writerow([row[column] for column in self.columns]))
+            if len(lines) >= chunk_size:
+                yield "".join(lines)
+                lines = []
+        if lines:
+            yield "".join(lines)
+
+
+class OrderExportView(ExportView):
+    model = Order
+    filterset_class = OrderFilter
+    columns = (
+        "id",
+        "customer_id",
+        "customer__name",
+        "customer__email",
+        "total_amount",
+        "order_date",
+    )
+    filename = "orders"
+
+
+class CustomerExportView(ExportView):
+    model = Customer
+    filterset_class = CustomerFilter
+    columns = ("id", "name", "email", "phone")
+    filename = "customers"
@@ -1,9 +1,5 @@
-from crm.models import Customer, Product
+# Seed a small development dataset. For production-sized data run
+# `python manage.py generate_crm_data` with larger sizes.
+from django.core.management import call_command
 
-# Create sample products
-Product.objects.create(name="Laptop", price=1000, stock=10)
-Product.objects.create(name="Phone", price=500, stock=20)
-
-# Create sample customers
-Customer.objects.create(name="Alice", email="alice@example.com", phone="+1234567890")
-Customer.objects.create(name="Bob", email="bob@example.com", phone="123-456-7890")
+call_command("generate_crm_data", customers=50, products=20, orders=200)